@@ -4,21 +4,26 @@ cache in Python 3 and found on the ActiveState website:
 
 http://code.activestate.com/recipes/578078-py26-and-py30-backport-of-python-33s-lru-cache/
 
-It has been modified to remove the cache info (data on cache hits and misses)
-and implementt a simplified _make_key method.  Both of these give modest
-improvements in performance, reducing the time spent in the wrapper function by
-~30-40%.  Both of theses changes are based on discussions in the Python bug
-tracker:
+It has been modified to implement a simplified _make_key method, which gives a
+modest improvement in performance.  This is based on discussions in the Python
+bug tracker:
 
 http://bugs.python.org/issue16389
 http://bugs.python.org/issue14373
+
+It also counts evictions as well as hits and misses (see `cache_info`), and can
+discard selected entries (see `cache_discard`).
 """
 
 
+from collections import namedtuple
 from functools import update_wrapper
 from threading import RLock
 
 
+CacheInfo = namedtuple("CacheInfo", "hits misses evictions maxsize currsize")
+
+
 def _make_key(args, kwds):
     return (args, frozenset(kwds.items()))
 
@@ -31,16 +36,18 @@ def lru_cache(maxsize=100):
 
     Arguments to the cached function must be hashable.
 
-    View the cache statistics named tuple (hits, misses, maxsize, currsize) with
-    f.cache_info().  Clear the cache and statistics with f.cache_clear().
-    Access the underlying function with f.__wrapped__.
+    View the cache statistics named tuple (hits, misses, evictions, maxsize,
+    currsize) with f.cache_info().  Clear the cache and statistics with
+    f.cache_clear().  Discard the entries for which f(*args, **kwds) matches
+    some condition with f.cache_discard(condition).  Access the underlying
+    function with f.__wrapped__.
 
     See:  http://en.wikipedia.org/wiki/Cache_algorithms#Least_Recently_Used
 
     """
 
     # Users should only access the lru_cache through its public API:
-    #       cache_info, cache_clear, and f.__wrapped__
+    #       cache_info, cache_clear, cache_discard, and f.__wrapped__
     # The internals of the lru_cache are encapsulated for thread safety and
     # to allow the implementation to change (including a possible C version).
 
@@ -55,12 +62,15 @@ def lru_cache(maxsize=100):
         root[:] = [root, root, None, None]      # initialize by pointing to self
         nonlocal_root = [root]                  # make updateable non-locally
         PREV, NEXT, KEY, RESULT = 0, 1, 2, 3    # names for the link fields
+        stats = [0, 0, 0]                       # make statistics updateable non-locally
+        HITS, MISSES, EVICTIONS = 0, 1, 2       # names for the stats fields
 
         if maxsize == 0:
 
             def wrapper(*args, **kwds):
                 # no caching, just do a statistics update after a successful call
                 result = user_function(*args, **kwds)
+                stats[MISSES] += 1
                 return result
 
         elif maxsize is None:
@@ -70,9 +80,11 @@ def lru_cache(maxsize=100):
                 key = make_key(args, kwds)
                 result = cache_get(key, root)   # root used here as a unique not-found sentinel
                 if result is not root:
+                    stats[HITS] += 1
                     return result
                 result = user_function(*args, **kwds)
                 cache[key] = result
+                stats[MISSES] += 1
                 return result
 
         else:
@@ -92,10 +104,12 @@ def lru_cache(maxsize=100):
                         last[NEXT] = root[PREV] = link
                         link[PREV] = last
                         link[NEXT] = root
+                        stats[HITS] += 1
                         return result
                 result = user_function(*args, **kwds)
                 with lock:
                     root, = nonlocal_root
+                    stats[MISSES] += 1
                     if key in cache:
                         # getting here means that this same key was added to the
                         # cache while the lock was released.  since the link
@@ -115,6 +129,7 @@ def lru_cache(maxsize=100):
                         # now update the cache dictionary for the new links
                         del cache[oldkey]
                         cache[key] = oldroot
+                        stats[EVICTIONS] += 1
                     else:
                         # put result in a new link at the front of the list
                         last = root[PREV]
@@ -122,15 +137,41 @@ def lru_cache(maxsize=100):
                         last[NEXT] = root[PREV] = cache[key] = link
                 return result
 
+        def cache_info():
+            """Report cache statistics"""
+            with lock:
+                return CacheInfo(stats[HITS], stats[MISSES], stats[EVICTIONS],
+                                 maxsize, len(cache))
+
         def cache_clear():
             """Clear the cache and cache statistics"""
             with lock:
                 cache.clear()
                 root = nonlocal_root[0]
                 root[:] = [root, root, None, None]
+                stats[:] = [0, 0, 0]
+
+        def cache_discard(condition):
+            """Discard the entries for which condition(*args, **kwds) is True,
+            where args and kwds are those the cached function was called with.
+            Returns the number of entries discarded."""
+            with lock:
+                # unbounded caches are updated outside of the lock, so the
+                # keys are copied, and may already have been removed
+                keys = [k for k in list(cache) if condition(*k[0], **dict(k[1]))]
+                for key in keys:
+                    link = cache.pop(key, None)
+                    if link is not None and maxsize is not None:
+                        # unlink from the list, this is never the root
+                        link_prev, link_next = link[PREV], link[NEXT]
+                        link_prev[NEXT] = link_next
+                        link_next[PREV] = link_prev
+                return len(keys)
 
         wrapper.__wrapped__ = user_function
+        wrapper.cache_info = cache_info
         wrapper.cache_clear = cache_clear
+        wrapper.cache_discard = cache_discard
         return update_wrapper(wrapper, user_function)
 
     return decorating_function
@@ -107,10 +107,15 @@ def command(opts, parser, extra_arg_groups=None):
         print("not in a resolved environment context.", file=sys.stderr)
         sys.exit(1)
 
+    # these options only need part of the context
+    lazy = (not opts.interpret and
+            (opts.print_request or opts.print_resolve or opts.tools))
+
     if rxt_file == '-':  # read from stdin
-        rc = ResolvedContext.read_from_buffer(sys.stdin, 'STDIN')
+        stdin = getattr(sys.stdin, "buffer", sys.stdin)  # binary contexts
+        rc = ResolvedContext.read_from_buffer(stdin, 'STDIN', lazy=lazy)
     else:
-        rc = ResolvedContext.load(rxt_file)
+        rc = ResolvedContext.load(rxt_file, lazy=lazy)
 
     def _graph():
         if rc.has_graph:
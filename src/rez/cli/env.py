@@ -60,7 +60,9 @@ def setup_parser(parser, completions=False):
         "-o", "--output", type=str, metavar="FILE",
         help="store the context into an rxt file, instead of starting an "
         "interactive shell. Note that this will also store a failed resolve. "
-        "If you use the special value '-', the context is written to stdout.")
+        "If you use the special value '-', the context is written to stdout. "
+        "With --batch, this is the directory to store the contexts in, and is "
+        "created if it does not exist.")
     input_action = parser.add_argument(
         "-i", "--input", type=str, metavar="FILE",
         help="use a previously saved context. Resolve settings, such as PKG, "
@@ -86,6 +88,22 @@ def setup_parser(parser, completions=False):
     parser.add_argument(
         "--patch-rank", type=int, metavar="N", default=0,
         help="patch rank. Ignored if --patch is not present")
+    parser.add_argument(
+        "--incremental", action="store_true",
+        help="keep the versions of packages unaffected by the patch where "
+        "possible, rather than performing a full resolve. Ignored if --patch "
+        "is not present")
+    batch_action = parser.add_argument(
+        "--batch", type=str, metavar="FILE",
+        help="resolve each request listed in FILE (one per line) and store "
+        "the contexts into rxt files named after their line number, in the "
+        "directory given by --output (default: current directory). Packages "
+        "are loaded once and shared between the resolves")
+    parser.add_argument(
+        "--batch-processes", type=int, default=1, metavar="N",
+        dest="batch_processes",
+        help="number of processes to resolve the --batch requests in "
+        "(default: %(default)s)")
     parser.add_argument(
         "--no-cache", dest="no_cache", action="store_true",
         help="do not fetch cached resolves")
@@ -109,6 +127,14 @@ def setup_parser(parser, completions=False):
     parser.add_argument(
         "--stats", action="store_true",
         help="print advanced solver stats")
+    parser.add_argument(
+        "--profile-solve", type=str, metavar="FILE", dest="profile_solve",
+        help="profile the solve, print the most expensive package families, "
+        "and write the full profile to FILE. This is a JSON trace (which can "
+        "be loaded into chrome://tracing, Perfetto or speedscope), unless "
+        "FILE has a '.folded' extension, in which case folded stacks (the "
+        "input format of flamegraph.pl) are written. Resolve caching is "
+        "disabled")
     parser.add_argument(
         "--pre-command", type=str, help=SUPPRESS)
     PKG_action = parser.add_argument(
@@ -123,6 +149,7 @@ def setup_parser(parser, completions=False):
             ExecutablesCompleter, AndCompleter, SequencedCompleter
         command_action.completer = AndCompleter(ExecutablesCompleter, FilesCompleter())
         input_action.completer = FilesCompleter(dirs=False, file_patterns=["*.rxt"])
+        batch_action.completer = FilesCompleter(dirs=False)
         PKG_action.completer = PackageCompleter
         extra_0_action.completer = SequencedCompleter(
             "extra_0", ExecutablesCompleter, FilesCompleter())
@@ -131,7 +158,6 @@ def setup_parser(parser, completions=False):
 def command(opts, parser, extra_arg_groups=None):
     from rez.resolved_context import ResolvedContext
     from rez.resolver import ResolverStatus
-    from rez.package_filter import PackageFilterList, Rule
     from rez.utils.formatting import get_epoch_time_from_str
     from rez.config import config
     import select
@@ -146,6 +172,7 @@ def command(opts, parser, extra_arg_groups=None):
         command = extra_arg_groups[0] or None
 
     context = None
+    seed_context = None
     request = opts.PKG
     t = get_epoch_time_from_str(opts.time) if opts.time else None
 
@@ -156,6 +183,12 @@ def command(opts, parser, extra_arg_groups=None):
         pkg_paths = opts.paths.split(os.pathsep)
         pkg_paths = [os.path.expanduser(x) for x in pkg_paths if x]
 
+    if opts.batch:
+        if opts.PKG or opts.input or opts.patch:
+            parser.error("Cannot use --batch with PKG(s), --input or --patch.")
+
+        _resolve_batch(opts, timestamp=t, package_paths=pkg_paths)
+
     if opts.input:
         if opts.PKG and not opts.patch:
             parser.error("Cannot use --input and provide PKG(s), unless patching.")
@@ -174,22 +207,12 @@ def command(opts, parser, extra_arg_groups=None):
         request = context.get_patched_request(request,
                                               strict=opts.strict,
                                               rank=opts.patch_rank)
+        if opts.incremental:
+            seed_context = context
         context = None
 
     if context is None:
-        # create package filters
-        if opts.no_filters:
-            package_filter = PackageFilterList()
-        else:
-            package_filter = PackageFilterList.singleton.copy()
-
-        for rule_str in (opts.exclude or []):
-            rule = Rule.parse_rule(rule_str)
-            package_filter.add_exclusion(rule)
-
-        for rule_str in (opts.include or []):
-            rule = Rule.parse_rule(rule_str)
-            package_filter.add_inclusion(rule)
+        package_filter = _get_package_filter(opts)
 
         # perform the resolve
         context = ResolvedContext(package_requests=request,
@@ -203,7 +226,12 @@ def command(opts, parser, extra_arg_groups=None):
                                   time_limit=opts.time_limit,
                                   caching=(not opts.no_cache),
                                   suppress_passive=opts.no_passive,
-                                  print_stats=opts.stats)
+                                  print_stats=opts.stats,
+                                  seed_context=seed_context,
+                                  profile_solve=bool(opts.profile_solve))
+
+        if opts.profile_solve:
+            _write_solve_profile(context.solve_profile, opts.profile_solve)
 
     success = (context.status == ResolverStatus.solved)
 
@@ -252,6 +280,91 @@ def command(opts, parser, extra_arg_groups=None):
     sys.exit(returncode)
 
 
+def _get_package_filter(opts):
+    from rez.package_filter import PackageFilterList, Rule
+
+    if opts.no_filters:
+        package_filter = PackageFilterList()
+    else:
+        package_filter = PackageFilterList.singleton.copy()
+
+    for rule_str in (opts.exclude or []):
+        rule = Rule.parse_rule(rule_str)
+        package_filter.add_exclusion(rule)
+
+    for rule_str in (opts.include or []):
+        rule = Rule.parse_rule(rule_str)
+        package_filter.add_inclusion(rule)
+
+    return package_filter
+
+
+def _write_solve_profile(profile, filepath):
+    import json
+    import sys
+
+    print("\nsolve profile:", file=sys.stderr)
+    profile.print_summary(buf=sys.stderr)
+
+    with open(filepath, 'w') as f:
+        if filepath.endswith(".folded"):
+            f.write('\n'.join(profile.get_folded_stacks()) + '\n')
+        else:
+            json.dump(profile.to_dict(), f)
+
+    print("\nwrote solve profile to %s" % filepath, file=sys.stderr)
+
+
+def _resolve_batch(opts, timestamp, package_paths):
+    from rez.resolve_batch import resolve_batch
+    from rez.resolver import ResolverStatus
+    from rez.utils.filesystem import safe_makedirs
+    import sys
+    import os.path
+
+    # create the output dir first, rather than fail after every resolve
+    output_dir = opts.output or os.getcwd()
+    safe_makedirs(output_dir)
+
+    # one request per line, blank lines and comments are skipped
+    linenos = []
+    requests = []
+
+    with open(opts.batch) as f:
+        for i, line in enumerate(f):
+            line = line.split('#', 1)[0].strip()
+            if line:
+                linenos.append(i + 1)
+                requests.append(line.split())
+
+    contexts = resolve_batch(requests,
+                             processes=opts.batch_processes,
+                             timestamp=timestamp,
+                             package_paths=package_paths,
+                             building=opts.build,
+                             package_filter=_get_package_filter(opts),
+                             add_implicit_packages=(not opts.no_implicit),
+                             max_fails=opts.max_fails,
+                             time_limit=opts.time_limit,
+                             caching=(not opts.no_cache))
+
+    num_failed = 0
+
+    for lineno, request, context in zip(linenos, requests, contexts):
+        filepath = os.path.join(output_dir, "%d.rxt" % lineno)
+        context.save(filepath)
+
+        if context.status == ResolverStatus.solved:
+            status = "solved"
+        else:
+            status = "FAILED"
+            num_failed += 1
+
+        print("%s: %s (%s)" % (filepath, ' '.join(request), status))
+
+    sys.exit(1 if num_failed else 0)
+
+
 # Copyright 2013-2016 Allan Johns.
 #
 # This library is free software: you can redistribute it and/or
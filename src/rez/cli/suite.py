@@ -30,12 +30,21 @@ def setup_parser(parser, completions=False):
     add_action = parser.add_argument(
         "-a", "--add", type=str, metavar="RXT",
         help="add a context to the suite")
+    parser.add_argument(
+        "--add-requests", dest="add_requests", type=str, metavar="FILE",
+        help="resolve and add several contexts to the suite. FILE is a yaml "
+        "file mapping context names to requests, eg 'maya: [maya-2020, "
+        "mtoa]'. Contexts are added in name order")
+    parser.add_argument(
+        "-j", "--processes", type=int, default=1, metavar="N",
+        help="number of processes to resolve contexts in, when using "
+        "--add-requests (default: %(default)s)")
     add_action = parser.add_argument(
         "-P", "--prefix-char", dest="prefix_char", type=str, metavar="CHAR",
         help="set the char used to access rez options via a suite tool "
         "for the context being added (default: '+'). If set to the empty string, "
         "rez options are disabled. This option is only used in combination with "
-        "--add")
+        "--add or --add-requests")
     parser.add_argument(
         "-r", "--remove", type=str, metavar="NAME",
         help="remove a context from the suite")
@@ -87,11 +96,14 @@ def command(opts, parser, extra_arg_groups=None):
     from rez.status import status
     from rez.exceptions import SuiteError
     from rez.resolved_context import ResolvedContext
+    from rez.vendor.six import six
     import sys
 
+    basestring = six.string_types[0]
+
     context_needed = set(("add", "prefix", "suffix", "hide", "unhide", "alias",
                           "unalias", "interactive"))
-    save_needed = set(("add", "remove", "bump", "prefix", "suffix", "hide",
+    save_needed = set(("add", "add_requests", "remove", "bump", "prefix", "suffix", "hide",
                        "unhide", "alias", "unalias"))
 
     def _pr(s):
@@ -149,6 +161,21 @@ def command(opts, parser, extra_arg_groups=None):
         _pr("adding context %r..." % opts.context)
         suite.add_context(name=opts.context, context=context,
                           prefix_char=opts.prefix_char)
+    elif _option("add_requests"):
+        from rez.vendor import yaml
+
+        with open(opts.add_requests) as f:
+            doc = yaml.load(f.read(), Loader=yaml.FullLoader)
+
+        requests = []
+        for name, request in sorted(doc.items()):
+            if isinstance(request, basestring):
+                request = request.split()
+            requests.append((name, request))
+
+        _pr("resolving %d contexts..." % len(requests))
+        suite.add_requests(requests, prefix_char=opts.prefix_char,
+                           processes=opts.processes)
     elif _option("remove"):
         _pr("removing context %r..." % opts.remove)
         suite.remove_context(name=opts.remove)
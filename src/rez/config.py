@@ -342,6 +342,10 @@ config_schema = Schema({
     "package_definition_python_path":               OptionalStr,
     "tmpdir":                                       OptionalStr,
     "context_tmpdir":                               OptionalStr,
+    "resolve_cache_path":                           OptionalStr,
+    "environ_cache_path":                           OptionalStr,
+    "bytecode_cache_path":                          OptionalStr,
+    "package_file_cache_path":                      OptionalStr,
     "default_shell":                                OptionalStr,
     "terminal_emulator_command":                    OptionalStr,
     "editor":                                       OptionalStr,
@@ -372,6 +376,10 @@ config_schema = Schema({
     "variant_shortlinks_dirname":                   OptionalStr,
     "build_thread_count":                           BuildThreadCount_,
     "resource_caching_maxsize":                     Int,
+    "resolve_cache_maxsize":                        Int,
+    "environ_cache_maxsize":                        Int,
+    "solver_prefetch_thread_count":                 Int,
+    "solver_prefetch_max_versions":                 Int,
     "max_package_changelog_chars":                  Int,
     "max_package_changelog_revisions":              Int,
     "memcached_package_file_min_compress_len":      Int,
@@ -380,12 +388,18 @@ config_schema = Schema({
     "memcached_resolve_min_compress_len":           Int,
     "allow_unversioned_packages":                   Bool,
     "rxt_as_yaml":                                  Bool,
+    "rxt_as_binary":                                Bool,
+    "suite_tool_direct_exec":                       Bool,
+    "suite_save_thread_count":                      Int,
     "color_enabled":                                ForceOrBool,
     "resolve_caching":                              Bool,
     "cache_package_files":                          Bool,
     "cache_listdir":                                Bool,
     "prune_failed_graph":                           Bool,
     "all_parent_variables":                         Bool,
+    "dedup_path_variables":                         Bool,
+    "prune_missing_paths":                          Bool,
+    "coalesce_env_var_pends":                       Bool,
     "all_resetting_variables":                      Bool,
     "package_commands_sourced_first":               Bool,
     "use_variant_shortlinks":                       Bool,
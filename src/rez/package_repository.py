@@ -96,6 +96,42 @@ class PackageRepository(object):
         """Clear any cached resources in the pool."""
         self.pool.clear_caches()
 
+    def clear_family_caches(self, name):
+        """Clear any cached data of a package family.
+
+        Unlike `clear_caches`, this leaves the cached data of other families
+        intact. Use it when a family is known to have changed - for example,
+        when a package has been released to it.
+
+        The default implementation discards the family's resources (the
+        family, its packages and their variants) from the pool. Repositories
+        that have caches of their own should extend it.
+
+        Args:
+            name (str): Package family name.
+        """
+        repo_type = self.name()
+        location = self.location
+
+        def _match(handle):
+            return (handle.get("name") == name
+                    and handle.get("location") == location
+                    and handle.get("repository_type") == repo_type)
+
+        self.pool.discard_resources(_match)
+
+    def get_cache_stats(self):
+        """Get statistics of the repository's own caches.
+
+        This does not include the resource pool, which is shared by all
+        repositories (see `PackageRepositoryManager.get_cache_stats`).
+
+        Returns:
+            dict: Cache name to stats, as returned by
+            `ResourcePool.get_cache_stats`.
+        """
+        return {}
+
     @cached_property
     def uid(self):
         """Returns a unique identifier for this repository.
@@ -256,6 +292,22 @@ class PackageRepository(object):
         """
         return None
 
+    def get_variant_state_handles(self, variant_resources):
+        """Get values that indicate the state of several variants.
+
+        This is a bulk version of `get_variant_state_handle`. Override it if
+        your repository can determine the state of many variants more
+        efficiently than one at a time.
+
+        Args:
+            variant_resources (list of `VariantResource`): Variants.
+
+        Returns:
+            list: State handles (see `get_variant_state_handle`), one per
+            variant, in the same order as `variant_resources`.
+        """
+        return [self.get_variant_state_handle(x) for x in variant_resources]
+
     def get_last_release_time(self, package_family_resource):
         """Get the last time a package was added to the given family.
 
@@ -270,6 +322,29 @@ class PackageRepository(object):
         """
         return 0
 
+    def get_last_release_times(self, package_names):
+        """Get the last release times of several package families.
+
+        This is a bulk version of `get_last_release_time`. Override it if your
+        repository can query many families more efficiently than one at a time.
+
+        Args:
+            package_names (list of str): Package family names.
+
+        Returns:
+            dict: Maps each package name to its last release time (see
+            `get_last_release_time`), or to None if the family does not exist
+            in this repository.
+        """
+        times = {}
+        for name in package_names:
+            family = self.get_package_family(name)
+            if family:
+                times[name] = self.get_last_release_time(family)
+            else:
+                times[name] = None
+        return times
+
     def make_resource_handle(self, resource_key, **variables):
         """Create a `ResourceHandle`
 
@@ -492,6 +567,39 @@ class PackageRepositoryManager(object):
         self.repositories.clear()
         self.pool.clear_caches()
 
+    def clear_family_caches(self, name):
+        """Clear cached data of a package family, in all repositories.
+
+        See `PackageRepository.clear_family_caches`.
+
+        Args:
+            name (str): Package family name.
+        """
+        for repo in self.repositories.values():
+            repo.clear_family_caches(name)
+
+    def get_cache_stats(self):
+        """Get cache statistics.
+
+        Statistics include the number of hits, misses and evictions of each
+        cache, and its current and maximum size (a maxsize of None means
+        unlimited). They are reset when caches are cleared.
+
+        Returns:
+            dict: Containing:
+            - 'resources': Stats of the resource pool;
+            - 'repositories': Repository string (eg 'filesystem@/packages') to
+              that repository's cache stats (see
+              `PackageRepository.get_cache_stats`).
+        """
+        return {
+            "resources": self.pool.get_cache_stats(),
+            "repositories": dict(
+                (str(repo), repo.get_cache_stats())
+                for repo in self.repositories.values()
+            )
+        }
+
     def _get_repository(self, path):
         repo_type, location = path.split('@', 1)
         cls = plugin_manager.get_plugin_class('package_repository', repo_type)
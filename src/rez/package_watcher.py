@@ -0,0 +1,428 @@
+"""
+Watch package repositories for changes, and clear stale cached data.
+"""
+from rez.config import config
+from rez.package_repository import package_repository_manager
+from rez.utils.execution import threaded_map
+import threading
+import select
+import struct
+import errno
+import sys
+import os.path
+import os
+
+
+debug_print = config.debug_printer("resources")
+
+
+class PackageWatcher(object):
+    """Watches filesystem package repositories for changed package families.
+
+    Rez caches package families, packages and variants in memory for the life
+    of the process. This is fine for short-lived processes such as rez-env, but
+    long-lived ones (a GUI, a resolve service) would never see newly released
+    packages, unless they clear all their caches now and then. A watcher
+    instead detects which families have changed, and clears the cached data of
+    only those families (see `PackageRepository.clear_family_caches`).
+
+    By default, changes are detected by polling the mtimes of family dirs -
+    note that a family dir's mtime is updated whenever a package is released to
+    it. Alternatively, inotify can be used on linux. This detects changes as
+    they happen, at the cost of one inotify watch per family. Note however that
+    inotify only sees changes made via the local host, so does not detect
+    releases made from other hosts to a repository on a network filesystem.
+
+    Only changes to a family's list of versions are detected - for example, an
+    edit to an existing package.py, which does not change its family dir, is
+    not seen.
+
+    Example:
+
+        >>> watcher = PackageWatcher()
+        >>> watcher.start()  # checks every 5 seconds, in a background thread
+
+    Or, to check for changes explicitly (from a GUI's event loop, say):
+
+        >>> watcher = PackageWatcher()
+        >>> changes = watcher.poll()
+    """
+    def __init__(self, paths=None, interval=5.0, use_inotify=False,
+                 callback=None):
+        """Create a package watcher.
+
+        The current state of each repository is recorded on creation, so later
+        calls to `poll` report any changes since then.
+
+        Args:
+            paths (list of str): Package repository paths to watch, defaults
+                to `config.packages_path`. Non-filesystem repositories are
+                ignored.
+            interval (float): Seconds between checks, when running in a
+                background thread (see `start`).
+            use_inotify (bool): If True, use inotify to detect changes. If
+                inotify is not available, or a new family cannot be watched
+                (for example, when out of inotify watches), polling is used
+                instead. Repositories that do not exist are always polled.
+            callback (callable): Called with a repository path and a set of
+                family names, after the cached data of those families has been
+                cleared.
+        """
+        if paths is None:
+            paths = config.packages_path
+
+        self.interval = interval
+        self.callback = callback
+        self.inotify = None
+        self.watches = {}
+        self.repo_states = {}
+
+        self.paths = []
+        for path in paths:
+            repo = package_repository_manager.get_repository(path)
+            if repo.name() == "filesystem":
+                self.paths.append(path)
+
+        self._thread = None
+        self._stop_event = threading.Event()
+
+        if use_inotify:
+            try:
+                self.inotify = _Inotify()
+                for path in self.paths:
+                    self._watch_repository(path)
+            except OSError as e:
+                debug_print("inotify unavailable, polling instead: %s", e)
+                self._use_polling()
+        else:
+            self._use_polling()
+
+    def start(self):
+        """Start checking for changes in a background thread."""
+        if self._thread:
+            return
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        """Stop the background thread, if running."""
+        if self._thread:
+            self._stop_event.set()
+            self._thread.join()
+            self._thread = None
+
+    def close(self):
+        """Stop watching. The watcher cannot be used after this."""
+        self.stop()
+        if self.inotify:
+            self.inotify.close()
+            self.inotify = None
+
+    def poll(self, timeout=0):
+        """Check for changes.
+
+        The cached data of each changed family is cleared.
+
+        Args:
+            timeout (float): Seconds to wait for changes to occur, if none
+                have yet. Only applies when using inotify.
+
+        Returns:
+            dict: Repository path to set of changed family names, for each
+            repository that has changed.
+        """
+        changes = {}
+        if self.inotify:
+            changes = self._read_events(timeout)
+
+        # all repositories when polling, otherwise those not watched by inotify
+        for path, old_state in list(self.repo_states.items()):
+            state = self._get_repository_state(path, old_state)
+            names = self._diff_states(old_state, state)
+            self.repo_states[path] = state
+            if names and path not in changes:
+                changes[path] = names
+
+        for path, names in changes.items():
+            repo = package_repository_manager.get_repository(path)
+            if names is None:
+                repo.clear_caches()
+                names = set()
+            else:
+                for name in names:
+                    repo.clear_family_caches(name)
+
+            debug_print("Package families changed in %s: %s", path,
+                        ' '.join(sorted(names)) or "(all)")
+
+            if self.callback:
+                self.callback(path, names)
+
+        return changes
+
+    def _use_polling(self):
+        if self.inotify:
+            self.inotify.close()
+            self.inotify = None
+
+        self.watches = {}
+        for path in self.paths:
+            self.repo_states[path] = self._get_repository_state(path)
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            try:
+                if self.inotify:
+                    self.poll(timeout=self.interval)
+                    continue
+
+                self.poll()
+            except Exception as e:
+                # keep watching, a repo may just be temporarily unavailable
+                debug_print("Package watcher error: %s", e)
+
+            self._stop_event.wait(self.interval)
+
+    @classmethod
+    def _family_name(cls, filename):
+        # the family a repository root entry is for, if any
+        if filename.startswith('.'):
+            return None
+
+        name, ext = os.path.splitext(filename)
+        if ext in (".py", ".yaml"):
+            return name
+        return filename
+
+    def _get_repository_state(self, path, old_state=None):
+        # mtime of the repository root, and of each family dir / file. The root
+        # is only listed again if its mtime has changed
+        location = package_repository_manager.get_repository(path).location
+
+        try:
+            mtime = os.stat(location).st_mtime
+            if old_state and old_state[0] == mtime:
+                filenames = list(old_state[1].keys())
+            else:
+                filenames = os.listdir(location)
+        except OSError:
+            return None, {}
+
+        def _mtime(filename):
+            try:
+                return os.stat(os.path.join(location, filename)).st_mtime
+            except OSError:
+                return None
+
+        filenames = [x for x in filenames if self._family_name(x)]
+        num_threads = config.plugins.package_repository.filesystem.stat_thread_count
+        mtimes = threaded_map(_mtime, filenames, num_threads)
+        return mtime, dict(zip(filenames, mtimes))
+
+    def _diff_states(self, old_state, new_state):
+        old_mtimes = old_state[1]
+        new_mtimes = new_state[1]
+        names = set()
+
+        for filename in set(old_mtimes) | set(new_mtimes):
+            if old_mtimes.get(filename) != new_mtimes.get(filename):
+                names.add(self._family_name(filename))
+        return names
+
+    def _watch_repository(self, path):
+        location = package_repository_manager.get_repository(path).location
+
+        try:
+            wd = self.inotify.add_watch(location, _Inotify.root_mask)
+        except OSError as e:
+            if e.errno not in (errno.ENOENT, errno.ENOTDIR):
+                raise
+
+            # the repository doesn't exist (yet), so poll it instead
+            debug_print("Polling nonexistent package repository %s", path)
+            self.repo_states[path] = self._get_repository_state(path)
+            return
+
+        self.watches[wd] = (path, None)
+
+        for filename in os.listdir(location):
+            family_path = os.path.join(location, filename)
+            if self._family_name(filename) and os.path.isdir(family_path):
+                self._watch_family(path, family_path, filename)
+
+    def _watch_family(self, path, family_path, name):
+        try:
+            wd = self.inotify.add_watch(family_path, _Inotify.family_mask)
+        except OSError as e:
+            if e.errno in (errno.ENOENT, errno.ENOTDIR):
+                return  # removed since it was listed
+            raise
+
+        self.watches[wd] = (path, name)
+
+    def _read_events(self, timeout):
+        changes = {}
+        use_polling = False
+
+        for wd, mask, filename in self.inotify.read_events(timeout):
+            if mask & _Inotify.IN_Q_OVERFLOW:
+                # events were lost, so any family may have changed
+                for path in self.paths:
+                    changes[path] = None
+                continue
+
+            watch = self.watches.get(wd)
+            if watch is None:
+                continue
+
+            path, name = watch
+            if mask & _Inotify.IN_IGNORED:
+                del self.watches[wd]  # family dir removed
+
+            if name is None:
+                # an event in the repository root
+                name = self._family_name(filename)
+                if not name:
+                    continue
+
+                if mask & _Inotify.IN_ISDIR and \
+                        mask & (_Inotify.IN_CREATE | _Inotify.IN_MOVED_TO):
+                    location = package_repository_manager.get_repository(path).location
+                    try:
+                        self._watch_family(
+                            path, os.path.join(location, filename), name)
+                    except OSError as e:
+                        # eg out of inotify watches (ENOSPC). The new family
+                        # would go unwatched, so poll for changes instead
+                        debug_print("Cannot watch %s, polling instead: %s",
+                                    filename, e)
+                        use_polling = True
+
+            names = changes.setdefault(path, set())
+            if names is not None:
+                names.add(name)
+
+        if use_polling:
+            # events not yet read are lost, so any family may have changed
+            for path in self.paths:
+                changes[path] = None
+            self._use_polling()
+
+        return changes
+
+
+class _Inotify(object):
+    """Minimal ctypes binding to linux inotify."""
+    IN_MODIFY = 0x00000002
+    IN_ATTRIB = 0x00000004
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_DELETE_SELF = 0x00000400
+    IN_MOVE_SELF = 0x00000800
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ONLYDIR = 0x01000000
+    IN_ISDIR = 0x40000000
+
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+
+    # a family dir changes when its versions are added, removed or ignored, or
+    # its mtime is touched (see `FileSystemPackageRepository._create_variant`)
+    family_mask = (IN_ATTRIB | IN_CREATE | IN_DELETE | IN_MOVED_FROM |
+                   IN_MOVED_TO | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR)
+
+    # a family is added or removed, or its combined family file changes
+    root_mask = (IN_MODIFY | IN_ATTRIB | IN_CREATE | IN_DELETE |
+                 IN_MOVED_FROM | IN_MOVED_TO | IN_ONLYDIR)
+
+    event_header = struct.Struct("iIII")
+
+    def __init__(self):
+        import ctypes
+        import ctypes.util
+
+        if not sys.platform.startswith("linux"):
+            raise OSError(errno.ENOSYS, "inotify is only available on linux")
+
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            raise OSError(errno.ENOSYS, "inotify is not supported by libc")
+
+        self.libc = libc
+        self.fd = libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self.fd < 0:
+            self._raise_error("inotify_init1")
+
+    def add_watch(self, path, mask):
+        if not isinstance(path, bytes):
+            path = path.encode(sys.getfilesystemencoding())
+
+        wd = self.libc.inotify_add_watch(self.fd, path, mask)
+        if wd < 0:
+            self._raise_error("inotify_add_watch")
+        return wd
+
+    def read_events(self, timeout=0):
+        """Read pending events.
+
+        Returns:
+            list of 3-tuple: Watch descriptor, event mask, and filename (which
+            is empty for events on the watched dir itself).
+        """
+        if not select.select([self.fd], [], [], timeout)[0]:
+            return []
+
+        try:
+            data = os.read(self.fd, 65536)
+        except OSError as e:
+            if e.errno == errno.EAGAIN:
+                return []
+            raise
+
+        events = []
+        i = 0
+        header_size = self.event_header.size
+
+        while i + header_size <= len(data):
+            wd, mask, _, size = self.event_header.unpack_from(data, i)
+            i += header_size
+            filename = data[i:i + size].rstrip(b'\0')
+            i += size
+            events.append((wd, mask,
+                           filename.decode(sys.getfilesystemencoding())))
+
+        return events
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+    @classmethod
+    def _raise_error(cls, funcname):
+        import ctypes
+
+        err = ctypes.get_errno()
+        raise OSError(err, "%s: %s" % (funcname, os.strerror(err)))
+
+
+# Copyright 2013-2016 Allan Johns.
+#
+# This library is free software: you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation, either
+# version 3 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library.  If not, see <http://www.gnu.org/licenses/>.
@@ -658,6 +658,36 @@ def get_last_release_time(name, paths=None):
     return max_time
 
 
+def get_last_release_times(names, paths=None):
+    """Returns the most recent release times of several packages.
+
+    This gives the same result as calling `get_last_release_time` for each
+    package, but gives repositories the chance to query them in bulk.
+
+    Returns:
+        dict: Maps each package name to the epoch time of its last release, or
+        to zero if this cannot be determined.
+    """
+    names = list(names)
+    times = dict((x, 0) for x in names)
+    unknown = set()
+
+    for path in (paths or config.packages_path):
+        repo = package_repository_manager.get_repository(path)
+
+        for name, time_ in repo.get_last_release_times(names).items():
+            if time_ is None:  # family not in this repository
+                continue
+            if time_ == 0:
+                unknown.add(name)
+            else:
+                times[name] = max(times[name], time_)
+
+    for name in unknown:
+        times[name] = 0
+    return times
+
+
 def get_completions(prefix, paths=None, family_only=False):
     """Get autocompletion options given a prefix string.
 
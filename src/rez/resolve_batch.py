@@ -0,0 +1,90 @@
+"""
+Resolve many requests at once, sharing loaded package state between resolves.
+"""
+from rez.resolved_context import ResolvedContext
+from rez.solver import PackageVariantCache
+
+
+# package cache of a worker process, see `_resolve_in_process`
+_process_package_cache = None
+
+
+def resolve_batch(requests, processes=1, **context_kwargs):
+    """Resolve a list of requests.
+
+    Each request is resolved into its own context, but packages loaded by one
+    resolve are reused by the resolves that follow it, so that each package is
+    loaded at most once per batch (or once per process, see `processes`).
+    Resolves that share many dependencies are much faster this way than they
+    are when resolved one at a time.
+
+    Note that the settings given in `context_kwargs` apply to every request -
+    resolves using different package paths or filters cannot share a cache.
+
+    Args:
+        requests (list of list of str or `PackageRequest`): Requests to resolve.
+        processes (int): Number of processes to resolve in. If greater than
+            one, requests are distributed across a process pool, and resolves
+            share loaded packages with others in the same process only.
+        context_kwargs: Extra arguments passed to each `ResolvedContext`, such
+            as `package_paths` or `timestamp`. These must be picklable if
+            `processes` is greater than one.
+
+    Returns:
+        List of `ResolvedContext`: One context per request, in request order.
+    """
+    requests = [list(x) for x in requests]
+
+    if processes > 1 and len(requests) > 1:
+        from multiprocessing import Pool
+
+        args = [(x, context_kwargs) for x in requests]
+
+        # keep neighbouring requests in the same process, they are likely to
+        # share packages
+        chunksize = max(1, len(requests) // (processes * 4))
+
+        pool = Pool(processes=processes)
+        try:
+            data = pool.map(_resolve_in_process, args, chunksize=chunksize)
+        finally:
+            pool.close()
+            pool.join()
+
+        return [ResolvedContext.from_dict(d) for d in data]
+
+    package_cache = PackageVariantCache()
+
+    return [
+        ResolvedContext(request, package_cache=package_cache, **context_kwargs)
+        for request in requests
+    ]
+
+
+def _resolve_in_process(args):
+    global _process_package_cache
+
+    request, context_kwargs = args
+    if _process_package_cache is None:
+        _process_package_cache = PackageVariantCache()
+
+    context = ResolvedContext(request,
+                              package_cache=_process_package_cache,
+                              **context_kwargs)
+    return context.to_dict()
+
+
+# Copyright 2013-2016 Allan Johns.
+#
+# This library is free software: you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation, either
+# version 3 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library.  If not, see <http://www.gnu.org/licenses/>.
@@ -2,7 +2,6 @@ from __future__ import print_function
 
 from rez import __version__, module_root_path
 from rez.package_repository import package_repository_manager
-from rez.solver import SolverCallbackReturn
 from rez.resolver import Resolver, ResolverStatus
 from rez.system import system
 from rez.config import config
@@ -13,23 +12,24 @@ from rez.utils.formatting import columnise, PackageRequest, ENV_VAR_REGEX, \
     header_comment, minor_header_comment
 from rez.utils.data_utils import deep_del
 from rez.utils.filesystem import TempDirs
+from rez.utils.platform_ import platform_
 from rez.utils.memcached import pool_memcached_connections
 from rez.backport.shutilwhich import which
-from rez.rex import RexExecutor, Python, OutputStyle
+from rez.rex import RexExecutor, Python, OutputStyle, Alias
 from rez.rex_bindings import VersionBinding, VariantBinding, \
     VariantsBinding, RequirementsBinding
 from rez import package_order
 from rez.packages import get_variant, iter_packages
 from rez.package_filter import PackageFilterList
-from rez.shells import create_shell
+from rez.shells import create_shell, get_default_shell
 from rez.exceptions import ResolvedContextError, PackageCommandError, \
     RezError, _NeverError
-from rez.utils.graph_utils import write_dot, write_compacted, read_graph_from_string
 from rez.vendor.six import six
 from rez.vendor.version.version import VersionRange
 from rez.vendor.enum import Enum
 from rez.vendor import yaml
 from rez.utils import json
+from rez.utils import binary_context
 from rez.utils.yaml import dump_yaml
 
 from tempfile import mkdtemp
@@ -40,6 +40,7 @@ import threading
 import traceback
 import inspect
 import time
+import re
 import sys
 import os
 import os.path
@@ -110,6 +111,42 @@ def get_lock_request(name, version, patch_lock, weak=True):
     return PackageRequest(s)
 
 
+_json_whitespace_regex = re.compile(r"[ \t\n\r]*")
+
+
+def _find_json_string_end(content, pos):
+    """Find the end of the json string starting at `pos`, without decoding it.
+
+    Returns:
+        int: Index one past the closing quote.
+    """
+    i = pos
+    while True:
+        i = content.find('"', i + 1)
+        if i == -1:
+            raise ValueError("Unterminated string starting at char %d" % pos)
+
+        # the quote is escaped if preceded by an odd number of backslashes
+        j = i - 1
+        while content[j] == '\\':
+            j -= 1
+        if (i - j) % 2:
+            return i + 1
+
+
+class _DeferredJSONString(object):
+    """A json string value that is decoded on demand."""
+    def __init__(self, raw):
+        self.raw = raw
+
+    def load(self):
+        return json.loads(self.raw)
+
+
+# values in a lazily loaded context dict that are decoded on demand
+_deferred_value_types = (_DeferredJSONString, binary_context.LazySection)
+
+
 class ResolvedContext(object):
     """A class that resolves, stores and spawns Rez environments.
 
@@ -127,6 +164,14 @@ class ResolvedContext(object):
     context_tracking_payload = None
     context_tracking_lock = threading.Lock()
 
+    # max number of recordings kept per context in the environ cache. There
+    # is one for each set of env-var values that package commands have seen
+    max_environ_cache_recordings = 10
+
+    # top-level keys whose values are not decoded by a lazy load. Note that
+    # this also applies to binary contexts
+    deferred_json_keys = ("graph",)
+
     class Callback(object):
         def __init__(self, max_fails, time_limit, callback, buf=None):
             self.max_fails = max_fails
@@ -136,6 +181,8 @@ class ResolvedContext(object):
             self.buf = buf or sys.stdout
 
         def __call__(self, state):
+            from rez.solver import SolverCallbackReturn
+
             if self.max_fails != -1 and state.num_fails >= self.max_fails:
                 reason = ("fail limit reached: aborted after %d failures"
                           % state.num_fails)
@@ -153,7 +200,8 @@ class ResolvedContext(object):
                  package_filter=None, package_orderers=None, max_fails=-1,
                  add_implicit_packages=True, time_limit=-1, callback=None,
                  package_load_callback=None, buf=None, suppress_passive=False,
-                 print_stats=False):
+                 print_stats=False, seed_context=None, package_cache=None,
+                 profile_solve=False):
         """Perform a package resolve, and store the result.
 
         Args:
@@ -176,8 +224,10 @@ class ResolvedContext(object):
                 by config.implicit_packages is appended to the request.
             max_fails (int): Abort the resolve if the number of failed steps is
                 greater or equal to this number. If -1, does not abort.
-            time_limit (int): Abort the resolve if it takes longer than this
-                many seconds. If -1, there is no time limit.
+            time_limit (int or float): Abort the resolve if it takes longer
+                than this many seconds. If -1, there is no time limit. An
+                aborted context still holds the best partial resolve found up
+                to that point, see `partial_packages`.
             callback: See `Solver`.
             package_load_callback: If not None, this callable will be called
                 prior to each package being loaded. It is passed a single
@@ -188,6 +238,20 @@ class ResolvedContext(object):
                 has had no effect on the solve. This argument only has an
                 effect if `verbosity` > 2.
             print_stats (bool): If true, print advanced solver stats at the end.
+            seed_context (`ResolvedContext`): A previous context, typically
+                one whose request has been modified to create this one. The
+                resolve first tries to keep the versions of the packages in
+                this context that are unaffected by the modification, and only
+                performs a full resolve if that fails. This is much faster when
+                tweaking a context, but note that the result may differ from a
+                fresh resolve of the same request.
+            package_cache (`PackageVariantCache`): Cache of loaded packages to
+                share with other resolves that have the same package paths,
+                package filter, timestamp and `building` value. See
+                `rez.resolve_batch`.
+            profile_solve (bool): If True, profile the solve, and store the
+                `SolveProfile` in `self.solve_profile`. Resolve caching is
+                disabled in this case.
         """
         self.load_path = None
 
@@ -238,12 +302,24 @@ class ResolvedContext(object):
         self.failure_description = None
         self.graph_string = None
         self.graph_ = None
+
+        # set on lazily loaded contexts only, see `load`
+        self._resolved_package_handles = None
+        self._deferred_graph = None
         self.from_cache = None
 
         # stats
         self.solve_time = 0.0  # total solve time, inclusive of load time
         self.load_time = 0.0  # total time loading packages (disk or memcache)
         self.num_loaded_packages = 0  # num packages loaded (disk or memcache)
+        self.solve_profile = None  # see `SolveProfile`, not serialized
+        self.solve_stats = None  # see `Solver.solve_stats`, not serialized
+
+        # best partial resolve of an aborted resolve, not serialized. These
+        # are the solved packages, and the requests for the packages that are
+        # not solved yet.
+        self.partial_packages = None
+        self.unresolved_requests = None
 
         # the pre-resolve bindings. We store these because @late package.py
         # functions need them, and we cache them to avoid cost
@@ -266,6 +342,10 @@ class ResolvedContext(object):
 
         request = self.requested_packages(include_implicit=True)
 
+        seed_variants = None
+        if seed_context is not None:
+            seed_variants = self._get_seed_variants(seed_context, request)
+
         resolver = Resolver(context=self,
                             package_requests=request,
                             package_paths=self.package_paths,
@@ -279,7 +359,10 @@ class ResolvedContext(object):
                             verbosity=verbosity,
                             buf=buf,
                             suppress_passive=suppress_passive,
-                            print_stats=print_stats)
+                            print_stats=print_stats,
+                            seed_variants=seed_variants,
+                            package_cache=package_cache,
+                            profile=profile_solve)
 
         resolver.solve()
 
@@ -290,6 +373,8 @@ class ResolvedContext(object):
         self.failure_description = resolver.failure_description
         self.graph_ = resolver.graph
         self.from_cache = resolver.from_cache
+        self.solve_profile = resolver.solve_profile
+        self.solve_stats = resolver.solve_stats
 
         if self.status_ == ResolverStatus.solved:
             self._resolved_packages = []
@@ -298,6 +383,14 @@ class ResolvedContext(object):
                 variant.set_context(self)
                 self._resolved_packages.append(variant)
 
+        elif self.status_ == ResolverStatus.aborted:
+            self.partial_packages = []
+            self.unresolved_requests = resolver.unresolved_requests
+
+            for variant in resolver.partial_packages:
+                variant.set_context(self)
+                self.partial_packages.append(variant)
+
         # track context usage
         if config.context_tracking_host:
             data = self.to_dict(fields=config.context_tracking_context_fields)
@@ -307,7 +400,7 @@ class ResolvedContext(object):
         request = self.requested_packages(include_implicit=True)
         req_str = " ".join(str(x) for x in request)
         if self.status == ResolverStatus.solved:
-            res_str = " ".join(x.qualified_name for x in self._resolved_packages)
+            res_str = " ".join(x.qualified_name for x in self.resolved_packages)
             return "%s(%s ==> %s)" % (self.status.name, req_str, res_str)
         else:
             return "%s:%s(%s)" % (self.__class__.__name__,
@@ -349,6 +442,11 @@ class ResolvedContext(object):
         Returns:
             List of `Variant` objects, or None if the resolve failed.
         """
+        if self._resolved_package_handles is not None:
+            handles = self._resolved_package_handles
+            self._resolved_package_handles = None
+            self._resolved_packages = self._get_variants(handles)
+
         return self._resolved_packages
 
     def set_load_path(self, path):
@@ -384,16 +482,29 @@ class ResolvedContext(object):
         value = tuple(list_)
         return hash(value)
 
+    @property
+    def graph_string(self):
+        if self._deferred_graph is not None:
+            self.graph_string = self._deferred_graph.load()
+        return self._graph_string
+
+    @graph_string.setter
+    def graph_string(self, value):
+        self._graph_string = value
+        self._deferred_graph = None
+
     @property
     def has_graph(self):
         """Return True if the resolve has a graph."""
-        return bool((self.graph_ is not None) or self.graph_string)
+        return bool((self.graph_ is not None) or
+                    (self._deferred_graph is not None) or
+                    self.graph_string)
 
     def get_resolved_package(self, name):
         """Returns a `Variant` object or None if the package is not in the
         resolve.
         """
-        pkgs = [x for x in self._resolved_packages if x.name == name]
+        pkgs = [x for x in self.resolved_packages if x.name == name]
         return pkgs[0] if pkgs else None
 
     def copy(self):
@@ -513,6 +624,8 @@ class ResolvedContext(object):
             A string or `pygraph.digraph` object, or None if there is no graph
             associated with the resolve.
         """
+        from rez.utils.graph_utils import write_dot, read_graph_from_string
+
         if not self.has_graph:
             return None
 
@@ -535,20 +648,36 @@ class ResolvedContext(object):
 
     def save(self, path):
         """Save the resolved context to file."""
-        with open(path, 'w') as f:
+        mode = "wb" if config.rxt_as_binary else 'w'
+        with open(path, mode) as f:
             self.write_to_buffer(f)
 
     def write_to_buffer(self, buf):
-        """Save the context to a buffer."""
-        doc = self.to_dict()
+        """Save the context to a buffer.
 
-        if config.rxt_as_yaml:
-            content = dump_yaml(doc)
-        else:
-            content = json.dumps(doc, indent=4, separators=(",", ": "))
+        Note that if `config.rxt_as_binary` is True, the buffer must accept
+        bytes. Text streams such as sys.stdout are written to via their
+        underlying binary buffer.
+        """
+        content = self._serialize()
+
+        if config.rxt_as_binary and hasattr(buf, "buffer"):  # text stream
+            buf.flush()
+            buf = buf.buffer
 
         buf.write(content)
 
+    def _serialize(self):
+        # returns the file content of the context, see `write_to_buffer`
+        doc = self.to_dict()
+
+        if config.rxt_as_binary:
+            return binary_context.dumps(doc)
+        elif config.rxt_as_yaml:
+            return dump_yaml(doc)
+        else:
+            return json.dumps(doc, indent=4, separators=(",", ": "))
+
     @classmethod
     def get_current(cls):
         """Get the context for the current env, if there is one.
@@ -563,18 +692,37 @@ class ResolvedContext(object):
         return cls.load(filepath)
 
     @classmethod
-    def load(cls, path):
-        """Load a resolved context from file."""
-        with open(path) as f:
-            context = cls.read_from_buffer(f, path)
+    def load(cls, path, lazy=False):
+        """Load a resolved context from file.
+
+        Args:
+            path (str): Path to the context file.
+            lazy (bool): If True, only parse what is needed up front. The
+                resolved packages are loaded when first accessed, and the
+                resolve graph is not decoded until `graph` is called. This
+                makes loading faster for callers that only need part of the
+                context, but errors (such as a resolved package that no longer
+                exists) are raised on access rather than on load.
+
+        Returns:
+            `ResolvedContext`.
+        """
+        with open(path, "rb") as f:
+            context = cls.read_from_buffer(f, path, lazy=lazy)
         context.set_load_path(path)
         return context
 
     @classmethod
-    def read_from_buffer(cls, buf, identifier_str=None):
-        """Load the context from a buffer."""
+    def read_from_buffer(cls, buf, identifier_str=None, lazy=False):
+        """Load the context from a buffer.
+
+        The buffer may contain a json, yaml or binary context. A binary context
+        can only be read from a buffer that returns bytes.
+
+        See `load` for a description of the `lazy` argument.
+        """
         try:
-            return cls._read_from_buffer(buf, identifier_str)
+            return cls._read_from_buffer(buf, identifier_str, lazy=lazy)
         except Exception as e:
             cls._load_error(e, identifier_str)
 
@@ -617,8 +765,8 @@ class ResolvedContext(object):
                                        "paths differ:\n%s" % '\n'.join(diff))
 
         d = {}
-        self_pkgs_ = set(x.parent for x in self._resolved_packages)
-        other_pkgs_ = set(x.parent for x in other._resolved_packages)
+        self_pkgs_ = set(x.parent for x in self.resolved_packages)
+        other_pkgs_ = set(x.parent for x in other.resolved_packages)
         self_pkgs = self_pkgs_ - other_pkgs_
         other_pkgs = other_pkgs_ - self_pkgs_
         if not (self_pkgs or other_pkgs):
@@ -690,6 +838,19 @@ class ResolvedContext(object):
         if self.status_ in (ResolverStatus.failed, ResolverStatus.aborted):
             _pr("The context failed to resolve:\n%s"
                 % self.failure_description, critical)
+
+            if self.partial_packages:
+                _pr()
+                _pr("partially resolved packages:", heading)
+                for variant in sorted(self.partial_packages,
+                                      key=lambda x: x.name):
+                    _pr(variant.qualified_package_name)
+
+            if self.unresolved_requests:
+                _pr()
+                _pr("unresolved requests:", heading)
+                for request in self.unresolved_requests:
+                    _pr(str(request))
             return
 
         t_str = _rt(self.created)
@@ -898,7 +1059,7 @@ class ResolvedContext(object):
 
         nodes = {}
         edges = set()
-        for variant in self._resolved_packages:
+        for variant in self.resolved_packages:
             nodes[variant.name] = variant.qualified_package_name
             for request in variant.get_requires():
                 if not request.conflict:
@@ -1130,6 +1291,87 @@ class ResolvedContext(object):
         self._execute(executor)
         return interpreter.subprocess(args, **Popen_args)
 
+    @_on_success
+    def exec_command(self, args, parent_environ=None):
+        """Replace the current process with a command run within the context.
+
+        As with `execute_command`, the context is applied to an environ dict,
+        and no shell is configured. The command is exec'd directly, so there is
+        no intermediate shell process, and no shell startup scripts are sourced.
+        This is much faster than `execute_shell`, but shell-specific features
+        (such as shell functions) are not available to the command.
+
+        The command is run in a child process rather than exec'd in these cases,
+        and this function returns its return code:
+        - on Windows, where exec does not replace the current process;
+        - if the context has not been saved to file. The context is written to
+          a temp file for the command to use, which must be cleaned up after.
+
+        As in `execute_shell`, $REZ_CONTEXT_FILE is the context's shell code,
+        which is written for the default shell (see `get_default_shell`). An
+        exec'd command's temp files are not cleaned up, as the process that
+        created them is replaced.
+
+        If the command is a package alias, it is run in a shell instead (see
+        `execute_shell`), since only a shell can run an alias.
+
+        Args:
+            args (list of str): Command arguments.
+            parent_environ: Environment to interpret the context within,
+                defaults to os.environ if None.
+
+        Returns:
+            int: Return code of the command, if it was not exec'd.
+        """
+        # the command runs in this environ only, so it must inherit the parent
+        # environ, rather than just the variables that the context sets
+        if parent_environ is None:
+            parent_environ = os.environ
+        target_environ = parent_environ.copy()
+
+        tmpdir = self.tmpdir_manager.mkdtemp()
+
+        if self.load_path and os.path.isfile(self.load_path):
+            rxt_file = self.load_path
+            exec_ = (platform_.name != "windows")
+        else:
+            rxt_file = os.path.join(tmpdir, "context.rxt")
+            self.save(rxt_file)
+            exec_ = False
+
+        sh = create_shell(get_default_shell())
+        context_file = os.path.join(tmpdir, "context.%s" % sh.file_extension())
+
+        def _execute(interpreter):
+            executor = self._create_executor(interpreter, parent_environ)
+            executor.env.REZ_RXT_FILE = rxt_file
+            executor.env.REZ_CONTEXT_FILE = context_file
+            self._execute(executor)
+            return executor
+
+        interpreter = Python(target_environ=target_environ)
+        executor = _execute(interpreter)
+
+        aliases = set(x.key for x in executor.actions if isinstance(x, Alias))
+        if args[0] in aliases:
+            retcode, _, _ = self.execute_shell(command=args,
+                                               parent_environ=parent_environ,
+                                               block=True)
+            return retcode
+
+        with open(context_file, 'w') as f:
+            f.write(_execute(sh).get_output())
+
+        if not exec_:
+            p = interpreter.subprocess(args)
+            return p.wait()
+
+        try:
+            interpreter.exec_(args)
+        except OSError as e:
+            raise ResolvedContextError("Failed to execute %s: %s"
+                                      % (args[0], str(e)))
+
     @_on_success
     def execute_rex_code(self, code, filename=None, shell=None,
                          parent_environ=None, **Popen_args):
@@ -1317,9 +1559,12 @@ class ResolvedContext(object):
             return (fields is None or field in fields)
 
         if _add("resolved_packages"):
-            resolved_packages = []
-            for pkg in (self._resolved_packages or []):
-                resolved_packages.append(pkg.handle.to_dict())
+            if self._resolved_package_handles is not None:
+                resolved_packages = list(self._resolved_package_handles)
+            else:
+                resolved_packages = []
+                for pkg in (self._resolved_packages or []):
+                    resolved_packages.append(pkg.handle.to_dict())
             data["resolved_packages"] = resolved_packages
 
         if _add("serialize_version"):
@@ -1341,6 +1586,7 @@ class ResolvedContext(object):
             if self.graph_string and self.graph_string.startswith('{'):
                 graph_str = self.graph_string  # already in compact format
             else:
+                from rez.utils.graph_utils import write_compacted
                 g = self.graph()
                 graph_str = write_compacted(g)
 
@@ -1384,7 +1630,7 @@ class ResolvedContext(object):
         return data
 
     @classmethod
-    def from_dict(cls, d, identifier_str=None):
+    def from_dict(cls, d, identifier_str=None, lazy=False):
         """Load a `ResolvedContext` from a dict.
 
         Args:
@@ -1392,6 +1638,8 @@ class ResolvedContext(object):
             identifier_str (str): String identifying the context, this is only
                 used to display in an error string if a serialization version
                 mismatch is detected.
+            lazy (bool): If True, resolved packages are not loaded until they
+                are first accessed.
 
         Returns:
             `ResolvedContext` object.
@@ -1440,21 +1688,30 @@ class ResolvedContext(object):
 
         r.solve_time = d["solve_time"]
         r.load_time = d["load_time"]
+        r.solve_profile = None
+        r.solve_stats = None
+        r.partial_packages = None
+        r.unresolved_requests = None
 
         r.graph_string = d["graph"]
         r.graph_ = None
 
-        r._resolved_packages = []
-        for d_ in d["resolved_packages"]:
-            variant_handle = d_
-            if load_ver < (4, 0):
-                # -- SINCE SERIALIZE VERSION 4.0
-                from rez.utils.backcompat import convert_old_variant_handle
-                variant_handle = convert_old_variant_handle(variant_handle)
+        if isinstance(r.graph_string, _deferred_value_types):
+            r._deferred_graph = r.graph_string
 
-            variant = get_variant(variant_handle)
-            variant.set_context(r)
-            r._resolved_packages.append(variant)
+        variant_handles = d["resolved_packages"]
+        if load_ver < (4, 0):
+            # -- SINCE SERIALIZE VERSION 4.0
+            from rez.utils.backcompat import convert_old_variant_handle
+            variant_handles = [convert_old_variant_handle(x)
+                               for x in variant_handles]
+
+        if lazy:
+            r._resolved_packages = None
+            r._resolved_package_handles = variant_handles
+        else:
+            r._resolved_packages = r._get_variants(variant_handles)
+            r._resolved_package_handles = None
 
         # -- SINCE SERIALIZE VERSION 1
 
@@ -1497,6 +1754,9 @@ class ResolvedContext(object):
             data = dict((k, v) for k, v in d.items()
                         if k in config.context_tracking_context_fields)
 
+            if isinstance(data.get("graph"), _deferred_value_types):
+                data["graph"] = r.graph_string
+
             r._track_context(data, action="sourced")
 
         return r
@@ -1551,17 +1811,72 @@ class ResolvedContext(object):
         )
 
     @classmethod
-    def _read_from_buffer(cls, buf, identifier_str=None):
+    def _read_from_buffer(cls, buf, identifier_str=None, lazy=False):
         content = buf.read()
 
+        if binary_context.is_binary(content):
+            lazy_fields = cls.deferred_json_keys if lazy else None
+            doc = binary_context.loads(content, lazy_fields=lazy_fields)
+            return cls.from_dict(doc, identifier_str, lazy=lazy)
+
+        if not isinstance(content, str):
+            content = content.decode("utf-8")
+
         if content.startswith('{'):  # assume json content
-            doc = json.loads(content)
+            if lazy:
+                doc = cls._read_json_lazily(content)
+            else:
+                doc = json.loads(content)
         else:
             doc = yaml.load(content, Loader=yaml.FullLoader)
 
-        context = cls.from_dict(doc, identifier_str)
+        context = cls.from_dict(doc, identifier_str, lazy=lazy)
         return context
 
+    @classmethod
+    def _read_json_lazily(cls, content):
+        # Parse the top-level object of a json context one value at a time.
+        # Values of the keys in `deferred_json_keys` are not decoded at all,
+        # the (often very large) graph is only decoded if it's used.
+        #
+        doc = {}
+
+        def _skip_ws(pos):
+            return _json_whitespace_regex.match(content, pos).end()
+
+        def _expect(pos, ch):
+            if content[pos:pos + 1] != ch:
+                raise ValueError("Expecting %r at char %d" % (ch, pos))
+            return _skip_ws(pos + 1)
+
+        pos = _expect(0, '{')
+        if content[pos:pos + 1] == '}':
+            return doc
+
+        while True:
+            key, pos = json.raw_decode(content, pos)
+            pos = _expect(_skip_ws(pos), ':')
+
+            if key in cls.deferred_json_keys and content[pos:pos + 1] == '"':
+                end = _find_json_string_end(content, pos)
+                doc[key] = _DeferredJSONString(content[pos:end])
+                pos = end
+            else:
+                doc[key], pos = json.raw_decode(content, pos)
+
+            pos = _skip_ws(pos)
+            if content[pos:pos + 1] == '}':
+                return doc
+            pos = _expect(pos, ',')
+
+    def _get_variants(self, variant_handles):
+        variants = []
+        for variant_handle in variant_handles:
+            variant = get_variant(variant_handle)
+            variant.set_context(self)
+            variants.append(variant)
+        return variants
+
     @classmethod
     def _load_error(cls, e, path=None):
         exc_name = e.__class__.__name__
@@ -1570,6 +1885,25 @@ class ResolvedContext(object):
             msg += " from %s" % path
         raise ResolvedContextError("%s: %s: %s" % (msg, exc_name, str(e)))
 
+    @classmethod
+    def _get_seed_variants(cls, seed_context, request):
+        # a family is affected if any request for it was added, removed or
+        # changed. The variants of all other families are used as seeds
+        if not seed_context.success:
+            return None
+
+        seed_request = seed_context.requested_packages(include_implicit=True)
+        seed_request_strs = set(str(x) for x in seed_request)
+        request_strs = set(str(x) for x in request)
+
+        affected_fams = set(x.name for x in seed_request
+                            if str(x) not in request_strs)
+        affected_fams.update(x.name for x in request
+                             if str(x) not in seed_request_strs)
+
+        return [x for x in seed_context.resolved_packages
+                if x.name not in affected_fams]
+
     def _set_parent_suite(self, suite_path, context_name):
         self.parent_suite_path = suite_path
         self.suite_context_name = context_name
@@ -1595,6 +1929,77 @@ class ResolvedContext(object):
 
     @pool_memcached_connections
     def _execute(self, executor):
+        if config.environ_cache_path:
+            self._execute_packages_cached(executor)
+        else:
+            self._execute_packages(executor)
+
+        header_comment(executor, "post system setup")
+
+        # append suite paths based on suite visibility setting
+        self._append_suite_paths(executor)
+
+        # append system paths
+        executor.append_system_paths()
+
+        # add rez path so that rez commandline tools are still available within
+        # the resolved environment
+        mode = RezToolsVisibility[config.rez_tools_visibility]
+        if mode == RezToolsVisibility.append:
+            executor.append_rez_path()
+        elif mode == RezToolsVisibility.prepend:
+            executor.prepend_rez_path()
+
+    def _execute_packages_cached(self, executor):
+        # replay the package commands from the environ cache if possible (see
+        # config.environ_cache_path), otherwise execute them and cache them
+        from rez.utils.local_cache import LocalCache
+
+        cache = LocalCache(config.environ_cache_path, "environ",
+                           maxsize=config.environ_cache_maxsize)
+
+        key = self._environ_cache_key(executor)
+        recordings = cache.get(key)
+        if recordings is cache.miss:
+            recordings = []
+
+        # there is an entry for each set of env-vars values the commands saw
+        for recording in recordings:
+            if recording.matches(executor.manager):
+                executor.manager.replay(recording)
+                return
+
+        with executor.manager.record() as recording:
+            self._execute_packages(executor)
+
+        recordings.insert(0, recording)
+        cache.set(key, recordings[:self.max_environ_cache_recordings])
+
+    def _environ_cache_key(self, executor):
+        variants = self.resolved_packages or []
+        variant_states = {}
+        Resolver._update_variant_states(variants, variant_states)
+
+        t = ["environ",
+             self.rez_version,
+             self.rez_path,
+             self.timestamp,
+             self.requested_timestamp,
+             self.building,
+             tuple(str(x) for x in self._package_requests),
+             tuple(str(x) for x in self.implicit_packages),
+             tuple(self.package_paths),
+             tuple((x.uri, str(variant_states[x])) for x in variants),
+             executor.interpreter.__class__.__name__,
+             system.platform,
+             system.arch,
+             system.os,
+             config.rez_1_environment_variables,
+             config.disable_rez_1_compatibility]
+
+        return str(tuple(t))
+
+    def _execute_packages(self, executor):
         # bind various info to the execution context
         resolved_pkgs = self.resolved_packages or []
         request_str = ' '.join(str(x) for x in self._package_requests)
@@ -1707,22 +2112,6 @@ class ResolvedContext(object):
         for name in ("this", "version", "root", "base"):
             executor.unbind(name)
 
-        header_comment(executor, "post system setup")
-
-        # append suite paths based on suite visibility setting
-        self._append_suite_paths(executor)
-
-        # append system paths
-        executor.append_system_paths()
-
-        # add rez path so that rez commandline tools are still available within
-        # the resolved environment
-        mode = RezToolsVisibility[config.rez_tools_visibility]
-        if mode == RezToolsVisibility.append:
-            executor.append_rez_path()
-        elif mode == RezToolsVisibility.prepend:
-            executor.prepend_rez_path()
-
     def _append_suite_paths(self, executor):
         from rez.suite import Suite
 
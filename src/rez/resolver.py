@@ -1,11 +1,12 @@
-from rez.solver import Solver, SolverStatus, PackageVariantCache
 from rez.package_repository import package_repository_manager
-from rez.packages import get_variant, get_last_release_time
+from rez.packages import get_variant, get_last_release_times
 from rez.package_filter import PackageFilterList, TimestampRule
 from rez.utils.memcached import memcached_client, pool_memcached_connections
+from rez.utils.local_cache import LocalCache
 from rez.utils.logging_ import log_duration
 from rez.config import config
 from rez.vendor.enum import Enum
+from rez.vendor.version.requirement import Requirement
 from contextlib import contextmanager
 from hashlib import sha1
 import os
@@ -34,7 +35,8 @@ class Resolver(object):
     def __init__(self, context, package_requests, package_paths, package_filter=None,
                  package_orderers=None, timestamp=0, callback=None, building=False,
                  verbosity=False, buf=None, package_load_callback=None, caching=True,
-                 suppress_passive=False, print_stats=False):
+                 suppress_passive=False, print_stats=False, seed_variants=None,
+                 package_cache=None, profile=False):
         """Create a Resolver.
 
         Args:
@@ -51,6 +53,15 @@ class Resolver(object):
             caching: If True, cache(s) may be used to speed the resolve. If
                 False, caches will not be used.
             print_stats (bool): If true, print advanced solver stats at the end.
+            seed_variants (list of `Variant`): Variants from a previous resolve.
+                If provided, the solve first tries to keep the same versions of
+                these packages, and only does a full solve if that fails. The
+                resolve cache is not used in this case.
+            package_cache (`PackageVariantCache`): Package cache to share with
+                other resolves, see `Solver`.
+            profile (bool): If True, profile the solve (see `SolveProfile`).
+                The resolve cache is not used in this case, since a cached
+                resolve has no solve to profile.
         """
         self.context = context
         self.package_requests = package_requests
@@ -65,6 +76,9 @@ class Resolver(object):
         self.buf = buf
         self.suppress_passive = suppress_passive
         self.print_stats = print_stats
+        self.seed_variants = seed_variants
+        self.package_cache = package_cache
+        self.profile = profile
 
         # store hash of package orderers. This is used in the memcached key
         if package_orderers:
@@ -97,9 +111,14 @@ class Resolver(object):
         self.graph_ = None
         self.from_cache = False
         self.memcached_servers = config.memcached_uri if config.resolve_caching else None
+        self.resolve_cache_path = config.resolve_cache_path if config.resolve_caching else None
 
         self.solve_time = 0.0  # time spent solving
         self.load_time = 0.0   # time spent loading package resources
+        self.solve_profile = None  # see `SolveProfile`
+        self.solve_stats = None  # see `Solver.solve_stats`
+        self.partial_packages_ = None
+        self.unresolved_requests_ = None
 
         self._print = config.debug_printer("resolve_memcache")
 
@@ -107,6 +126,13 @@ class Resolver(object):
     def solve(self):
         """Perform the solve.
         """
+        if self.seed_variants or self.profile:
+            # a seeded solve may differ from a full solve of the same request,
+            # so it is never cached
+            solver = self._solve()
+            self._set_result(self._solver_to_dict(solver))
+            return
+
         with log_duration(self._print, "memcache get (resolve) took %s"):
             solver_dict = self._get_cached_solve()
 
@@ -141,6 +167,26 @@ class Resolver(object):
         """
         return self.resolved_packages_
 
+    @property
+    def partial_packages(self):
+        """Get the packages of the best partial resolve, if aborted.
+
+        Returns:
+            List of `Variant` objects, or None if the resolve was not aborted.
+        """
+        return self.partial_packages_
+
+    @property
+    def unresolved_requests(self):
+        """Get the requests left unresolved by the best partial resolve, if
+        aborted.
+
+        Returns:
+            List of `Requirement` objects, or None if the resolve was not
+            aborted.
+        """
+        return self.unresolved_requests_
+
     @property
     def graph(self):
         """Return the resolve graph.
@@ -156,7 +202,10 @@ class Resolver(object):
         return get_variant(variant_handle, context=self.context)
 
     def _get_cached_solve(self):
-        """Find a memcached resolve.
+        """Find a cached resolve.
+
+        The resolve cache is either memcached, or the local resolve cache (see
+        `_resolve_cache_client`). The same rules apply to both.
 
         If there is NOT a resolve timestamp:
             - fetch a non-timestamped memcache entry;
@@ -196,7 +245,7 @@ class Resolver(object):
         consider a workflow where a work area is tied down to a particular
         timestamp in order to 'lock' it from any further software releases).
         """
-        if not (self.caching and self.memcached_servers):
+        if not self._caching_enabled():
             return None
 
         # these caches avoids some potentially repeated file stats
@@ -212,37 +261,35 @@ class Resolver(object):
             return None
 
         def _delete_cache_entry(key):
-            with self._memcached_client() as client:
+            with self._resolve_cache_client() as client:
                 client.delete(key)
             self._print("Discarded entry: %r", key)
 
         def _retrieve(timestamped):
             key = self._memcache_key(timestamped=timestamped)
             self._print("Retrieving memcache key: %r", key)
-            with self._memcached_client() as client:
+            with self._resolve_cache_client() as client:
                 data = client.get(key)
             return key, data
 
         def _packages_changed(key, data):
             solver_dict, _, variant_states_dict = data
-            for variant_handle in solver_dict.get("variant_handles", []):
-                variant = self._get_variant(variant_handle)
+            variants = [self._get_variant(x)
+                        for x in solver_dict.get("variant_handles", [])]
+
+            try:
+                self._update_variant_states(variants, variant_states)
+            except (IOError, OSError) as e:
+                # if, ie a package file was deleted on disk, then an IOError
+                # or OSError will be raised when we try to read from it -
+                # assume that the packages have changed!
+                self._print("Error loading variant states (assuming cached "
+                            "state changed): %s", e)
+                return True
+
+            for variant in variants:
                 old_state = variant_states_dict.get(variant.name)
-
-                new_state = variant_states.get(variant)
-                if new_state is None:
-                    try:
-                        repo = variant.resource._repository
-                        new_state = repo.get_variant_state_handle(variant.resource)
-                    except (IOError, OSError) as e:
-                        # if, ie a package file was deleted on disk, then
-                        # an IOError or OSError will be raised when we try to
-                        # read from it - assume that the packages have changed!
-                        self._print("Error loading %r (assuming cached state "
-                                    "changed): %s", variant.qualified_name,
-                                    e)
-                        return True
-                    variant_states[variant] = new_state
+                new_state = variant_states[variant]
 
                 if old_state != new_state:
                     self._print("%r has been modified", variant.qualified_name)
@@ -251,12 +298,14 @@ class Resolver(object):
 
         def _releases_since_solve(key, data):
             _, release_times_dict, _ = data
-            for package_name, release_time in release_times_dict.items():
-                time_ = last_release_times.get(package_name)
-                if time_ is None:
-                    time_ = get_last_release_time(package_name, self.package_paths)
-                    last_release_times[package_name] = time_
+            names = [x for x in release_times_dict.keys()
+                     if x not in last_release_times]
+            if names:
+                last_release_times.update(
+                    get_last_release_times(names, self.package_paths))
 
+            for package_name, release_time in release_times_dict.items():
+                time_ = last_release_times[package_name]
                 if time_ != release_time:
                     self._print(
                         "A newer version of %r (%d) has been released since the "
@@ -307,8 +356,27 @@ class Resolver(object):
                               debug=config.debug_memcache) as client:
             yield client
 
+    def _caching_enabled(self):
+        return bool(self.caching and
+                    (self.memcached_servers or self.resolve_cache_path))
+
+    @contextmanager
+    def _resolve_cache_client(self):
+        """Get a client for the resolve cache.
+
+        Memcached is used if configured, otherwise the local resolve cache (see
+        'resolve_cache_path' config setting). Both clients provide the same
+        get/set/delete interface.
+        """
+        if self.memcached_servers:
+            with self._memcached_client() as client:
+                yield client
+        else:
+            yield LocalCache(self.resolve_cache_path, "resolves",
+                             maxsize=config.resolve_cache_maxsize)
+
     def _set_cached_solve(self, solver_dict):
-        """Store a solve to memcached.
+        """Store a solve to the resolve cache.
 
         If there is NOT a resolve timestamp:
             - store the solve to a non-timestamped entry.
@@ -322,7 +390,7 @@ class Resolver(object):
         if self.status_ != ResolverStatus.solved:
             return  # don't cache failed solves
 
-        if not (self.caching and self.memcached_servers):
+        if not self._caching_enabled():
             return
 
         # most recent release times get stored with solve result in the cache
@@ -330,8 +398,14 @@ class Resolver(object):
         release_times_dict = {}
         variant_states_dict = {}
 
-        for variant in self.resolved_packages_:
-            time_ = get_last_release_time(variant.name, self.package_paths)
+        variants = self.resolved_packages_
+        last_release_times = get_last_release_times(
+            [x.name for x in variants], self.package_paths)
+        variant_states = {}
+        self._update_variant_states(variants, variant_states)
+
+        for variant in variants:
+            time_ = last_release_times[variant.name]
 
             # don't cache if a release time isn't known
             if time_ == 0:
@@ -344,17 +418,34 @@ class Resolver(object):
                 releases_since_solve = True
 
             release_times_dict[variant.name] = time_
-            repo = variant.resource._repository
-            variant_states_dict[variant.name] = \
-                repo.get_variant_state_handle(variant.resource)
+            variant_states_dict[variant.name] = variant_states[variant]
 
         timestamped = (self.timestamp and releases_since_solve)
         key = self._memcache_key(timestamped=timestamped)
         data = (solver_dict, release_times_dict, variant_states_dict)
-        with self._memcached_client() as client:
+        with self._resolve_cache_client() as client:
             client.set(key, data)
         self._print("Sent memcache key: %r", key)
 
+    @classmethod
+    def _update_variant_states(cls, variants, variant_states):
+        """Get the state handles of variants not yet in `variant_states`.
+
+        State handles are queried in bulk from each repository, rather than one
+        variant at a time, because this can involve a file stat per variant.
+        """
+        variants_by_repo = {}
+        for variant in variants:
+            if variant not in variant_states:
+                repo = variant.resource._repository
+                _, variants_ = variants_by_repo.setdefault(repo.uid, (repo, []))
+                variants_.append(variant)
+
+        for repo, variants_ in variants_by_repo.values():
+            states = repo.get_variant_state_handles(
+                [x.resource for x in variants_])
+            variant_states.update(zip(variants_, states))
+
     def _memcache_key(self, timestamped=False):
         """Makes a key suitable as a memcache entry."""
         request = tuple(map(str, self.package_requests))
@@ -377,23 +468,52 @@ class Resolver(object):
         return str(tuple(t))
 
     def _solve(self):
-        solver = Solver(package_requests=self.package_requests,
-                        package_paths=self.package_paths,
-                        context=self.context,
-                        package_filter=self.package_filter,
-                        package_orderers=self.package_orderers,
-                        callback=self.callback,
-                        package_load_callback=self.package_load_callback,
-                        building=self.building,
-                        verbosity=self.verbosity,
-                        prune_unfailed=config.prune_failed_graph,
-                        buf=self.buf,
-                        suppress_passive=self.suppress_passive,
-                        print_stats=self.print_stats)
+        from rez.solver import SolverStatus, SolverCallbackReturn
+
+        if self.seed_variants:
+            # weak requests are used, so that a seed package that is no longer
+            # needed drops out of the resolve
+            seed_requests = [
+                Requirement("~%s==%s" % (x.name, str(x.version)))
+                for x in self.seed_variants]
+
+            solver = self._create_solver(self.package_requests + seed_requests)
+            solver.solve()
+            self.solve_profile = solver.profile
+            self.solve_stats = solver.solve_stats
+
+            # a solve stopped by the callback (max_fails or a time limit) is
+            # not retried, since the retry would start with a fresh budget
+            if solver.status != SolverStatus.failed or \
+                    solver.callback_return == SolverCallbackReturn.fail:
+                return solver
+
+        solver = self._create_solver(self.package_requests)
         solver.solve()
+        self.solve_profile = solver.profile
+        self.solve_stats = solver.solve_stats
 
         return solver
 
+    def _create_solver(self, package_requests):
+        from rez.solver import Solver
+
+        return Solver(package_requests=package_requests,
+                      package_paths=self.package_paths,
+                      context=self.context,
+                      package_filter=self.package_filter,
+                      package_orderers=self.package_orderers,
+                      callback=self.callback,
+                      package_load_callback=self.package_load_callback,
+                      building=self.building,
+                      verbosity=self.verbosity,
+                      prune_unfailed=config.prune_failed_graph,
+                      buf=self.buf,
+                      suppress_passive=self.suppress_passive,
+                      print_stats=self.print_stats,
+                      package_cache=self.package_cache,
+                      profile=self.profile)
+
     def _set_result(self, solver_dict):
         self.status_ = solver_dict.get("status")
         self.graph_ = solver_dict.get("graph")
@@ -409,18 +529,37 @@ class Resolver(object):
                 variant = self._get_variant(variant_handle)
                 self.resolved_packages_.append(variant)
 
+        self.partial_packages_ = None
+        self.unresolved_requests_ = None
+        if self.status_ == ResolverStatus.aborted:
+            self.partial_packages_ = [
+                self._get_variant(x)
+                for x in solver_dict.get("partial_variant_handles", [])]
+
+            self.unresolved_requests_ = [
+                Requirement(x)
+                for x in solver_dict.get("unresolved_requests", [])]
+
     @classmethod
     def _solver_to_dict(cls, solver):
+        from rez.solver import SolverStatus
+
         graph_ = solver.get_graph()
         solve_time = solver.solve_time
         load_time = solver.load_time
         failure_description = None
         variant_handles = None
+        partial_variant_handles = None
+        unresolved_requests = None
 
         st = solver.status
         if st == SolverStatus.unsolved:
             status_ = ResolverStatus.aborted
             failure_description = solver.abort_reason
+
+            variants, requests = solver.get_partial_resolve()
+            partial_variant_handles = [x.handle for x in variants]
+            unresolved_requests = [str(x) for x in requests]
         elif st == SolverStatus.failed:
             status_ = ResolverStatus.failed
             failure_description = solver.failure_description()
@@ -438,7 +577,9 @@ class Resolver(object):
             solve_time=solve_time,
             load_time=load_time,
             failure_description=failure_description,
-            variant_handles=variant_handles)
+            variant_handles=variant_handles,
+            partial_variant_handles=partial_variant_handles,
+            unresolved_requests=unresolved_requests)
 
 
 # Copyright 2013-2016 Allan Johns.
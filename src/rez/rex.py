@@ -17,9 +17,9 @@ from rez.exceptions import RexError, RexUndefinedVariableError, \
 from rez.util import shlex_join, is_non_string_iterable
 from rez.utils import reraise
 from rez.utils.execution import Popen
-from rez.utils.sourcecode import SourceCode, SourceCodeError
+from rez.utils.sourcecode import SourceCode, SourceCodeError, bytecode_cache
 from rez.utils.data_utils import AttrDictWrapper
-from rez.utils.formatting import expandvars
+from rez.utils.formatting import expandvars, ENV_VAR_REGEX
 from rez.utils.platform_ import platform_
 from rez.vendor.enum import Enum
 from rez.vendor.six import six
@@ -169,6 +169,46 @@ Shebang.register()
 # Action Manager
 #===============================================================================
 
+class ActionRecording(object):
+    """A record of the actions applied by an `ActionManager`.
+
+    A recording can be replayed into another manager (see
+    `ActionManager.replay`), which applies the same actions without executing
+    the code that originally produced them. Actions are stored after their
+    arguments have been formatted, so no bindings (such as 'root') are needed to
+    replay them.
+
+    As well as the actions, the recording stores the value of each environment
+    variable that was read (via getenv, defined etc) before the recorded
+    actions changed it. A recording is only valid for another manager if those
+    values are the same there (see `matches`).
+    """
+    def __init__(self):
+        self.calls = []        # [(method-name, args)]
+        self.environ = {}      # {var-name: value, or None if not set}
+        self.changed = set()   # vars changed by the recorded actions
+
+    def matches(self, manager):
+        """Test whether this recording is valid in the given manager's
+        current environment.
+
+        Returns:
+            bool: True if every variable read during the recording has the
+            same value in `manager`.
+        """
+        for key, value in self.environ.items():
+            if manager._visible_value(key) != value:
+                return False
+        return True
+
+    def __getstate__(self):
+        return (self.calls, self.environ)
+
+    def __setstate__(self, state):
+        self.calls, self.environ = state
+        self.changed = set()
+
+
 class OutputStyle(Enum):
     """ Enum to represent the style of code output when using Rex.
     """
@@ -176,12 +216,42 @@ class OutputStyle(Enum):
     eval = ("Code in a form that can be evaluated.", )
 
 
+class _PendingPathVariable(object):
+    """A path-like variable whose changes have not yet been applied to the
+    interpreter. See `ActionManager.apply_pending_paths`.
+    """
+    def __init__(self, unexpanded_key, env_sep):
+        self.unexpanded_key = unexpanded_key
+        self.env_sep = env_sep
+
+        # each is a list of (unexpanded, expanded) values
+        self.prepends = []
+        self.appends = []
+
+        # reference to the var's value before any changes, if it had one
+        self.base = None
+
+    def groups(self):
+        """Get the var's values, in order.
+
+        Returns:
+            List of (unexpanded, expanded, is_reference) tuples.
+        """
+        groups = [x + (False,) for x in self.prepends[::-1]]
+        if self.base is not None:
+            groups.append(self.base + (True,))
+        groups.extend(x + (False,) for x in self.appends)
+        return groups
+
+
 class ActionManager(object):
     """Handles the execution book-keeping.  Tracks env variable values, and
     triggers the callbacks of the `ActionInterpreter`.
     """
     def __init__(self, interpreter, parent_environ=None, parent_variables=None,
-                 formatter=None, verbose=False, env_sep_map=None):
+                 formatter=None, verbose=False, env_sep_map=None,
+                 dedup_paths=None, prune_missing_paths=None,
+                 coalesce_pends=None):
         '''
         interpreter: string or `ActionInterpreter`
             the interpreter to use when executing rex actions
@@ -196,6 +266,17 @@ class ActionManager(object):
             if True, causes commands to print additional feedback (using info()).
             can also be set to a list of strings matching command names to add
             verbosity to only those commands.
+        dedup_paths: bool
+            if True, duplicate entries are removed from path-like variables.
+            Defaults to config.dedup_path_variables.
+        prune_missing_paths: bool
+            if True, entries that do not exist are also removed from path-like
+            variables. Only applies if dedup_paths is True. Defaults to
+            config.prune_missing_paths.
+        coalesce_pends: bool
+            if True, consecutive appends/prepends to a variable are applied to
+            the interpreter as a single setenv. Defaults to
+            config.coalesce_env_var_pends.
         '''
         self.interpreter = interpreter
         self.verbose = verbose
@@ -209,6 +290,81 @@ class ActionManager(object):
         self._env_sep_map = env_sep_map if env_sep_map is not None \
             else config.env_var_separators
 
+        self._recording = None  # see `record`
+
+        # Path-like variables (those appended/prepended to, with a separator
+        # other than whitespace) are not applied to the interpreter as they are
+        # changed. Instead, their entries are held in `_pending_paths`, and
+        # applied in one setenv - minus any duplicate entries - when the var's
+        # value is next needed (see `apply_pending_paths`). If `coalesce_pends`
+        # is set, this is done for all appended/prepended variables, but
+        # entries are only removed from path-like ones.
+        #
+        self.dedup_paths = config.dedup_path_variables \
+            if dedup_paths is None else dedup_paths
+        self.prune_missing_paths = config.prune_missing_paths \
+            if prune_missing_paths is None else prune_missing_paths
+        self.coalesce_pends = config.coalesce_env_var_pends \
+            if coalesce_pends is None else coalesce_pends
+
+        self._pending_paths = {}
+
+        # entries that have been applied to path-like variables, when the
+        # interpreter does not expand variables
+        self._applied_paths = {}
+
+        # per-variable counts of entries, and of entries removed, by
+        # `apply_pending_paths`
+        self.path_stats = {}
+
+    @contextmanager
+    def record(self):
+        """Record the actions applied within this context.
+
+        Yields:
+            `ActionRecording`: The recording, which is complete once the
+            context exits.
+        """
+        recording = ActionRecording()
+        self._recording = recording
+        try:
+            yield recording
+        finally:
+            self._recording = None
+
+    def replay(self, recording):
+        """Apply the actions in a recording.
+
+        Args:
+            recording (`ActionRecording`): Recording to replay.
+        """
+        # arguments were formatted when recorded, so must not be again
+        formatter = self.formatter
+        self.formatter = str
+
+        try:
+            for name, args in recording.calls:
+                getattr(self, name)(*args)
+        finally:
+            self.formatter = formatter
+
+    def _record_call(self, name, args, key=None):
+        if self._recording is not None:
+            self._recording.calls.append((name, args))
+            if key is not None:
+                self._recording.changed.add(key)
+
+    def _record_read(self, key):
+        recording = self._recording
+        if recording is not None and key not in recording.changed \
+                and key not in recording.environ:
+            recording.environ[key] = self._visible_value(key)
+
+    def _visible_value(self, key):
+        if key in self.environ:
+            return self.environ[key]
+        return self.parent_environ.get(key)
+
     def get_action_methods(self):
         """
         return a list of methods on this class for executing actions.
@@ -273,12 +429,130 @@ class ActionManager(object):
         return unexpanded_value, expanded_value
 
     def get_output(self, style=OutputStyle.file):
+        self.apply_pending_paths()
         return self.interpreter.get_output(style=style)
 
+    def apply_pending_paths(self, keys=None):
+        """Apply pending changes to path-like variables to the interpreter.
+
+        Duplicate entries (and missing entries, if `prune_missing_paths` is
+        set) are removed in the process. See `dedup_paths`. If `coalesce_pends`
+        is set, this also applies the other appended/prepended variables.
+
+        Args:
+            keys (list of str): Variables to apply, all pending variables if
+                None.
+        """
+        if keys is None:
+            keys = list(self._pending_paths.keys())
+
+        for key in keys:
+            pending = self._pending_paths.pop(key)
+            if self._is_dedup_variable(key):
+                entries, unexpanded_entries = \
+                    self._dedup_path_groups(key, pending)
+            else:
+                groups = pending.groups()
+                entries = [x[1] for x in groups]
+                unexpanded_entries = [x[0] for x in groups]
+
+            env_sep = pending.env_sep
+            self.environ[key] = env_sep.join(str(x) for x in entries)
+
+            if self.interpreter.expand_env_vars:
+                key_, value = key, EscapedString.join(env_sep, entries)
+            else:
+                # all the var's new entries were duplicates
+                if pending.base is not None and \
+                        unexpanded_entries == [pending.base[0]]:
+                    continue
+
+                key_ = pending.unexpanded_key
+                value = EscapedString.join(env_sep, unexpanded_entries)
+            self.interpreter.setenv(key_, value)
+
+    def _dedup_path_groups(self, key, pending):
+        # Groups are the values passed to each append/prepend. When the
+        # interpreter does not expand variables, groups whose unexpanded value
+        # cannot be split into entries - such as a reference to the variable's
+        # existing value - are kept whole.
+        #
+        env_sep = pending.env_sep
+        expand = self.interpreter.expand_env_vars
+        seen = set()
+        entries = []
+        unexpanded_entries = []
+        applied = self._applied_paths.get(key, set())
+
+        stats = self.path_stats.setdefault(
+            key, {"entries": 0, "duplicates": 0, "missing": 0})
+
+        def _keep(entry):
+            stats["entries"] += 1
+            if entry in seen:
+                stats["duplicates"] += 1
+                return False
+            if self.prune_missing_paths and os.path.isabs(entry) \
+                    and not os.path.exists(entry):
+                stats["missing"] += 1
+                return False
+
+            seen.add(entry)
+            return True
+
+        for unexpanded_value, expanded_value, is_reference in pending.groups():
+            expanded_parts = str(expanded_value).split(env_sep)
+
+            if expand:
+                entries.extend(x for x in expanded_parts if _keep(x))
+                continue
+
+            unexpanded_parts = \
+                EscapedString.promote(unexpanded_value).split(env_sep)
+
+            if not is_reference and \
+                    len(unexpanded_parts) == len(expanded_parts):
+                for unexpanded_part, part in zip(unexpanded_parts,
+                                                 expanded_parts):
+                    if _keep(part):
+                        entries.append(part)
+                        unexpanded_entries.append(unexpanded_part)
+            else:
+                # A reference's value is only known when the code is run, but
+                # it will contain the entries that have already been applied
+                if is_reference:
+                    seen.update(applied)
+                else:
+                    seen.update(expanded_parts)
+
+                stats["entries"] += len(expanded_parts)
+                entries.extend(expanded_parts)
+                unexpanded_entries.append(unexpanded_value)
+
+        if not expand:
+            self._applied_paths[key] = seen
+        return entries, unexpanded_entries
+
+    def _apply_referenced_paths(self, *values):
+        # apply any pending path-like variables that an action refers to, so
+        # that it sees their current value
+        if self._pending_paths:
+            txt = ' '.join(str(x) for x in values)
+            keys = [x for x in self._pending_paths
+                    if re.search(r"\b%s\b" % re.escape(x), txt)]
+            self.apply_pending_paths(keys)
+
+    def _is_dedup_variable(self, key):
+        return bool(self.dedup_paths and self._env_sep(key).strip())
+
+    def _is_path_variable(self, key):
+        return self.coalesce_pends or self._is_dedup_variable(key)
+
     # -- Commands
 
     def undefined(self, key):
         _, expanded_key = self._key(key)
+        self._record_read(expanded_key)
         return (expanded_key not in self.environ
                 and expanded_key not in self.parent_environ)
 
@@ -288,10 +562,16 @@ class ActionManager(object):
     def expandvars(self, value, format=True):
         if format:
             value = str(self._format(value))
+
+        if self._recording is not None:
+            for match in ENV_VAR_REGEX.finditer(value):
+                self._record_read(match.group(1).strip("{}"))
+
         return str(self._expand(value))
 
     def getenv(self, key):
         _, expanded_key = self._key(key)
+        self._record_read(expanded_key)
         try:
             return self.environ[expanded_key] if expanded_key in self.environ \
                 else self.parent_environ[expanded_key]
@@ -301,11 +581,15 @@ class ActionManager(object):
 
     def setenv(self, key, value):
         unexpanded_key, expanded_key = self._key(key)
+        self._apply_referenced_paths(expanded_key, self._format(value))
         unexpanded_value, expanded_value = self._value(value)
 
         # TODO: check if value has already been set by another package
+        self._record_call("setenv", (unexpanded_key, unexpanded_value),
+                          expanded_key)
         self.actions.append(Setenv(unexpanded_key, unexpanded_value))
         self.environ[expanded_key] = str(expanded_value)
+        self._applied_paths.pop(expanded_key, None)
 
         if self.interpreter.expand_env_vars:
             key, value = expanded_key, expanded_value
@@ -315,10 +599,13 @@ class ActionManager(object):
 
     def unsetenv(self, key):
         unexpanded_key, expanded_key = self._key(key)
+        self._apply_referenced_paths(expanded_key)
+        self._record_call("unsetenv", (unexpanded_key,), expanded_key)
         self.actions.append(Unsetenv(unexpanded_key))
 
         if expanded_key in self.environ:
             del self.environ[expanded_key]
+            self._applied_paths.pop(expanded_key, None)
         if self.interpreter.expand_env_vars:
             key = expanded_key
         else:
@@ -327,11 +614,16 @@ class ActionManager(object):
 
     def resetenv(self, key, value, friends=None):
         unexpanded_key, expanded_key = self._key(key)
+        self._apply_referenced_paths(expanded_key, self._format(value))
         unexpanded_value, expanded_value = self._value(value)
 
+        self._record_call("resetenv",
+                          (unexpanded_key, unexpanded_value, friends),
+                          expanded_key)
         action = Resetenv(unexpanded_key, unexpanded_value, friends)
         self.actions.append(action)
         self.environ[expanded_key] = str(expanded_value)
+        self._applied_paths.pop(expanded_key, None)
 
         if self.interpreter.expand_env_vars:
             key, value = expanded_key, expanded_value
@@ -341,7 +633,16 @@ class ActionManager(object):
 
     def _pendenv(self, key, value, action, interpfunc, addfunc):
         unexpanded_key, expanded_key = self._key(key)
+
+        is_path_var = self._is_path_variable(expanded_key)
+        if is_path_var:
+            self._apply_referenced_paths(self._format(value))
+        else:
+            self._apply_referenced_paths(expanded_key, self._format(value))
+
         unexpanded_value, expanded_value = self._value(value)
+        self._record_call(action.name, (unexpanded_key, unexpanded_value),
+                          expanded_key)
 
         # expose env-vars from parent env if explicitly told to do so
         if (expanded_key not in self.environ) and \
@@ -353,6 +654,17 @@ class ActionManager(object):
                 key_ = unexpanded_key
             self.interpreter._saferefenv(key_)
 
+        if is_path_var:
+            pending = self._pending_paths.get(expanded_key)
+            if pending is None:
+                pending = _PendingPathVariable(unexpanded_key,
+                                               self._env_sep(expanded_key))
+                self._pending_paths[expanded_key] = pending
+
+                if expanded_key in self.environ:
+                    pending.base = (self._keytoken(expanded_key),
+                                    self.environ[expanded_key])
+
         # *pend or setenv depending on whether this is first reference to the var
         if expanded_key in self.environ:
             env_sep = self._env_sep(expanded_key)
@@ -362,8 +674,11 @@ class ActionManager(object):
             unexpanded_values = EscapedString.join(env_sep, values)
 
             parts = self.environ[expanded_key].split(env_sep)
-            values = addfunc(expanded_value, parts)
-            expanded_values = EscapedString.join(env_sep, values)
+
+            # only needed if the interpreter cannot append/prepend, see below
+            def _expanded_values():
+                values = addfunc(expanded_value, parts)
+                return EscapedString.join(env_sep, values)
 
             self.environ[expanded_key] = \
                 env_sep.join(addfunc(str(expanded_value), parts))
@@ -371,9 +686,20 @@ class ActionManager(object):
             self.actions.append(Setenv(unexpanded_key, unexpanded_value))
             self.environ[expanded_key] = str(expanded_value)
             unexpanded_values = unexpanded_value
-            expanded_values = expanded_value
             interpfunc = None
 
+            def _expanded_values():
+                return expanded_value
+
+        if is_path_var:
+            # the interpreter is updated later, see `apply_pending_paths`
+            group = (unexpanded_value, expanded_value)
+            if action is Prependenv:
+                pending.prepends.append(group)
+            else:
+                pending.appends.append(group)
+            return
+
         applied = False
         if interpfunc:
             if self.interpreter.expand_env_vars:
@@ -388,7 +714,7 @@ class ActionManager(object):
 
         if not applied:
             if self.interpreter.expand_env_vars:
-                key, value = expanded_key, expanded_values
+                key, value = expanded_key, _expanded_values()
             else:
                 key, value = unexpanded_key, unexpanded_values
             self.interpreter.setenv(key, value)
@@ -404,16 +730,22 @@ class ActionManager(object):
     def alias(self, key, value):
         key = str(self._format(key))
         value = str(self._format(value))
+        self._apply_referenced_paths(value)
+        self._record_call("alias", (key, value))
         self.actions.append(Alias(key, value))
         self.interpreter.alias(key, value)
 
     def info(self, value=''):
         value = self._format(value)
+        self._apply_referenced_paths(value)
+        self._record_call("info", (value,))
         self.actions.append(Info(value))
         self.interpreter.info(value)
 
     def error(self, value):
         value = self._format(value)
+        self._apply_referenced_paths(value)
+        self._record_call("error", (value,))
         self.actions.append(Error(value))
         self.interpreter.error(value)
 
@@ -423,20 +755,26 @@ class ActionManager(object):
 
     def command(self, value):
         # Note: Value is deliberately not formatted in commands
+        self.apply_pending_paths()  # the command sees the whole environment
+        self._record_call("command", (value,))
         self.actions.append(Command(value))
         self.interpreter.command(value)
 
     def comment(self, value):
         value = str(self._format(value))
+        self._record_call("comment", (value,))
         self.actions.append(Comment(value))
         self.interpreter.comment(value)
 
     def source(self, value):
         value = str(self._format(value))
+        self.apply_pending_paths()  # the sourced file sees the whole environment
+        self._record_call("source", (value,))
         self.actions.append(Source(value))
         self.interpreter.source(value)
 
     def shebang(self):
+        self._record_call("shebang", ())
         self.actions.append(Shebang())
         self.interpreter.shebang()
 
@@ -588,6 +926,7 @@ class Python(ActionInterpreter):
         '''
         self.passive = passive
         self.manager = None
+        self._unset_keys = set()
         if (target_environ is None) or (target_environ is os.environ):
             self.target_environ = os.environ
             self.update_session = True
@@ -605,8 +944,7 @@ class Python(ActionInterpreter):
             raise RezSystemError("You must call 'set_manager' on a Python rex "
                                  "interpreter before using it.")
 
-        self.target_environ.update(self.manager.environ)
-        self.adjust_env_for_platform(self.target_environ)
+        self._update_target_environ()
 
     def get_output(self, style=OutputStyle.file):
         self.apply_environ()
@@ -619,7 +957,8 @@ class Python(ActionInterpreter):
                 sys.path = value.split(os.pathsep)
 
     def unsetenv(self, key):
-        pass
+        # removed from the target environ when the manager's environ is applied
+        self._unset_keys.add(key)
 
     def resetenv(self, key, value, friends=None):
         pass
@@ -647,9 +986,7 @@ class Python(ActionInterpreter):
             print(value, file=sys.stderr)
 
     def subprocess(self, args, **subproc_kwargs):
-        if self.manager:
-            self.target_environ.update(self.manager.environ)
-        self.adjust_env_for_platform(self.target_environ)
+        self._update_target_environ()
 
         shell_mode = isinstance(args, basestring)
         return Popen(args,
@@ -657,6 +994,35 @@ class Python(ActionInterpreter):
                      env=self.target_environ,
                      **subproc_kwargs)
 
+    def exec_(self, args):
+        """Replace the current process with the given command.
+
+        The executable is searched for on the target environ's PATH, and is
+        run in the target environ. This does not return.
+
+        Args:
+            args (list of str): Command arguments.
+        """
+        self._update_target_environ()
+
+        # any buffered output would be lost
+        sys.stdout.flush()
+        sys.stderr.flush()
+
+        os.execvpe(args[0], args, self.target_environ)
+
+    def _update_target_environ(self):
+        if self.manager:
+            self.manager.apply_pending_paths()
+
+            # a var that is set again after being unset is in the manager's
+            # environ, so is restored by the update
+            for key in self._unset_keys:
+                self.target_environ.pop(key, None)
+            self.target_environ.update(self.manager.environ)
+
+        self.adjust_env_for_platform(self.target_environ)
+
     def command(self, value):
         if self.passive:
             return
@@ -907,13 +1273,27 @@ class EscapedString(object):
         if not values:
             return EscapedString('')
 
+        # gather runs of literal/expandable strings, and join each run once,
+        # rather than concatenating the result as it is built up
+        runs = []
+
+        def _add(value):
+            for is_literal, s in EscapedString.promote(value).strings:
+                if runs and runs[-1][0] == is_literal:
+                    runs[-1][1].append(s)
+                else:
+                    runs.append((is_literal, [s]))
+
         it = iter(values)
-        result = EscapedString.promote(next(it))
+        _add(next(it))
 
         for value in it:
-            result = result + sep
-            result = result + value
+            _add(sep)
+            _add(value)
 
+        result = EscapedString.__new__(EscapedString)
+        result.strings = [(is_literal, ''.join(strings))
+                          for is_literal, strings in runs]
         return result
 
     @classmethod
@@ -1050,6 +1430,7 @@ class EnvironmentDict(DictMixin):
         self[key].set(value)
 
     def __contains__(self, key):
+        self.manager._record_read(key)
         return (key in self._var_cache)
 
     def __delitem__(self, key):
@@ -1248,11 +1629,19 @@ class RexExecutor(object):
 
     def append_system_paths(self):
         """Append system paths to $PATH."""
-        from rez.shells import Shell, create_shell
-        sh = self.interpreter if isinstance(self.interpreter, Shell) \
-            else create_shell()
+        from rez.shells import Shell, get_shell_class, get_default_shell
+
+        if isinstance(self.interpreter, Shell):
+            paths = self.interpreter.get_syspaths()
+        elif config.standard_system_paths:
+            # avoids loading the shell plugins
+            paths = config.standard_system_paths
+        else:
+            # no shell is being configured (see `exec_command`), so don't
+            # detect the current shell, which runs 'ps'. Any shell can give the
+            # system paths, so use the default one
+            paths = get_shell_class(get_default_shell()).get_syspaths()
 
-        paths = sh.get_syspaths()
         paths_str = os.pathsep.join(paths)
         self.env.PATH.append(paths_str)
 
@@ -1291,7 +1680,7 @@ class RexExecutor(object):
             if isinstance(code, SourceCode):
                 pyc = code.compiled
             else:
-                pyc = compile(code, filename, 'exec')
+                pyc = bytecode_cache.compile(code, filename)
         except SourceCodeError as e:
             reraise(e, RexError)
         except Exception as e:
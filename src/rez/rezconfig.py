@@ -136,9 +136,9 @@ bind_module_path = []
 # would change the result of an existing resolve.
 resolve_caching = True
 
-# Cache package file reads to memcached, if enabled. Updated package files will
-# still be read correctly (ie, the cache invalidates when the filesystem
-# changes).
+# Cache package file reads to memcached, or to the local package file cache (see
+# 'package_file_cache_path'), if enabled. Updated package files will still be
+# read correctly (ie, the cache invalidates when the filesystem changes).
 cache_package_files = True
 
 # Cache directory traversals to memcached, if enabled. Updated directory entries
@@ -156,6 +156,53 @@ resource_caching_maxsize = -1
 # its default port. Must be either null, or a list of strings.
 memcached_uri = []
 
+# Path to a local directory in which to cache resolves, for use when memcached
+# is not available (see 'memcached_uri'). This gives hosts without access to a
+# memcached server - render farm nodes or laptops, for example - resolve
+# caching also. Cached resolves are invalidated in the same way as they are in
+# memcached. If null, the local resolve cache is disabled. If 'memcached_uri'
+# is set, memcached is used instead.
+resolve_cache_path = None
+
+# The maximum number of resolves stored in the local resolve cache (see
+# 'resolve_cache_path'). When exceeded, the least recently used resolves are
+# discarded. A value of -1 means unlimited.
+resolve_cache_maxsize = 1000
+
+# Path to a local directory in which to cache the interpreted package commands
+# of contexts. When a context is interpreted again - as happens every time a
+# suite tool is run, for example - the environment changes that its packages'
+# commands made are replayed, rather than their commands being executed again.
+# Cached commands are invalidated if any package in the context changes, or if
+# an environment variable that they read has a different value. Note however
+# that commands are assumed to only make environment changes. Commands that have
+# other effects (such as creating files), or whose result depends on something
+# other than the environment (such as a file's contents) should not be cached,
+# and so this is disabled (null) by default.
+environ_cache_path = None
+
+# The maximum number of contexts stored in the environ cache (see
+# 'environ_cache_path'). When exceeded, the least recently used contexts are
+# discarded. A value of -1 means unlimited.
+environ_cache_maxsize = 1000
+
+# Path to a local directory in which to cache the compiled bytecode of package
+# commands, and of other python functions in package definitions (such as
+# @late functions). This saves recompiling the commands of every package in a
+# context each time the context is interpreted. Entries are keyed on the
+# source code and on the python version, so they never go stale, and the
+# directory can be shared by different python versions.
+bytecode_cache_path = None
+
+# Path to a local directory in which to cache loaded package definition files
+# (package.py, package.yaml), for use when memcached is not available (see
+# 'memcached_uri'). This saves every new process from executing the
+# package.py of each package it loads - a significant cost for a cold rez-env
+# that loads hundreds of packages. Entries are invalidated when a file changes,
+# in the same way as they are in memcached. If null, the cache is disabled.
+# See also 'cache_package_files'.
+package_file_cache_path = None
+
 # Bytecount beyond which memcached entries are compressed, for cached package
 # files (such as package.yaml, package.py). Zero means never compress.
 memcached_package_file_min_compress_len = 16384
@@ -210,6 +257,18 @@ platform_map = {}
 # failure.
 prune_failed_graph = True
 
+# Number of threads used to load packages ahead of a solve. If greater than
+# zero, the solver first loads the package families in the request - and then
+# the families those packages require, and so on - concurrently, rather than
+# one at a time as the solve progresses. This can greatly speed up resolves
+# against slow or cold filesystems, such as NFS. Set to zero to disable.
+solver_prefetch_thread_count = 0
+
+# The maximum number of packages per family that are loaded ahead of a solve
+# (see solver_prefetch_thread_count). The latest packages within the required
+# version range are loaded, since these are the first that a solve considers.
+solver_prefetch_max_versions = 3
+
 # Variant select mode. This determines which variants in a package are preferred
 # during a solve. Valid options are:
 # - version_priority: Prefer variants that contain higher versions of packages
@@ -345,6 +404,30 @@ env_var_separators = {
     "DOXYGEN_TAGFILES": " ",
 }
 
+# If true, duplicate entries are removed from path-like environment variables.
+# These are the variables that package commands append or prepend to, and whose
+# separator (see 'env_var_separators') is not whitespace, such as PATH and
+# PYTHONPATH. Large resolves can otherwise produce variables with many duplicate
+# entries, which slows down lookups (such as finding executables on PATH). When
+# a duplicate is removed, the first entry is kept, so lookups are unaffected.
+#
+# Note that when this is enabled, each variable is set once with its final
+# value in the context's shell code, rather than appended/prepended to by each
+# package.
+dedup_path_variables = False
+
+# If true, entries that are absolute paths that do not exist are also removed
+# from path-like environment variables. This only applies if
+# 'dedup_path_variables' is true.
+prune_missing_paths = False
+
+# If true, consecutive appends/prepends to an environment variable are combined
+# into a single assignment in the context's shell code, rather than each package
+# emitting its own. This gives much smaller scripts for large resolves, which
+# are faster to generate and to source. The variable is still set in order with
+# respect to any command, alias or other variable that refers to it.
+coalesce_env_var_pends = False
+
 # Defines what suites on $PATH stay visible when a new rez environment is resolved.
 # Possible values are:
 # - "never":            Don"t attempt to keep any suites visible in a new env
@@ -369,7 +452,9 @@ package_commands_sourced_first = True
 # Defines paths to initially set $PATH to, if a resolve appends/prepends $PATH.
 # If this is an empty list, then this initial value is determined automatically
 # depending on the shell (for example, *nix shells create a temp clean shell and
-# get $PATH from there; Windows inspects its registry).
+# get $PATH from there; Windows inspects its registry). Setting this also
+# speeds up tools run directly, without a shell (see suite_tool_direct_exec),
+# since the shell plugins then do not need to be loaded.
 standard_system_paths = []
 
 # If you define this function, by default it will be called as the
@@ -621,6 +706,19 @@ use_variant_shortlinks = True
 # clash with the wrapped tools" own commandline arguments.
 suite_alias_prefix_char = "+"
 
+# If true, suite tools are exec'd directly in their context's environment,
+# rather than being run in a subshell (see 'ResolvedContext.exec_command').
+# This makes tools start faster, but note that the tool's environment is not
+# configured by a shell - shell startup scripts are not sourced, and shell
+# functions are not available. Tools that are package aliases, and tools run
+# with the ++interactive, ++command or ++stdin options, still use a subshell.
+suite_tool_direct_exec = False
+
+# Number of threads used to write a suite's contexts and tool wrappers when it
+# is saved. When a suite is saved over itself, only the contexts and wrappers
+# that have changed are rewritten.
+suite_save_thread_count = 8
+
 
 ###############################################################################
 # Appearance
@@ -679,6 +777,13 @@ max_package_changelog_chars = 65536
 # If not zero, truncates all package changelogs to only show the last N commits
 max_package_changelog_revisions = 0
 
+# If true, rxt files are written in a compact binary format, rather than json
+# (or yaml, see 'rxt_as_yaml'). Binary contexts are smaller and faster to load,
+# which helps when many contexts are loaded, such as by the tools in a suite.
+# Rez detects the format on rxt file load, so this only affects written files.
+# Note that older versions of rez cannot read binary contexts.
+rxt_as_binary = False
+
 # Default option on how to create scripts with util.create_executable_script.
 # In order to support both windows and other OS it is recommended to set this
 # to 'both'.
@@ -1,8 +1,10 @@
 """
-Read and write data from file. File caching via a memcached server is supported.
+Read and write data from file. File caching via a memcached server, or a local
+cache directory, is supported.
 """
 from contextlib import contextmanager
 from inspect import isfunction, ismodule
+from hashlib import sha1
 import sys
 import stat
 import os
@@ -15,20 +17,28 @@ from rez.utils.sourcecode import SourceCode, early, late, include
 from rez.utils.filesystem import TempDirs
 from rez.utils.data_utils import ModifyList
 from rez.exceptions import ResourceError, InvalidPackageError
-from rez.utils.memcached import memcached
+from rez.utils.memcached import memcached, cache_interface_version
 from rez.utils.execution import add_sys_paths
 from rez.utils import py23
 from rez.config import config
 from rez.vendor.atomicwrites import atomic_write
 from rez.vendor.enum import Enum
+from rez.vendor.six import six
 from rez.vendor.six.six.moves import StringIO
 from rez.vendor import yaml
 
 
+pickle = six.moves.cPickle
+
+
 tmpdir_manager = TempDirs(config.tmpdir, prefix="rez_write_")
 debug_print = config.debug_printer("file_loads")
 file_cache = {}
 
+# sys.path is process-wide, and is modified while python package definitions
+# are loaded
+_load_py_lock = threading.RLock()
+
 
 class FileFormat(Enum):
     py = ("py",)
@@ -103,7 +113,8 @@ def load_from_file(filepath, format_=FileFormat.py, update_data_callback=None,
         format_ (`FileFormat`): Format of file contents.
         update_data_callback (callable): Used to change data before it is
             returned or cached.
-        disable_memcache (bool): If True, don't r/w to memcache.
+        disable_memcache (bool): If True, don't r/w to memcache, or to the
+            local package file cache.
 
     Returns:
         dict.
@@ -122,6 +133,10 @@ def load_from_file(filepath, format_=FileFormat.py, update_data_callback=None,
         return _load_file(filepath=filepath,
                           format_=format_,
                           update_data_callback=update_data_callback)
+    elif package_file_cache.enabled:
+        return package_file_cache.load(filepath=filepath,
+                                       format_=format_,
+                                       update_data_callback=update_data_callback)
     else:
         return _load_from_file(filepath=filepath,
                                format_=format_,
@@ -147,6 +162,97 @@ def _load_from_file(filepath, format_, update_data_callback):
     return _load_file(filepath, format_, update_data_callback)
 
 
+class PackageFileCache(object):
+    """A persistent cache of loaded package definition files.
+
+    Loaded data is pickled (`SourceCode` objects included), one file per
+    package definition file, in the directory given by the
+    'package_file_cache_path' config setting. This saves re-executing every
+    package.py loaded by a new process, on hosts where memcached is not
+    available. If memcached is configured (see 'memcached_uri'), it is used
+    instead.
+
+    Each entry is named after the definition file's realpath, and holds the
+    same key as used for memcached - this includes the file's inode and mtime.
+    So a changed file's entry is simply overwritten, and the cache holds at
+    most one entry per package definition file.
+    """
+    @property
+    def enabled(self):
+        return bool(config.package_file_cache_path
+                    and config.cache_package_files
+                    and not config.memcached_uri)
+
+    def load(self, filepath, format_, update_data_callback):
+        """Load the given file, using the cache if possible.
+
+        See `load_from_file` for argument details.
+        """
+        key = _load_from_file__key(filepath, format_, update_data_callback)
+        cache_filepath = self._get_filepath(config.package_file_cache_path,
+                                            filepath)
+
+        data = self._read(cache_filepath, key)
+        if data is not None:
+            return data
+
+        data = _load_file(filepath, format_, update_data_callback)
+        self._write(cache_filepath, key, data)
+        return data
+
+    @classmethod
+    def _get_filepath(cls, path, filepath):
+        # entries are pickled, so keep python major versions separate
+        txt = "%d:%d:%s" % (cache_interface_version, sys.version_info[0],
+                            filepath)
+        if isinstance(txt, six.text_type):
+            txt = txt.encode("utf-8")
+
+        hash_str = sha1(txt).hexdigest()
+        return os.path.join(os.path.expanduser(path), hash_str[:2],
+                            hash_str[2:] + ".pickle")
+
+    @classmethod
+    def _read(cls, cache_filepath, key):
+        key_, data = cls._read_entry(cache_filepath)
+        if key_ != key:
+            return None
+
+        if debug_print:
+            debug_print("Loaded file from cache: %s", cache_filepath)
+        return data
+
+    @classmethod
+    def _read_entry(cls, cache_filepath):
+        try:
+            with open(cache_filepath, "rb") as f:
+                key, data = pickle.load(f)
+            return key, data
+        except (IOError, OSError):
+            return None, None
+        except Exception:
+            return None, None  # a partial or corrupt entry is just a cache miss
+
+    @classmethod
+    def _write(cls, cache_filepath, key, data):
+        from rez.utils.filesystem import safe_makedirs
+
+        try:
+            content = pickle.dumps((key, data), pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            return  # not picklable, so not cached
+
+        try:
+            safe_makedirs(os.path.dirname(cache_filepath))
+            with atomic_write(cache_filepath, mode="wb", overwrite=True) as f:
+                f.write(content)
+        except (IOError, OSError):
+            pass
+
+
+package_file_cache = PackageFileCache()
+
+
 def _load_file(filepath, format_, update_data_callback, original_filepath=None):
     load_func = load_functions[format_]
 
@@ -214,11 +320,21 @@ def load_py(stream, filepath=None):
     Returns:
         dict.
     """
-    with add_sys_paths(config.package_definition_build_python_paths):
-        return _load_py(stream, filepath=filepath)
+    # the file is read before taking the lock, so that packages loaded
+    # concurrently (see `PackageVariantCache.prefetch`) only serialise on
+    # executing their code
+    try:
+        with open(filepath, "rb") as f:
+            source = f.read()
+    except IOError as e:
+        raise ResourceError("Problem loading %s: %s" % (filepath, str(e)))
 
+    with _load_py_lock:
+        with add_sys_paths(config.package_definition_build_python_paths):
+            return _load_py(source, filepath=filepath)
 
-def _load_py(stream, filepath=None):
+
+def _load_py(source, filepath=None):
     scopes = ScopeContext()
 
     g = dict(scope=scopes,
@@ -229,8 +345,7 @@ def _load_py(stream, filepath=None):
              InvalidPackageError=InvalidPackageError)
 
     try:
-        with open(filepath, "rb") as f:
-            exec(compile(f.read(), filepath, 'exec'), g)
+        exec(compile(source, filepath, 'exec'), g)
     except Exception as e:
         import traceback
         frames = traceback.extract_tb(sys.exc_info()[2])
@@ -31,6 +31,21 @@ def get_shell_types():
     return list(plugin_manager.get_plugins('shell'))
 
 
+def get_default_shell():
+    """Returns the default shell type.
+
+    This is `config.default_shell` if set, or the platform's standard shell
+    otherwise. Unlike `create_shell`, the current shell is not detected, which
+    is comparatively slow.
+
+    Returns:
+        str: Shell type.
+    """
+    if config.default_shell:
+        return config.default_shell
+    return "cmd" if system.platform == "windows" else "sh"
+
+
 def get_shell_class(shell=None):
     """Get the plugin class associated with the given or current shell.
 
@@ -14,6 +14,7 @@ from rez.packages import iter_packages
 from rez.package_repository import package_repo_stats
 from rez.utils.logging_ import print_debug
 from rez.utils.data_utils import cached_property
+from rez.utils.execution import threaded_map
 from rez.vendor.pygraph.classes.digraph import digraph
 from rez.vendor.pygraph.algorithms.cycles import find_cycle
 from rez.vendor.pygraph.algorithms.accessibility import accessibility
@@ -24,6 +25,7 @@ from rez.vendor.version.requirement import VersionedObject, Requirement, \
     RequirementList
 from rez.vendor.enum import Enum
 from rez.vendor.sortedcontainers.sortedset import SortedSet
+from rez.vendor.sortedcontainers.sortedlist import SortedListWithKey
 from contextlib import contextmanager
 import copy
 import time
@@ -36,6 +38,18 @@ import os
 _force_unoptimised_solver = (os.getenv("_FORCE_REZ_UNOPTIMISED_SOLVER") == "1")
 
 
+class _NullContext(object):
+    # a context manager that does nothing, see `Solver.timed`
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+
+_null_context = _NullContext()
+
+
 class VariantSelectMode(Enum):
     """Variant selection mode."""
     version_priority = 0
@@ -434,25 +448,35 @@ class _PackageEntry(object):
 class _PackageVariantList(_Common):
     """A list of package variants, loaded lazily.
     """
-    def __init__(self, package_name, solver):
+    def __init__(self, package_name, package_cache):
         self.package_name = package_name
-        self.solver = solver
+        self.package_cache = package_cache
+        solver = self.solver
 
         # note: we do not apply package filters here, because doing so might
         # cause package loads (eg, timestamp rules). We only apply filters
         # during an intersection, which minimises the amount of filtering.
         #
-        self.entries = []
+        # Entries are kept in ascending version order. This means that an
+        # intersection can bisect straight to the entries within each bound of
+        # a range, rather than testing every version in the family.
+        #
+        self.entries = SortedListWithKey(key=lambda x: x[0].version)
 
         for package in iter_packages(self.package_name,
-                                     paths=self.solver.package_paths):
+                                     paths=solver.package_paths):
             package.set_context(solver.context)
-            self.entries.append([package, False])
+            self.entries.add([package, False])
 
         if not self.entries:
             raise PackageFamilyNotFoundError(
                 "package family not found: %s (searched: %s)"
-                % (package_name, "; ".join(self.solver.package_paths)))
+                % (package_name, "; ".join(solver.package_paths)))
+
+    @property
+    def solver(self):
+        # the cache may be shared by consecutive solvers, see `Solver`
+        return self.package_cache.solver
 
     def get_intersection(self, range_):
         """Get a list of variants that intersect with the given range.
@@ -464,16 +488,15 @@ class _PackageVariantList(_Common):
             List of `_PackageEntry` objects.
         """
         result = []
+        num_entries = 0
 
-        for entry in self.entries:
+        for entry in self._iter_entries_in_range(range_):
             package, value = entry
+            num_entries += 1
 
             if value is None:
                 continue  # package was blocked by package filters
 
-            if package.version not in range_:
-                continue
-
             if isinstance(value, list):
                 variants = value
                 entry_ = _PackageEntry(package, variants, self.solver)
@@ -503,8 +526,27 @@ class _PackageVariantList(_Common):
             entry_ = _PackageEntry(package, variants_, self.solver)
             result.append(entry_)
 
+        self.solver.variant_list_intersections_count += 1
+        self.solver.variant_list_skipped_entries_count += \
+            len(self.entries) - num_entries
+
         return result or None
 
+    def _iter_entries_in_range(self, range_):
+        # the bounds of a range are disjoint and in ascending order, so this
+        # yields entries in ascending version order, without duplicates
+        for bound in range_.bounds:
+            lower, upper = bound.lower, bound.upper
+            max_key = upper.version if bound.upper_bounded() else None
+
+            it = self.entries.irange_key(
+                min_key=lower.version,
+                max_key=max_key,
+                inclusive=(lower.inclusive, upper.inclusive))
+
+            for entry in it:
+                yield entry
+
     def dump(self):
         print(self.package_name)
 
@@ -557,6 +599,7 @@ class _PackageVariantSlice(_Common):
         self._range = None
         self._fam_requires = None
         self._common_fams = None
+        self._variant_keys = None
 
     @property
     def pr(self):
@@ -590,6 +633,14 @@ class _PackageVariantSlice(_Common):
         entry.sort()
         return entry.variants[0]
 
+    @property
+    def variant_keys(self):
+        """Set of (version, index) tuples identifying the variants."""
+        if self._variant_keys is None:
+            self._variant_keys = frozenset(
+                (x.version, x.index) for x in self.iter_variants())
+        return self._variant_keys
+
     def iter_variants(self):
         for entry in self.entries:
             for variant in entry.variants:
@@ -611,7 +662,8 @@ class _PackageVariantSlice(_Common):
 
         self.solver.intersection_tests_count += 1
 
-        with self.solver.timed(self.solver.intersection_time):
+        with self.solver.timed(self.solver.intersection_time, "intersect",
+                               self.package_name, range_):
             # this is faster than iter_intersecting :(
             entries = [x for x in self.entries if x.version in range_]
 
@@ -645,7 +697,8 @@ class _PackageVariantSlice(_Common):
                 (package_request.name not in self.fam_requires):
             return (self, [])
 
-        with self.solver.timed(self.solver.reduction_time):
+        with self.solver.timed(self.solver.reduction_time, "reduce",
+                               self.package_name, package_request):
             return self._reduce_by(package_request)
 
     def _reduce_by(self, package_request):
@@ -653,15 +706,20 @@ class _PackageVariantSlice(_Common):
 
         entries = []
         reductions = []
-        conflict_tests = {}
+        memo = self.solver.reduction_memo
 
         def _conflicts(req_):
-            # cache conflict tests, since variants often share similar requirements
-            req_s = str(req)
-            result = conflict_tests.get(req_s)
+            # memoise conflict tests for the whole solve. Variants often share
+            # similar requirements, and the same slices get reduced by the same
+            # requests over and over, in phases that are copied or split.
+            key = (req_, package_request)
+            result = memo.get(key)
             if result is None:
                 result = req_.conflicts_with(package_request)
-                conflict_tests[req_s] = result
+                memo[key] = result
+                self.solver.reduction_memo_misses_count += 1
+            else:
+                self.solver.reduction_memo_hits_count += 1
             return result
 
         for entry in self.entries:
@@ -899,7 +957,14 @@ class _PackageVariantSlice(_Common):
 
 
 class PackageVariantCache(object):
-    def __init__(self, solver):
+    """Cache of the package families loaded during a solve.
+
+    A cache can be shared by several solvers, one after another (see the
+    `package_cache` arg of `Solver`). Those solvers must have the same package
+    paths, package filter and build mode, since the cache stores the results
+    of filtering, and of expanding packages into variants.
+    """
+    def __init__(self, solver=None):
         self.solver = solver
         self.variant_lists = {}  # {package-name: _PackageVariantList}
 
@@ -916,7 +981,7 @@ class PackageVariantCache(object):
         variant_list = self.variant_lists.get(package_name)
 
         if variant_list is None:
-            variant_list = _PackageVariantList(package_name, self.solver)
+            variant_list = _PackageVariantList(package_name, self)
             self.variant_lists[package_name] = variant_list
 
         entries = variant_list.get_intersection(range_)
@@ -928,6 +993,100 @@ class PackageVariantCache(object):
                                       solver=self.solver)
         return slice_
 
+    def prefetch(self, package_requests, num_threads, max_versions):
+        """Load package families, and package definitions, ahead of a solve.
+
+        Families are loaded concurrently in a pool of threads, starting with
+        those in the given requests, then continuing with the requirements of
+        the packages loaded, and so on. The loaded families are stored in this
+        cache, where the solve will then find them.
+
+        Any error is ignored - if the solve needs the package that caused it,
+        the error is raised again at that point.
+
+        Args:
+            package_requests (list of `Requirement`): Requests to prefetch.
+            num_threads (int): Number of loading threads.
+            max_versions (int): Max number of packages to load per family - the
+                latest within the required range are loaded.
+
+        Returns:
+            int: Number of packages loaded.
+        """
+        pending = {}  # {package-name: VersionRange}
+        fetched = {}  # {package-name: VersionRange}
+        num_packages = 0
+
+        def _add(request):
+            if request.conflict:
+                return
+
+            name = request.name
+            range_ = request.range
+            if name in fetched:
+                range_ = range_ - fetched[name]
+                if range_ is None:
+                    return
+
+            if name in pending:
+                range_ = range_ | pending[name]
+            pending[name] = range_
+
+        for request in package_requests:
+            _add(request)
+
+        while pending:
+            requests = list(pending.items())
+            pending = {}
+
+            for name, range_ in requests:
+                if name in fetched:
+                    range_ = range_ | fetched[name]
+                fetched[name] = range_
+
+            # load families
+            names = [x[0] for x in requests if x[0] not in self.variant_lists]
+            variant_lists = threaded_map(self._load_variant_list, names,
+                                         num_threads)
+
+            for name, variant_list in zip(names, variant_lists):
+                if variant_list is not None:
+                    self.variant_lists[name] = variant_list
+
+            # load the latest packages within range from each family
+            packages = []
+            for name, range_ in requests:
+                variant_list = self.variant_lists.get(name)
+                if variant_list is not None:
+                    entries = list(variant_list._iter_entries_in_range(range_))
+                    packages.extend(x[0] for x in entries[-max_versions:])
+
+            requires_lists = threaded_map(self._load_package_requires, packages,
+                                          num_threads)
+            num_packages += len(packages)
+
+            for requires in requires_lists:
+                for request in requires:
+                    _add(request)
+
+        return num_packages
+
+    def _load_variant_list(self, package_name):
+        try:
+            return _PackageVariantList(package_name, self)
+        except Exception:
+            return None
+
+    def _load_package_requires(self, package):
+        requires = []
+        try:
+            for variant in package.iter_variants():
+                requires.extend(
+                    variant.get_requires(build_requires=self.solver.building))
+        except Exception:
+            pass
+        return requires
+
 
 class _PackageScope(_Common):
     """Contains possible solutions for a package, such as a list of variants,
@@ -1111,6 +1270,67 @@ class _PackageScope(_Common):
             return str(self.variant_slice)
 
 
+class _Nogood(_Common):
+    """A combination of package scopes that is known to fail.
+
+    Scopes only ever narrow during a solve, and narrowing a scope never removes
+    a conflict. Any phase whose scopes are each at least as narrow as those in
+    a nogood must therefore fail for the same reason, and can be discarded
+    without being solved.
+    """
+    def __init__(self, scopes, failure_reason):
+        self.scopes = scopes
+        self.failure_reason = failure_reason
+
+        # conflict scopes must match exactly, other scopes must be a subset
+        self.constraints = {}
+        for scope in scopes:
+            if scope.is_conflict:
+                value = scope.package_request
+            else:
+                value = scope.variant_slice.variant_keys
+            self.constraints[scope.package_name] = value
+
+        self.key = frozenset(self.constraints.items())
+
+    def matches(self, scopes):
+        """Test whether a set of scopes contains this nogood.
+
+        Args:
+            scopes (dict): Scopes to test, keyed by package name.
+
+        Returns:
+            bool.
+        """
+        for name, value in self.constraints.items():
+            scope = scopes.get(name)
+            if scope is None:
+                return False
+
+            if isinstance(value, Requirement):
+                if scope.package_request != value:
+                    return False
+            elif scope.is_conflict or \
+                    not value.issuperset(scope.variant_slice.variant_keys):
+                return False
+
+        return True
+
+    def __str__(self):
+        return ' '.join(map(str, self.scopes))
+
+
+class _PhaseSplit(object):
+    """The split of an exhausted phase into two phases.
+
+    Collects the nogoods learned from each half of the split, so that once both
+    halves have failed, a nogood can be learned from the phase that was split.
+    """
+    def __init__(self, phase):
+        self.phase = phase
+        self.nogoods = []
+
+
 def _get_dependency_order(g, node_list):
     """Return list of nodes as close as possible to the ordering in node_list,
     but with child nodes earlier in the list than parents."""
@@ -1156,6 +1376,14 @@ class _ResolvePhase(_Common):
         self.extractions = {}
         self.status = SolverStatus.pending
 
+        # used by the solver to learn nogoods (see `Solver._learn_nogood`).
+        # When solved, a phase records the scopes it started from, and which
+        # families each scope depended on as it was narrowed or added.
+        self.pending_scopes = None
+        self.scope_deps = None
+        self.failure_fams = None
+        self.parent_split = None
+
         self.scopes = []
         for package_request in self.solver.request_list:
             scope = _PackageScope(package_request, solver=solver)
@@ -1175,7 +1403,9 @@ class _ResolvePhase(_Common):
 
         scopes = self.scopes[:]
         failure_reason = None
+        failure_fams = None
         extractions = {}
+        scope_deps = {}  # {package-name: set(package-name)}
 
         changed_scopes_i = self.changed_scopes_i.copy()
 
@@ -1183,7 +1413,10 @@ class _ResolvePhase(_Common):
             phase = copy.copy(self)
             phase.scopes = scopes
             phase.failure_reason = failure_reason
+            phase.failure_fams = failure_fams
             phase.extractions = extractions
+            phase.pending_scopes = self.scopes
+            phase.scope_deps = scope_deps
             phase.changed_scopes_i = set()
 
             if status is None:
@@ -1193,6 +1426,15 @@ class _ResolvePhase(_Common):
                 phase.status = status
             return phase
 
+        def _extractors(fam):
+            return set(x[0] for x in extractions if x[1] == fam)
+
+        def _add_deps(fam, fams):
+            if fam in scope_deps:
+                scope_deps[fam] |= fams
+            else:
+                scope_deps[fam] = set(fams)
+
         # iteratively reduce until no more reductions possible
         while True:
             prev_num_scopes = len(scopes)
@@ -1206,17 +1448,20 @@ class _ResolvePhase(_Common):
                 # perform all possible extractions
                 with self.solver.timed(self.solver.extraction_time):
                     for i in range(len(scopes)):
-                        while True:
-                            scope_, extracted_request = scopes[i].extract()
-
-                            if extracted_request:
-                                extracted_requests.append(extracted_request)
-                                k = (scopes[i].package_name, extracted_request.name)
-                                extractions[k] = extracted_request
-                                self.solver.extractions_count += 1
-                                scopes[i] = scope_
-                            else:
-                                break
+                        with self.solver.timed(None, "extract",
+                                               scopes[i].package_name):
+                            while True:
+                                scope_, extracted_request = scopes[i].extract()
+
+                                if extracted_request:
+                                    extracted_requests.append(extracted_request)
+                                    k = (scopes[i].package_name,
+                                         extracted_request.name)
+                                    extractions[k] = extracted_request
+                                    self.solver.extractions_count += 1
+                                    scopes[i] = scope_
+                                else:
+                                    break
 
                 if not extracted_requests:
                     break
@@ -1229,6 +1474,7 @@ class _ResolvePhase(_Common):
                     req1, req2 = extracted_requests.conflict
                     conflict = DependencyConflict(req1, req2)
                     failure_reason = DependencyConflicts([conflict])
+                    failure_fams = _extractors(req1.name) | _extractors(req2.name)
                     return _create_phase(SolverStatus.failed)
                 elif self.pr:
                     self.pr("merged extractions: %s", extracted_requests)
@@ -1254,6 +1500,8 @@ class _ResolvePhase(_Common):
                             conflict = DependencyConflict(
                                 extracted_req, scope.package_request)
                             failure_reason = DependencyConflicts([conflict])
+                            failure_fams = _extractors(scope.package_name)
+                            failure_fams.add(scope.package_name)
                             return _create_phase(SolverStatus.failed)
 
                         if scope_ is not scope:
@@ -1262,6 +1510,8 @@ class _ResolvePhase(_Common):
                             scopes[i] = scope_
                             changed_scopes_i.add(i)
                             self.solver.intersections_count += 1
+                            _add_deps(scope.package_name,
+                                      _extractors(scope.package_name))
 
                             # if the intersection caused a conflict scope to turn
                             # into a non-conflict scope, then it has to be reduced
@@ -1289,6 +1539,7 @@ class _ResolvePhase(_Common):
                     for req in new_extracted_reqs:
                         scope = _PackageScope(req, solver=self.solver)
                         scopes.append(scope)
+                        _add_deps(req.name, _extractors(req.name))
                         if self.pr:
                             self.pr("added %s", scope)
 
@@ -1355,10 +1606,14 @@ class _ResolvePhase(_Common):
 
                     if new_scope is None:
                         failure_reason = TotalReduction(reductions)
+                        failure_fams = set([scopes[x].package_name,
+                                            scopes[y].package_name])
                         return _create_phase(SolverStatus.failed)
 
                     elif new_scope is not scopes[x]:
                         scopes[x] = new_scope
+                        _add_deps(new_scope.package_name,
+                                  set([scopes[y].package_name]))
 
                         # other scopes need to reduce against x again
                         for j in all_scopes_i:
@@ -1469,6 +1724,37 @@ class _ResolvePhase(_Common):
         next_phase.scopes = next_scopes
         return (phase, next_phase)
 
+    def get_nogood(self, fams, failure_reason):
+        """Get a nogood from a failure of this phase, once solved.
+
+        The nogood is expressed in terms of the scopes this phase started from,
+        so it includes the given families, plus any families that narrowed or
+        added those scopes during the solve. Other families played no part in
+        the failure, so they are left out - this is what allows the nogood to
+        match phases in other branches of the solve.
+
+        Args:
+            fams (set of str): Families involved in the failure.
+            failure_reason (`FailureReason`): Reason for the failure.
+
+        Returns:
+            A `_Nogood` object, or None if nothing can be learned.
+        """
+        fams = set(fams)
+        pending = list(fams)
+
+        while pending:
+            for fam in self.scope_deps.get(pending.pop(), ()):
+                if fam not in fams:
+                    fams.add(fam)
+                    pending.append(fam)
+
+        scopes = [x for x in self.pending_scopes if x.package_name in fams]
+        if not scopes:
+            return None
+
+        return _Nogood(scopes, failure_reason)
+
     def get_graph(self):
         """Get the resolve graph.
 
@@ -1752,6 +2038,192 @@ class _ResolvePhase(_Common):
         return ' '.join(str(x) for x in self.scopes)
 
 
+class SolveProfile(object):
+    """A breakdown of where the time in a solve was spent.
+
+    Time and counts are attributed to the package family that each solver
+    operation acted on, and to the request behind the operation (the range
+    intersected with, or the request reduced by). The phase stack depth is
+    also recorded after every solve step.
+
+    A profile is only recorded if the `Solver` is created with `profile=True`,
+    since recording adds a small cost to every operation.
+    """
+    # the solver operations that are profiled
+    events = ("load", "extract", "intersect", "reduce")
+
+    def __init__(self):
+        self.start_time = time.time()
+        self.family_stats = {}   # {package-name: {event: [count, secs]}}
+        self.request_stats = {}  # {request-str: {event: [count, secs]}}
+        self.depths = []         # [(secs, phase-stack-depth)]
+        self.trace = []          # [(event, package-name, start-secs, secs)]
+
+    def add_event(self, event, package_name, start_time, secs, request=None):
+        """Record a timed solver operation.
+
+        Args:
+            event (str): Operation name, eg 'reduce'.
+            package_name (str): Package family that was operated on. None if
+                the operation is not specific to a family (eg a solve step).
+            start_time (float): Epoch time the operation started.
+            secs (float): Duration of the operation.
+            request (`Requirement` or `VersionRange`): Request behind the
+                operation, if any. A range is taken to apply to
+                `package_name`.
+        """
+        self.trace.append((event, package_name,
+                           start_time - self.start_time, secs))
+
+        if package_name is None:
+            return
+
+        self._add(self.family_stats, package_name, event, secs)
+
+        if request is not None:
+            if isinstance(request, VersionRange):
+                request = Requirement.construct(package_name, request)
+            self._add(self.request_stats, str(request), event, secs)
+
+    def add_depth(self, depth):
+        """Record the current phase stack depth."""
+        self.depths.append((time.time() - self.start_time, depth))
+
+    def get_family_times(self):
+        """Get the total time spent on each package family.
+
+        Returns:
+            List of (package-name, secs) tuples, most expensive first.
+        """
+        return self._get_totals(self.family_stats)
+
+    def get_request_times(self):
+        """Get the total time spent on each request.
+
+        Returns:
+            List of (request-str, secs) tuples, most expensive first.
+        """
+        return self._get_totals(self.request_stats)
+
+    def to_dict(self):
+        """Convert the profile to a dict containing only builtin types.
+
+        The dict is also a valid Trace Event Format document (see the
+        'traceEvents' key), so it can be loaded as is into trace viewers such
+        as chrome://tracing, Perfetto or speedscope.
+
+        Returns:
+            dict: Dictified profile.
+        """
+        def _stats(d):
+            return dict(
+                (key, dict((event, {"count": count, "time": secs})
+                           for event, (count, secs) in event_stats.items()))
+                for key, event_stats in d.items())
+
+        def _usecs(secs):
+            return int(secs * 1e6)
+
+        trace_events = []
+
+        for event, package_name, t, secs in self.trace:
+            name = event if package_name is None \
+                else "%s %s" % (event, package_name)
+
+            trace_events.append({
+                "name": name,
+                "cat": event,
+                "ph": 'X',
+                "ts": _usecs(t),
+                "dur": _usecs(secs),
+                "pid": 0,
+                "tid": 0,
+                "args": {"family": package_name}
+            })
+
+        for t, depth in self.depths:
+            trace_events.append({
+                "name": "phase_stack_depth",
+                "ph": 'C',
+                "ts": _usecs(t),
+                "pid": 0,
+                "args": {"depth": depth}
+            })
+
+        return {
+            "families": _stats(self.family_stats),
+            "requests": _stats(self.request_stats),
+            "depths": [list(x) for x in self.depths],
+            "traceEvents": trace_events,
+            "displayTimeUnit": "ms"
+        }
+
+    def get_folded_stacks(self):
+        """Get the profile in 'folded stacks' format.
+
+        This is the input format of flamegraph.pl and compatible tools. Each
+        line is a 'solve;<family>;<event>' stack, followed by the total time
+        (in microseconds) spent in it.
+
+        Returns:
+            List of str: Folded stack lines.
+        """
+        lines = []
+
+        for package_name, event_stats in sorted(self.family_stats.items()):
+            for event, (_, secs) in sorted(event_stats.items()):
+                lines.append("solve;%s;%s %d"
+                             % (package_name, event, int(secs * 1e6)))
+
+        return lines
+
+    def print_summary(self, buf=sys.stdout, limit=10):
+        """Print the most expensive package families and requests.
+
+        Args:
+            buf (file-like object): Where to print to.
+            limit (int): Max number of families and requests to print.
+        """
+        from rez.utils.formatting import columnise
+
+        def _print(title, d, totals):
+            header = (title, "time") + self.events
+            rows = [header, tuple('-' * len(x) for x in header)]
+
+            for key, secs in totals[:limit]:
+                counts = tuple(d[key].get(x, (0,))[0] for x in self.events)
+                rows.append((key, "%.3f" % secs) + counts)
+
+            print('\n'.join(columnise(rows)), file=buf)
+
+        _print("family", self.family_stats, self.get_family_times())
+        print(file=buf)
+        _print("request", self.request_stats, self.get_request_times())
+
+        if self.depths:
+            max_depth = max(x[1] for x in self.depths)
+            print("\nmax phase stack depth: %d" % max_depth, file=buf)
+
+    @classmethod
+    def _add(cls, d, key, event, secs):
+        event_stats = d.get(key)
+        if event_stats is None:
+            event_stats = d[key] = {}
+
+        stats = event_stats.get(event)
+        if stats is None:
+            event_stats[event] = [1, secs]
+        else:
+            stats[0] += 1
+            stats[1] += secs
+
+    @classmethod
+    def _get_totals(cls, d):
+        totals = [(key, sum(x[1] for x in event_stats.values()))
+                  for key, event_stats in d.items()]
+        return sorted(totals, key=lambda x: (-x[1], x[0]))
+
+
 class Solver(_Common):
     """Solver.
 
@@ -1765,7 +2237,8 @@ class Solver(_Common):
                  package_filter=None, package_orderers=None, callback=None,
                  building=False, optimised=True, verbosity=0, buf=None,
                  package_load_callback=None, prune_unfailed=True,
-                 suppress_passive=False, print_stats=False):
+                 suppress_passive=False, print_stats=False, package_cache=None,
+                 profile=False):
         """Create a Solver.
 
         Args:
@@ -1798,6 +2271,13 @@ class Solver(_Common):
                 has had no effect on the solve. This argument only has an
                 effect if `verbosity` > 2.
             print_stats (bool): If true, print advanced solver stats at the end.
+            package_cache (`PackageVariantCache`): Cache of loaded package
+                families, as used by a previous solver. Reusing a cache avoids
+                reloading the same families across many solves, but the
+                previous solver must have had the same package paths, package
+                filter and `building` value. If None, a new cache is created.
+            profile (bool): If True, record a `SolveProfile` of the solve,
+                available as `self.profile`.
         """
         self.package_paths = package_paths
         self.package_filter = package_filter
@@ -1823,6 +2303,11 @@ class Solver(_Common):
 
         self.phase_stack = None
         self.failed_phase_list = None
+        self.nogoods = None
+        self.nogood_keys = None
+        self.best_partial_phase = None
+        self.best_partial_count = None
+        self.reduction_memo = None
         self.abort_reason = None
         self.callback_return = None
         self.depth_counts = None
@@ -1839,16 +2324,31 @@ class Solver(_Common):
         self.reductions_count = 0
         self.reduction_tests_count = 0
         self.reduction_broad_tests_count = 0
+        self.reduction_memo_hits_count = 0
+        self.reduction_memo_misses_count = 0
+        self.variant_list_intersections_count = 0
+        self.variant_list_skipped_entries_count = 0
+        self.prefetched_packages_count = 0
+        self.nogoods_learned_count = 0
+        self.nogoods_used_count = 0
 
         self.extraction_time = [0.0]
+        self.prefetch_time = [0.0]
+        self.nogood_test_time = [0.0]
         self.intersection_time = [0.0]
         self.intersection_test_time = [0.0]
         self.reduction_time = [0.0]
         self.reduction_test_time = [0.0]
 
+        self.profile = SolveProfile() if profile else None
+
         self._init()
 
-        self.package_cache = PackageVariantCache(self)
+        if package_cache is None:
+            self.package_cache = PackageVariantCache(self)
+        else:
+            self.package_cache = package_cache
+            package_cache.solver = self
 
         # merge the request
         if self.pr:
@@ -1870,16 +2370,40 @@ class Solver(_Common):
             s = ' '.join(map(str, self.request_list.requirements))
             self.pr("merged request: %s", s)
 
+        # load packages concurrently ahead of the solve
+        num_threads = config.solver_prefetch_thread_count
+        if num_threads > 0:
+            with self.timed(self.prefetch_time):
+                self.prefetched_packages_count = self.package_cache.prefetch(
+                    self.request_list.requirements, num_threads,
+                    config.solver_prefetch_max_versions)
+
+            if self.pr:
+                self.pr("prefetched %d packages in %.2f seconds",
+                        self.prefetched_packages_count, self.prefetch_time[0])
+
         # create the initial phase
         phase = _ResolvePhase(solver=self)
         self._push_phase(phase)
 
+    def timed(self, target, event=None, package_name=None, request=None):
+        # operations that are only timed for the profile are in the innermost
+        # solver loops, so they must cost nothing when not profiling
+        if target is None and self.profile is None:
+            return _null_context
+        return self._timed(target, event, package_name, request)
+
     @contextmanager
-    def timed(self, target):
+    def _timed(self, target, event, package_name, request):
         t = time.time()
         yield
         secs = time.time() - t
-        target[0] += secs
+
+        if target is not None:
+            target[0] += secs
+
+        if event and self.profile is not None:
+            self.profile.add_event(event, package_name, t, secs, request)
 
     @property
     def status(self):
@@ -1945,6 +2469,10 @@ class Solver(_Common):
             phase = _ResolvePhase(self.request_list.requirements, solver=self)
             self.pr("resetting...")
             self._init()
+
+            if self.profile is not None:
+                self.profile = SolveProfile()
+
             self._push_phase(phase)
 
     def solve(self):
@@ -1988,30 +2516,49 @@ class Solver(_Common):
             "num_intersections": self.intersections_count,
             "num_intersection_tests": self.intersection_tests_count,
             "num_intersection_broad_tests": self.intersection_broad_tests_count,
+            "num_variant_list_intersections": self.variant_list_intersections_count,
+            "num_variant_list_entries_skipped": self.variant_list_skipped_entries_count,
             "intersection_time": self.intersection_time[0],
             "intersection_test_time": self.intersection_test_time[0]
         }
 
+        num_memo_tests = (self.reduction_memo_hits_count
+                          + self.reduction_memo_misses_count)
+        memo_hit_rate = (float(self.reduction_memo_hits_count) / num_memo_tests
+                         if num_memo_tests else 0.0)
+
         reduction_stats = {
             "num_reductions": self.reductions_count,
             "num_reduction_tests": self.reduction_tests_count,
             "num_reduction_broad_tests": self.reduction_broad_tests_count,
+            "num_reduction_memo_hits": self.reduction_memo_hits_count,
+            "num_reduction_memo_misses": self.reduction_memo_misses_count,
+            "reduction_memo_hit_rate": memo_hit_rate,
             "reduction_time": self.reduction_time[0],
             "reduction_test_time": self.reduction_test_time[0]
         }
 
+        nogood_stats = {
+            "num_nogoods_learned": self.nogoods_learned_count,
+            "num_nogoods_used": self.nogoods_used_count,
+            "nogood_test_time": self.nogood_test_time[0]
+        }
+
         global_stats = {
             "num_solves": self.num_solves,
             "num_fails": self.num_fails,
             "solve_time": self.solve_time,
-            "load_time": self.load_time
+            "load_time": self.load_time,
+            "prefetch_time": self.prefetch_time[0],
+            "num_prefetched_packages": self.prefetched_packages_count
         }
 
         return {
             "global": global_stats,
             "extractions": extraction_stats,
             "intersections": intersection_stats,
-            "reductions": reduction_stats
+            "reductions": reduction_stats,
+            "nogoods": nogood_stats
         }
 
     def solve_step(self):
@@ -2034,12 +2581,29 @@ class Solver(_Common):
 
         if phase.status == SolverStatus.exhausted:
             self.pr.subheader("SPLITTING:")
+            split = _PhaseSplit(phase)
             phase, next_phase = phase.split()
+            phase.parent_split = next_phase.parent_split = split
             self._push_phase(next_phase)
             if self.pr:
                 self.pr("new phase: %s", phase)
 
-        new_phase = phase.solve()
+        nogood = self._find_nogood(phase)
+
+        if nogood is None:
+            with self.timed(None, "solve_phase"):
+                new_phase = phase.solve()
+            if new_phase.status == SolverStatus.failed:
+                nogood = new_phase.get_nogood(new_phase.failure_fams,
+                                              new_phase.failure_reason)
+                self._learn_nogood(new_phase, nogood)
+        else:
+            # the phase would fail, so don't solve it
+            new_phase = copy.copy(phase)
+            new_phase.failure_reason = nogood.failure_reason
+            new_phase.status = SolverStatus.failed
+            self._learn_nogood(new_phase, nogood)
+
         self.solve_count += 1
 
         if new_phase.status == SolverStatus.failed:
@@ -2065,6 +2629,36 @@ class Solver(_Common):
             assert(new_phase.status == SolverStatus.exhausted)
             self._push_phase(new_phase)
 
+        if self.phase_stack[-1].status == SolverStatus.exhausted:
+            self._update_best_partial_phase(self.phase_stack[-1])
+
+        if self.profile is not None:
+            self.profile.add_depth(len(self.phase_stack))
+
+    def get_partial_resolve(self):
+        """Get the best partial resolve found so far.
+
+        This is useful when a solve has been aborted (for example, by a
+        callback enforcing a time limit). The best partial resolve comes from
+        the phase, out of all that were not failed, with the most packages
+        narrowed down to a single variant.
+
+        Returns:
+            2-tuple:
+            - List of `PackageVariant`: The solved packages;
+            - List of `Requirement`: The remaining range of each package that
+              is not solved yet.
+        """
+        phase = self.best_partial_phase
+        if phase is None:
+            return [], list(self.non_conflict_package_requests)
+
+        variants = phase._get_solved_variants()
+        unresolved = [x.package_request for x in phase.scopes
+                      if not x._is_solved()]
+
+        return variants, unresolved
+
     def failure_reason(self, failure_index=None):
         """Get the reason for a failure.
 
@@ -2163,6 +2757,11 @@ class Solver(_Common):
     def _init(self):
         self.phase_stack = []
         self.failed_phase_list = []
+        self.nogoods = []
+        self.nogood_keys = set()
+        self.best_partial_phase = None
+        self.best_partial_count = -1
+        self.reduction_memo = {}  # {(Requirement, Requirement): bool}
         self.depth_counts = {}
         self.solve_time = 0.0
         self.load_time = 0.0
@@ -2177,8 +2776,17 @@ class Solver(_Common):
         self.reductions_count = 0
         self.reduction_tests_count = 0
         self.reduction_broad_tests_count = 0
+        self.reduction_memo_hits_count = 0
+        self.reduction_memo_misses_count = 0
+        self.variant_list_intersections_count = 0
+        self.variant_list_skipped_entries_count = 0
+        self.prefetched_packages_count = 0
+        self.nogoods_learned_count = 0
+        self.nogoods_used_count = 0
 
         self.extraction_time = [0.0]
+        self.prefetch_time = [0.0]
+        self.nogood_test_time = [0.0]
         self.intersection_time = [0.0]
         self.intersection_test_time = [0.0]
         self.reduction_time = [0.0]
@@ -2193,6 +2801,16 @@ class Solver(_Common):
                 return phase
         assert(False)  # should never get here
 
+    def _update_best_partial_phase(self, phase):
+        count = 0
+        for scope in phase.scopes:
+            if scope._get_solved_variant() is not None:
+                count += 1
+
+        if count > self.best_partial_count:
+            self.best_partial_phase = phase
+            self.best_partial_count = count
+
     def _do_callback(self):
         keep_going = True
         if self.callback:
@@ -2214,11 +2832,65 @@ class Solver(_Common):
         return keep_going
 
     def _get_variant_slice(self, package_name, range_):
-        slice_ = self.package_cache.get_variant_slice(
-            package_name=package_name, range_=range_)
+        with self.timed(None, "load", package_name, range_):
+            slice_ = self.package_cache.get_variant_slice(
+                package_name=package_name, range_=range_)
 
         return slice_
 
+    def _find_nogood(self, phase):
+        # the unoptimised solver is the reference that nogoods are tested
+        # against, so it does not use them
+        if not self.optimised or not self.nogoods:
+            return None
+
+        with self.timed(self.nogood_test_time):
+            scopes = dict((x.package_name, x) for x in phase.scopes)
+
+            for nogood in self.nogoods:
+                if nogood.matches(scopes):
+                    break
+            else:
+                return None
+
+        self.nogoods_used_count += 1
+        if self.pr:
+            self.pr("phase contains learned nogood: %s", nogood)
+        return nogood
+
+    def _learn_nogood(self, phase, nogood):
+        """Record a nogood learned from a failed phase.
+
+        If the phase is one half of a split, and the other half has also
+        failed, then the phase that was split has failed too - so a nogood is
+        learned from that phase in turn, and so on up the split hierarchy.
+        """
+        if not self.optimised:
+            return
+
+        while nogood is not None:
+            if nogood.key not in self.nogood_keys:
+                self.nogood_keys.add(nogood.key)
+                self.nogoods.append(nogood)
+                self.nogoods_learned_count += 1
+                if self.pr:
+                    self.pr("learned nogood: %s", nogood)
+
+            split = phase.parent_split
+            if split is None:
+                break
+
+            split.nogoods.append(nogood)
+            if len(split.nogoods) < 2:
+                break
+
+            phase = split.phase
+            fams = set()
+            for nogood_ in split.nogoods:
+                fams.update(nogood_.constraints.keys())
+
+            nogood = phase.get_nogood(fams, split.nogoods[0].failure_reason)
+
     def _push_phase(self, phase):
         depth = len(self.phase_stack)
         count = self.depth_counts.get(depth, -1) + 1
@@ -41,7 +41,7 @@ class Status(object):
             `ResolvedContext` or None if not in a context.
         """
         path = self.context_file
-        return ResolvedContext.load(path) if path else None
+        return ResolvedContext.load(path, lazy=True) if path else None
 
     @cached_property
     def suites(self):
@@ -149,7 +149,7 @@ class Status(object):
                     seen.add(tool)
 
         for suite in self.suites:
-            for tool, d in suite.get_tools().items():
+            for tool, d in suite.get_tool_index()["tools"].items():
                 if tool in seen:
                     continue
                 if pattern and not fnmatch(tool, pattern):
@@ -165,12 +165,12 @@ class Status(object):
                         color = warning
 
                 variant = d["variant"]
-                if isinstance(variant, set):
+                if isinstance(variant, list):
                     pkg_str = ", ".join(variant)
                     label.append("(in conflict)")
                     color = critical
                 else:
-                    pkg_str = variant.qualified_package_name
+                    pkg_str = variant
 
                 orig_tool = d["tool_name"]
                 if orig_tool == tool:
@@ -337,7 +337,7 @@ class Status(object):
             return False
 
         try:
-            ResolvedContext.load(path)
+            ResolvedContext.load(path, lazy=True)
         except:
             return False
 
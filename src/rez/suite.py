@@ -1,6 +1,7 @@
 from __future__ import print_function
 
-from rez.utils.execution import create_forwarding_script
+from rez.utils.execution import create_forwarding_script, threaded_map
+from rez.utils.filesystem import safe_makedirs
 from rez.exceptions import SuiteError, ResolvedContextError
 from rez.resolved_context import ResolvedContext
 from rez.utils.data_utils import cached_property
@@ -9,11 +10,12 @@ from rez.utils.colorize import warning, critical, Printer, alias as alias_col
 from rez.vendor import yaml
 from rez.vendor.yaml.error import YAMLError
 from rez.utils.yaml import dump_yaml
+from rez.vendor.atomicwrites import atomic_write
 from rez.vendor.six import six
+from rez.config import config
 from collections import defaultdict
 import os
 import os.path
-import shutil
 import sys
 
 
@@ -50,6 +52,8 @@ class Suite(object):
         self.tools = None
         self.tool_conflicts = None
         self.hidden_tools = None
+        self.tool_index = None
+        self.tools_modified = False
 
     @property
     def context_names(self):
@@ -126,6 +130,45 @@ class Suite(object):
                                    prefix_char=prefix_char)
         self._flush_tools()
 
+    def add_requests(self, requests, prefix_char=None, processes=1,
+                     **context_kwargs):
+        """Resolve and add several contexts to the suite.
+
+        The requests are resolved together (see `resolve_batch`), which is much
+        faster than resolving and adding each context in turn.
+
+        Args:
+            requests (list of (str, list of str)): Name to store each context
+                under, and the request to resolve. Contexts are added in this
+                order.
+            prefix_char (str): See `add_context`.
+            processes (int): Number of processes to resolve in.
+            context_kwargs: Extra arguments passed to each `ResolvedContext`.
+
+        Returns:
+            List of `ResolvedContext`: The added contexts.
+        """
+        from rez.resolve_batch import resolve_batch
+
+        names = [x[0] for x in requests]
+        for name in names:
+            if name in self.contexts:
+                raise SuiteError("Context already in suite: %r" % name)
+
+        contexts = resolve_batch([x[1] for x in requests],
+                                 processes=processes,
+                                 **context_kwargs)
+
+        failed = [name for name, context in zip(names, contexts)
+                  if not context.success]
+        if failed:
+            raise SuiteError("Failed to resolve contexts: %s"
+                             % ", ".join(failed))
+
+        for name, context in zip(names, contexts):
+            self.add_context(name, context, prefix_char=prefix_char)
+        return contexts
+
     def find_contexts(self, in_request=None, in_resolve=None):
         """Find contexts in the suite based on search criteria.
 
@@ -316,7 +359,7 @@ class Suite(object):
                 suite. May also return None because this suite has not been saved
                 to disk, so a filepath hasn't yet been established.
         """
-        tools_dict = self.get_tools()
+        tools_dict = self.get_tool_index()["tools"]
         if tool_alias in tools_dict:
             if self.tools_path is None:
                 return None
@@ -336,12 +379,36 @@ class Suite(object):
             (str): Name of the context that exposes a visible instance of this
             tool alias, or None if the alias is not available.
         """
-        tools_dict = self.get_tools()
+        tools_dict = self.get_tool_index()["tools"]
         data = tools_dict.get(tool_alias)
         if data:
             return data["context_name"]
         return None
 
+    def get_tool_index(self):
+        """Get a summary of the tools exposed by this suite.
+
+        Unlike `get_tools`, this does not require the suite's contexts to be
+        loaded. When the suite was loaded from disk and has not been modified
+        since, the index saved alongside it is used instead.
+
+        Returns:
+            A dict containing:
+            - tools (dict): Same as `get_tools`, except that each 'variant' is
+              a qualified package name, or a sorted list of them if the tool
+              is in conflict within its context;
+            - hidden_tools (list): Same as `get_hidden_tools`, with variants
+              given as qualified package names;
+            - tool_conflicts (dict): Lists of conflicting entries, keyed by
+              tool alias (see `get_alias_conflicts`).
+        """
+        if self.tool_index is None:
+            if self.load_path and not self.tools_modified:
+                self.tool_index = self._load_tool_index()
+            if self.tool_index is None:
+                self.tool_index = self._create_tool_index()
+        return self.tool_index
+
     def get_hidden_tools(self):
         """Get the tools hidden in this suite.
 
@@ -410,6 +477,9 @@ class Suite(object):
         s.load_path = None
         s.tools = None
         s.tool_conflicts = None
+        s.hidden_tools = None
+        s.tool_index = None
+        s.tools_modified = False
         s.contexts = d["contexts"]
         if s.contexts:
             s.next_priority = max(x["priority"]
@@ -421,65 +491,105 @@ class Suite(object):
     def save(self, path, verbose=False):
         """Save the suite to disk.
 
+        Contexts and tool wrappers are written concurrently (see
+        'suite_save_thread_count'). When saving over the suite's own path, only
+        the contexts and wrappers that have changed are rewritten, and those
+        that are no longer part of the suite are removed.
+
+        A tool index (see `get_tool_index`) is also written, so that tools can
+        be looked up later without loading every context in the suite.
+
         Args:
             path (str): Path to save the suite to. If a suite is already saved
                 at `path`, then it will be overwritten. Otherwise, if `path`
                 exists, an error is raised.
         """
         path = os.path.realpath(path)
+        overwrite = False
+
         if os.path.exists(path):
             if self.load_path and self.load_path == path:
                 if verbose:
                     print("saving over previous suite...")
-                for context_name in self.context_names:
-                    self.context(context_name)  # load before dir deleted
-                shutil.rmtree(path)
+                overwrite = True
             else:
                 raise SuiteError("Cannot save, path exists: %r" % path)
 
         contexts_path = os.path.join(path, "contexts")
-        os.makedirs(contexts_path)
+        tools_path = os.path.join(path, "bin")
+        safe_makedirs(contexts_path)
+        safe_makedirs(tools_path)
+
+        # contexts that have not been loaded are unchanged on disk
+        context_names = [
+            x for x in self.context_names
+            if not (overwrite and "context" not in self.contexts[x])
+        ]
 
         # write suite data
         data = self.to_dict()
         filepath = os.path.join(path, "suite.yaml")
-        with open(filepath, "w") as f:
-            f.write(dump_yaml(data))
+        _write_if_changed(filepath, dump_yaml(data))
 
         # write contexts
-        for context_name in self.context_names:
+        def _write_context(context_name):
             context = self.context(context_name)
             context._set_parent_suite(path, context_name)
             filepath = self._context_path(context_name, path)
-            if verbose:
-                print("writing %r..." % filepath)
-            context.save(filepath)
+            if _write_if_changed(filepath, context._serialize()) and verbose:
+                print("wrote %r" % filepath)
+
+        num_threads = config.suite_save_thread_count
+        threaded_map(_write_context, context_names, num_threads)
 
         # create alias wrappers
-        tools_path = os.path.join(path, "bin")
-        os.makedirs(tools_path)
         if verbose:
             print("creating alias wrappers in %r..." % tools_path)
 
-        tools = self.get_tools()
-        for tool_alias, d in tools.items():
+        def _create_wrapper(item):
+            tool_alias, d = item
             tool_name = d["tool_name"]
             context_name = d["context_name"]
 
             data = self._context(context_name)
             prefix_char = data.get("prefix_char")
+            filepath = os.path.join(tools_path, tool_alias)
 
-            if verbose:
+            return create_forwarding_script(
+                filepath,
+                module="suite",
+                func_name="_FWD__invoke_suite_tool_alias",
+                context_name=context_name,
+                tool_name=tool_name,
+                prefix_char=prefix_char)
+
+        # the tool index, unlike get_tools, does not need unchanged contexts
+        # to be loaded
+        tools = self.get_tool_index()["tools"]
+        if verbose:
+            for tool_alias, d in sorted(tools.items()):
                 print("creating %r -> %r (%s context)..."
-                      % (tool_alias, tool_name, context_name))
-            filepath = os.path.join(tools_path, tool_alias)
+                      % (tool_alias, d["tool_name"], d["context_name"]))
+
+        filepaths = threaded_map(_create_wrapper, tools.items(), num_threads)
+
+        # write tool index
+        filepath = os.path.join(path, "tools.yaml")
+        _write_if_changed(filepath, dump_yaml(self.get_tool_index()))
+
+        # remove contexts and wrappers no longer in the suite
+        if overwrite:
+            context_filenames = set("%s.rxt" % x for x in self.context_names)
+            tool_filenames = set(os.path.basename(x)
+                                 for x in sum(filepaths, []))
 
-            create_forwarding_script(filepath,
-                                     module="suite",
-                                     func_name="_FWD__invoke_suite_tool_alias",
-                                     context_name=context_name,
-                                     tool_name=tool_name,
-                                     prefix_char=prefix_char)
+            for dirpath, filenames in ((contexts_path, context_filenames),
+                                       (tools_path, tool_filenames)):
+                for name in os.listdir(dirpath):
+                    if name not in filenames:
+                        if verbose:
+                            print("removing %r..." % name)
+                        os.remove(os.path.join(dirpath, name))
 
     @classmethod
     def load(cls, path):
@@ -543,7 +653,7 @@ class Suite(object):
             _pr(' '.join(context_names))
             return
 
-        tools = self.get_tools().values()
+        tools = self.get_tool_index()["tools"].values()
         context_tools = defaultdict(set)
         context_variants = defaultdict(set)
         for entry in tools:
@@ -582,17 +692,15 @@ class Suite(object):
             col = None
 
             variant = entry["variant"]
-            if isinstance(variant, set):
+            if isinstance(variant, list):
                 properties.append("(in conflict)")
                 col = critical
                 if verbose:
-                    package = ", ".join(x.qualified_package_name for x in variant)
+                    package = ", ".join(variant)
                 else:
-                    v = next(iter(variant))
-                    package = "%s (+%d more)" % (v.qualified_package_name,
-                                                 len(variant) - 1)
+                    package = "%s (+%d more)" % (variant[0], len(variant) - 1)
             else:
-                package = variant.qualified_package_name
+                package = variant
 
             if tool_name == tool_alias:
                 tool_name = "-"
@@ -615,19 +723,20 @@ class Suite(object):
                 ["----", "--------", "-------", "-------", ""]]
         colors = [None, None]
 
+        tool_index = self.get_tool_index()
         entries_dict = defaultdict(list)
-        for d in self.get_tools().values():
+        for d in tool_index["tools"].values():
             entries_dict[d["context_name"]].append(d)
 
         if verbose:
             # add hidden entries
-            for d in self.hidden_tools:
+            for d in tool_index["hidden_tools"]:
                 d_ = d.copy()
                 d_["hidden"] = True
                 entries_dict[d["context_name"]].append(d_)
 
             # add conflicting tools
-            for docs in self.tool_conflicts.values():
+            for docs in tool_index["tool_conflicts"].values():
                 for d in docs:
                     d_ = d.copy()
                     d_["conflicting"] = True
@@ -688,6 +797,42 @@ class Suite(object):
         self.tools = None
         self.tool_conflicts = None
         self.hidden_tools = None
+        self.tool_index = None
+        self.tools_modified = True
+
+    def _load_tool_index(self):
+        # suites saved by older versions of rez have no tool index
+        filepath = os.path.join(self.load_path, "tools.yaml")
+        if not os.path.isfile(filepath):
+            return None
+
+        try:
+            with open(filepath) as f:
+                data = yaml.load(f.read(), Loader=yaml.FullLoader)
+        except YAMLError as e:
+            raise SuiteError("Failed loading tool index: %s" % str(e))
+        return data
+
+    def _create_tool_index(self):
+        def _entry(d):
+            d_ = d.copy()
+            variant = d["variant"]
+            if isinstance(variant, set):
+                d_["variant"] = sorted(x.qualified_package_name for x in variant)
+            else:
+                d_["variant"] = variant.qualified_package_name
+            return d_
+
+        self._update_tools()
+
+        tools = dict((k, _entry(v)) for k, v in self.tools.items())
+        hidden_tools = [_entry(x) for x in self.hidden_tools]
+        tool_conflicts = dict((k, [_entry(x) for x in v])
+                              for k, v in self.tool_conflicts.items())
+
+        return dict(tools=tools,
+                    hidden_tools=hidden_tools,
+                    tool_conflicts=tool_conflicts)
 
     def _validate_tool(self, context_name, tool_name):
         context = self.context(context_name)
@@ -747,15 +892,28 @@ class Suite(object):
                         self.tools[alias] = entry
 
 
+def _write_if_changed(filepath, content):
+    # writes `content` (str or bytes) to the file, unless it already contains
+    # it. Returns True if the file was written.
+    mode = 'b' if isinstance(content, bytes) else ''
+
+    if os.path.isfile(filepath):
+        with open(filepath, 'r' + mode) as f:
+            if f.read() == content:
+                return False
+
+    with atomic_write(filepath, mode='w' + mode, overwrite=True) as f:
+        f.write(content)
+    return True
+
+
 def _FWD__invoke_suite_tool_alias(context_name, tool_name, prefix_char=None,
                                   _script=None, _cli_args=None):
     suite_path = os.path.dirname(os.path.dirname(_script))
-    path = os.path.join(suite_path, "contexts", "%s.rxt" % context_name)
-    context = ResolvedContext.load(path)
 
     from rez.wrapper import Wrapper
     w = Wrapper.__new__(Wrapper)
-    w._init(suite_path, context_name, context, tool_name, prefix_char)
+    w._init(suite_path, context_name, None, tool_name, prefix_char)
     retcode = w.run(*(_cli_args or []))
     sys.exit(retcode)
 
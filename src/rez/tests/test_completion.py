@@ -47,8 +47,9 @@ class TestCompletion(TestBase):
             self.assertEqual(set(completions), set(expected_completions))
 
         _eq("zzz", [])
-        _eq("", ["bahish", "nada", "nopy", "pybah", "pydad", "pyfoo", "pymum",
-                 "pyodd", "pyson", "pysplit", "python", "pyvariants",
+        _eq("", ["bahish", "nada", "nopy", "ping", "plain", "pong", "pybah",
+                 "pydad", "pyfoo", "pymum", "pyodd", "pyson", "pysplit",
+                 "python", "pyvariants",
                  "test_variant_split_start", "test_variant_split_mid1",
                  "test_variant_split_mid2", "test_variant_split_end"])
         _eq("py", ["pybah", "pydad", "pyfoo", "pymum", "pyodd", "pyson",
@@ -4,10 +4,13 @@ test resolved contexts
 from rez.tests.util import restore_os_environ, restore_sys_path, TempdirMixin, \
     TestBase
 from rez.resolved_context import ResolvedContext
+from rez.solver import SolverCallbackReturn
 from rez.bind import hello_world
 from rez.utils.platform_ import platform_
+import rez
 import unittest
 import subprocess
+import sys
 import os.path
 import os
 
@@ -82,6 +85,64 @@ class TestContext(TestBase, TempdirMixin):
 
         self.assertEqual(parts, ["covfefe", "hello"])
 
+    def test_exec_command(self):
+        """Test running a command directly in a context."""
+        if platform_.name == "windows":
+            self.skipTest("This test does not run on Windows, where commands "
+                          "are never exec'd")
+
+        packages_path = os.path.join(self.root, "exec_packages")
+        package_path = os.path.join(packages_path, "unsetter", "1")
+        os.makedirs(package_path)
+
+        with open(os.path.join(package_path, "package.py"), 'w') as f:
+            f.write(
+                "name = 'unsetter'\n"
+                "version = '1'\n"
+                "def commands():\n"
+                "    unsetenv('REZ_TEST_UNSET')\n")
+
+        # an unsaved context runs the command as a child process
+        r = ResolvedContext(["hello_world", "unsetter"],
+                            package_paths=self.settings["packages_path"]
+                            + [packages_path])
+        retcode = r.exec_command(["sh", "-c", 'exit "${#OH_HAI_WORLD}"'])
+        self.assertEqual(retcode, len("hello"))
+
+        # the parent environ is inherited
+        with restore_os_environ():
+            os.environ["REZ_TEST_INHERITED"] = "inherited"
+            retcode = r.exec_command(
+                ["sh", "-c", 'exit "${#REZ_TEST_INHERITED}"'])
+        self.assertEqual(retcode, len("inherited"))
+
+        # vars unset by the context are removed, as in a shell
+        with restore_os_environ():
+            os.environ["REZ_TEST_UNSET"] = "unset"
+            retcode = r.exec_command(
+                ["sh", "-c", 'exit "${#REZ_TEST_UNSET}"'])
+        self.assertEqual(retcode, 0)
+
+        # a saved context is exec'd, so test it in another process
+        file = os.path.join(self.root, "test_exec.rxt")
+        r.save(file)
+
+        code = ("import sys; "
+                "from rez.resolved_context import ResolvedContext; "
+                "r = ResolvedContext.load(sys.argv[1]); "
+                "r.exec_command(['sh', '-c', "
+                "'echo $OH_HAI_WORLD $REZ_RXT_FILE $REZ_TEST_INHERITED "
+                "${REZ_TEST_UNSET-unset}; . $REZ_CONTEXT_FILE'])")
+
+        env = os.environ.copy()
+        env["PYTHONPATH"] = os.path.dirname(os.path.dirname(rez.__file__))
+        env["REZ_TEST_INHERITED"] = "inherited"
+        env["REZ_TEST_UNSET"] = "set"
+        out = subprocess.check_output([sys.executable, "-c", code, file],
+                                      env=env)
+        self.assertEqual(out.decode("utf-8").split(),
+                         ["hello", file, "inherited", "unset"])
+
     def test_serialize(self):
         """Test save/load of context."""
         # save
@@ -92,6 +153,206 @@ class TestContext(TestBase, TempdirMixin):
         r2 = ResolvedContext.load(file)
         self.assertEqual(r.resolved_packages, r2.resolved_packages)
 
+    def test_serialize_lazy(self):
+        """Test lazy load of context."""
+        file = os.path.join(self.root, "test_lazy.rxt")
+        r = ResolvedContext(["hello_world"])
+        r.save(file)
+
+        r2 = ResolvedContext.load(file, lazy=True)
+        self.assertTrue(r2.has_graph)
+        self.assertIsNotNone(r2._deferred_graph)
+        self.assertIsNotNone(r2._resolved_package_handles)
+
+        # a lazy context writes the same data, without loading anything
+        self.assertEqual(r2.to_dict(), r.to_dict())
+        self.assertIsNotNone(r2._resolved_package_handles)
+
+        self.assertEqual(r.resolved_packages, r2.resolved_packages)
+        self.assertEqual(r2.resolved_packages[0].context, r2)
+        r3 = ResolvedContext.load(file)
+        self.assertEqual(r2.graph_string, r3.graph_string)
+        self.assertEqual(r2.graph(as_dot=True), r3.graph(as_dot=True))
+
+    def test_serialize_binary(self):
+        """Test save/load of binary context."""
+        from rez.utils import binary_context
+
+        file = os.path.join(self.root, "test_binary.rxt")
+        r = ResolvedContext(["hello_world"])
+
+        self.update_settings(dict(rxt_as_binary=True))
+        r.save(file)
+
+        with open(file, "rb") as f:
+            self.assertTrue(binary_context.is_binary(f.read()))
+
+        for lazy in (False, True):
+            r2 = ResolvedContext.load(file, lazy=lazy)
+            self.assertEqual(r2.to_dict(), r.to_dict())
+            self.assertEqual(r.resolved_packages, r2.resolved_packages)
+            self.assertEqual(r2.graph(as_dot=True),
+                             ResolvedContext.load(file).graph(as_dot=True))
+
+    def test_seeded_resolve(self):
+        """Test resolving with a previous context as a seed."""
+        path = os.path.dirname(__file__)
+        packages_path = [os.path.join(path, "data", "solver", "packages")]
+
+        def _resolve(request, seed_context=None):
+            r = ResolvedContext(request, package_paths=packages_path,
+                                seed_context=seed_context)
+            self.assertTrue(r.success)
+            return r
+
+        def _resolved(r):
+            return [x.qualified_package_name for x in r.resolved_packages]
+
+        # python's request is unchanged, so it keeps its version
+        r = _resolve(["pyfoo-3.0", "python"])
+        self.assertEqual(_resolved(r), ["python-2.5.2", "pyfoo-3.0.0"])
+
+        r2 = _resolve(["pyfoo", "python"], seed_context=r)
+        self.assertEqual(_resolved(r2), ["python-2.5.2", "pyfoo-3.0.0"])
+
+        r3 = _resolve(["pyfoo", "python"])
+        self.assertEqual(_resolved(r3), ["python-2.6.8", "pyfoo-3.1.0"])
+
+        # the seed conflicts with the new request, so a full resolve is done
+        r = _resolve(["python"])
+        r2 = _resolve(["python", "pyfoo"], seed_context=r)
+        self.assertEqual(_resolved(r2), ["python-2.6.8", "pyfoo-3.1.0"])
+
+        # a seeded solve stopped by max_fails is not retried as a full solve
+        num_solves = []
+
+        def _callback(state):
+            num_solves.append(state.num_solves)
+            return SolverCallbackReturn.keep_going, ''
+
+        r = _resolve(["python", "nada"])
+        r2 = ResolvedContext(["python", "pyodd"], package_paths=packages_path,
+                             seed_context=r, max_fails=1, callback=_callback)
+        self.assertFalse(r2.success)
+        self.assertTrue(num_solves)
+        self.assertEqual(num_solves, sorted(set(num_solves)))
+
+    def test_resolve_batch(self):
+        """Test resolving many requests with a shared package cache."""
+        from rez.resolve_batch import resolve_batch
+
+        path = os.path.dirname(__file__)
+        packages_path = [os.path.join(path, "data", "solver", "packages")]
+
+        requests = [["pyfoo", "python"],
+                    ["pybah"],
+                    ["pyfoo-3.0", "pybah-4"],
+                    ["python-2.5", "pyodd"]]
+
+        def _resolved(r):
+            return [x.qualified_package_name
+                    for x in (r.resolved_packages or [])]
+
+        expected = []
+        for request in requests:
+            r = ResolvedContext(request, package_paths=packages_path)
+            expected.append((r.status, _resolved(r)))
+
+        for processes in (1, 2):
+            contexts = resolve_batch(requests, processes=processes,
+                                     package_paths=packages_path)
+            result = [(r.status, _resolved(r)) for r in contexts]
+            self.assertEqual(result, expected)
+
+    def test_partial_resolve(self):
+        """Test that an aborted resolve holds the best partial resolve."""
+        from rez.resolver import ResolverStatus
+        from rez.solver import SolverCallbackReturn
+
+        path = os.path.dirname(__file__)
+        packages_path = [os.path.join(path, "data", "solver", "packages")]
+
+        def _callback(state):
+            if state.num_solves >= 2:
+                return SolverCallbackReturn.abort, "out of time"
+            return SolverCallbackReturn.keep_going, ''
+
+        r = ResolvedContext(["pyodd", "python"], package_paths=packages_path,
+                            callback=_callback)
+        self.assertEqual(r.status, ResolverStatus.aborted)
+        self.assertEqual(r.failure_description, "out of time")
+
+        solved = [x.qualified_package_name for x in r.partial_packages]
+        unresolved = [x.name for x in r.unresolved_requests]
+        self.assertEqual(solved, ["pyodd-2"])
+        self.assertEqual(unresolved, ["python", "pybah"])
+        self.assertEqual(r.solve_stats["global"]["num_solves"], 2)
+
+    def test_environ_cache(self):
+        """Test replaying cached package commands."""
+        packages_path = os.path.join(self.root, "environ_packages")
+        package_path = os.path.join(packages_path, "envreader", "1")
+        os.makedirs(package_path)
+
+        with open(os.path.join(package_path, "package.py"), 'w') as f:
+            f.write(
+                "name = 'envreader'\n"
+                "version = '1'\n"
+                "def commands():\n"
+                "    if defined('ENVREADER_MODE'):\n"
+                "        env.ENVREADER_RESULT = str(env.ENVREADER_MODE)\n"
+                "    else:\n"
+                "        env.ENVREADER_RESULT = 'default'\n"
+                "    env.PATH.append('{root}/bin')\n")
+
+        cache_path = os.path.join(self.root, "environ_cache")
+        self.update_settings(dict(environ_cache_path=cache_path))
+
+        r = ResolvedContext(["envreader"], package_paths=[packages_path])
+        executed = []
+
+        def _execute_packages(executor):
+            executed.append(True)
+            ResolvedContext._execute_packages(r, executor)
+
+        r._execute_packages = _execute_packages
+
+        def _get(parent_environ):
+            env = r.get_environ(parent_environ=parent_environ)
+            return env["ENVREADER_RESULT"], env["PATH"].split(os.pathsep)[0]
+
+        root = r.get_resolved_package("envreader").root
+        bin_path = os.path.join(root, "bin")
+
+        # commands are executed once, then replayed
+        self.assertEqual(_get({}), ("default", bin_path))
+        self.assertEqual(_get({}), ("default", bin_path))
+        self.assertEqual(len(executed), 1)
+
+        # a variable read by the commands has changed
+        self.assertEqual(_get({"ENVREADER_MODE": "a"}), ("a", bin_path))
+        self.assertEqual(len(executed), 2)
+
+        # unrelated variables do not matter
+        self.assertEqual(_get({"ENVREADER_MODE": "a", "FOO": "1"}),
+                         ("a", bin_path))
+        self.assertEqual(_get({"FOO": "1"}), ("default", bin_path))
+        self.assertEqual(len(executed), 2)
+
+    def test_local_resolve_cache(self):
+        """Test resolve caching to the local resolve cache."""
+        cache_path = os.path.join(self.root, "resolve_cache")
+        self.update_settings(dict(resolve_caching=True,
+                                  memcached_uri=[],
+                                  resolve_cache_path=cache_path))
+
+        r = ResolvedContext(["hello_world"])
+        self.assertFalse(r.from_cache)
+
+        r2 = ResolvedContext(["hello_world"])
+        self.assertTrue(r2.from_cache)
+        self.assertEqual(r.resolved_packages, r2.resolved_packages)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -19,6 +19,7 @@ class TestImports(TestBase):
         import rez.package_resources
         import rez.package_search
         import rez.package_serialise
+        import rez.package_watcher
         import rez.packages
         import rez.plugin_managers
         import rez.release_hook
@@ -50,6 +51,23 @@ class TestImports(TestBase):
         import rez.utils.memcached
         import rez.utils.yaml
 
+    def test_wrapper_startup(self):
+        """check that running a suite tool doesn't import the solver."""
+        import rez
+        import subprocess
+        import sys
+        import os.path
+
+        code = ("import sys, rez.suite, rez.wrapper; "
+                "print(' '.join(x for x in ('rez.solver', 'rez.utils.graph_utils') "
+                "if x in sys.modules))")
+
+        env = os.environ.copy()
+        env["PYTHONPATH"] = os.path.dirname(os.path.dirname(rez.__file__))
+        out = subprocess.check_output([sys.executable, "-c", code], env=env,
+                                      universal_newlines=True)
+        self.assertEqual(out.strip(), '')
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -2,7 +2,8 @@
 test package iteration, serialization etc
 """
 from rez.packages import iter_package_families, iter_packages, get_package, \
-    create_package, get_developer_package
+    create_package, get_developer_package, get_last_release_time, \
+    get_last_release_times
 from rez.package_py_utils import expand_requirement
 from rez.package_repository import create_memory_package_repository
 from rez.package_resources import package_release_keys
@@ -16,6 +17,7 @@ from rez.vendor.version.util import VersionError
 from rez.utils.filesystem import canonical_path
 import os.path
 import os
+import shutil
 
 
 ALL_PACKAGES = set([
@@ -23,6 +25,9 @@ ALL_PACKAGES = set([
     'bahish-1', 'bahish-2',
     'nada',
     'nopy-2.1',
+    'ping-1', 'ping-2',
+    'plain-1', 'plain-2',
+    'pong-1', 'pong-2',
     'pybah-4', 'pybah-5',
     'pydad-1', 'pydad-2', 'pydad-3',
     'pyfoo-3.0.0', 'pyfoo-3.1.0',
@@ -88,6 +93,26 @@ class TestPackages(TestBase, TempdirMixin):
     def tearDownClass(cls):
         TempdirMixin.tearDownClass()
 
+    def _create_repository(self, name, **settings):
+        """Copy the py packages into a new repository, and use it as the only
+        packages path. Any settings are filesystem repository settings.
+        """
+        repo_path = os.path.join(self.root, name)
+        shutil.copytree(self.py_packages_path, repo_path,
+                        ignore=shutil.ignore_patterns("__pycache__"))
+
+        new_settings = dict(packages_path=[repo_path])
+        if settings:
+            new_settings["plugins"] = dict(
+                package_repository=dict(filesystem=settings))
+
+        self.update_settings(new_settings)
+        return repo_path
+
+    @classmethod
+    def _versions(cls, name):
+        return set(str(p.version) for p in iter_packages(name))
+
     def test_1(self):
         """package family iteration."""
         all_fams = _to_names(iter_package_families())
@@ -471,6 +496,237 @@ class TestPackages(TestBase, TempdirMixin):
         _test(fam_orderer, "timestamped", expected_timestamp_result)
         _test(fam_orderer, "pymum", ["1", "2", "3"])
 
+    def test_last_release_times(self):
+        """test bulk query of last release times."""
+        names = ["python", "pyfoo", "versioned", "multi", "doesnotexist"]
+        times = get_last_release_times(names)
+        expected = dict((x, get_last_release_time(x)) for x in names)
+        self.assertEqual(times, expected)
+        self.assertEqual(times["doesnotexist"], 0)
+        self.assertNotEqual(times["python"], 0)
+
+    def test_package_index(self):
+        """test reading packages via a repository's package index."""
+        from rez.package_repository import package_repository_manager
+
+        repo_path = self._create_repository("indexed_packages",
+                                            package_index=True)
+
+        def _packages():
+            return set(p.qualified_name for p in iter_packages("versioned"))
+
+        expected = _packages()
+        expected_data = get_package("versioned", "3.0").validated_data()
+
+        repo = package_repository_manager.get_repository(repo_path)
+        repo.update_index()
+        self.assertTrue(os.path.isfile(repo._index_filepath))
+        self.assertIsNotNone(repo._get_index_family("versioned"))
+        self.assertIsNotNone(repo._get_index_package("versioned", "3.0"))
+
+        self.assertEqual(_packages(), expected)
+        package = get_package("versioned", "3.0")
+        self.assertEqual(package.validated_data(), expected_data)
+
+        # a new version invalidates the family's entry, but not others
+        src_path = os.path.join(repo_path, "versioned", "3.0")
+        shutil.copytree(src_path, os.path.join(repo_path, "versioned", "4.0"))
+        repo.clear_caches()
+        self.assertIsNone(repo._get_index_family("versioned"))
+        self.assertIsNotNone(repo._get_index_family("timestamped"))
+        self.assertEqual(_packages(), expected | set(["versioned-4.0"]))
+
+        repo.update_index(["versioned"])
+        self.assertIsNotNone(repo._get_index_family("versioned"))
+        self.assertEqual(_packages(), expected | set(["versioned-4.0"]))
+
+        # the family listing is read from the index, which updating the index
+        # does not invalidate
+        def _list_family_dirs():
+            raise AssertionError("family dirs were listed")
+
+        expected_names = set(x.name for x in iter_package_families())
+        repo.clear_caches()
+        repo._list_family_dirs = _list_family_dirs
+        try:
+            names = set(x.name for x in iter_package_families())
+        finally:
+            del repo._list_family_dirs
+        self.assertEqual(names, expected_names)
+
+    def test_version_dir_markers(self):
+        """test that ignored and still building versions are skipped."""
+        from rez.package_repository import package_repository_manager
+
+        repo_path = self._create_repository("marked_packages")
+        family_path = os.path.join(repo_path, "timestamped")
+
+        def _touch(name):
+            open(os.path.join(family_path, name), 'w').close()
+
+        versions = self._versions("timestamped")
+        self.assertIn("2.1.5", versions)
+
+        # ignored version
+        _touch(".ignore2.1.5")
+        # unfinished build, no package definition file yet
+        os.mkdir(os.path.join(family_path, "3.0.0"))
+        _touch(".building3.0.0")
+        # finished build, with a stale tagfile
+        shutil.copytree(os.path.join(family_path, "2.0.0"),
+                        os.path.join(family_path, "3.1.0"))
+        _touch(".building3.1.0")
+
+        package_repository_manager.clear_caches()
+        self.assertEqual(self._versions("timestamped"),
+                         (versions - set(["2.1.5"])) | set(["3.1.0"]))
+
+    def test_package_file_cache(self):
+        """test the local package file cache."""
+        from rez.serialise import load_from_file, FileFormat, package_file_cache
+
+        cache_path = os.path.join(self.root, "package_file_cache")
+        self.update_settings(dict(package_file_cache_path=cache_path,
+                                  memcached_uri=[]))
+
+        filepath = os.path.join(self.root, "cached_package", "package.py")
+        os.makedirs(os.path.dirname(filepath))
+        shutil.copy(os.path.join(self.py_packages_path, "versioned", "3.0",
+                                 "package.py"), filepath)
+
+        def _load():
+            return load_from_file(filepath, FileFormat.py)
+
+        data = _load()
+        self.assertTrue(isinstance(data["commands"], SourceCode))
+
+        cache_filepath = package_file_cache._get_filepath(
+            cache_path, os.path.realpath(filepath))
+        self.assertTrue(os.path.isfile(cache_filepath))
+        self.assertEqual(_load(), data)
+
+        # replace the cached data, to show that it is used
+        key, _ = package_file_cache._read_entry(cache_filepath)
+        package_file_cache._write(cache_filepath, key, dict(data, description="cached"))
+        self.assertEqual(_load()["description"], "cached")
+
+        # a changed file is loaded again
+        with open(filepath, 'a') as f:
+            f.write("\ndescription = 'changed'\n")
+        os.utime(filepath, (0, 0))
+        self.assertEqual(_load()["description"], "changed")
+
+        # a corrupt entry is just loaded again
+        with open(cache_filepath, "wb") as f:
+            f.write(b"corrupt")
+        self.assertEqual(_load()["description"], "changed")
+
+    def test_family_cache_invalidation(self):
+        """test clearing the cached data of a single package family."""
+        from rez.package_repository import package_repository_manager
+
+        repo_path = self._create_repository("invalidated_packages",
+                                            cache_maxsize=100)
+        versions = self._versions("versioned")
+        timestamped_versions = self._versions("timestamped")
+
+        repo = package_repository_manager.get_repository(repo_path)
+        stats = package_repository_manager.get_cache_stats()
+        self.assertEqual(stats["repositories"][str(repo)],
+                         repo.get_cache_stats())
+        self.assertEqual(stats["repositories"][str(repo)]["packages"]["maxsize"], 100)
+
+        # a new version is not seen until its family's caches are cleared
+        shutil.copytree(os.path.join(repo_path, "versioned", "3.0"),
+                        os.path.join(repo_path, "versioned", "4.0"))
+        self.assertEqual(self._versions("versioned"), versions)
+
+        package_repository_manager.clear_family_caches("versioned")
+        self.assertEqual(self._versions("versioned"), versions | set(["4.0"]))
+
+        # other families are still cached
+        misses = repo.get_cache_stats()["packages"]["misses"]
+        self.assertEqual(self._versions("timestamped"), timestamped_versions)
+        self.assertEqual(repo.get_cache_stats()["packages"]["misses"], misses)
+
+    def test_package_watcher(self):
+        """test that a package watcher clears the caches of changed families."""
+        from rez.package_watcher import PackageWatcher, _Inotify
+        import errno
+        import time
+
+        repo_path = self._create_repository("watched_packages")
+
+        try:
+            _Inotify().close()
+            has_inotify = True
+        except OSError:
+            has_inotify = False
+
+        for use_inotify in (False, True):
+            versions = self._versions("versioned")
+            missing_path = os.path.join(self.root,
+                                        "missing_packages_%d" % use_inotify)
+            watcher = PackageWatcher(paths=[repo_path, missing_path],
+                                     use_inotify=use_inotify)
+
+            try:
+                if use_inotify and has_inotify:
+                    # a repository that doesn't exist is polled instead
+                    self.assertIsNotNone(watcher.inotify)
+                    self.assertEqual(list(watcher.repo_states), [missing_path])
+                else:
+                    self.assertIsNone(watcher.inotify)
+                    self.assertEqual(set(watcher.repo_states),
+                                     set([repo_path, missing_path]))
+
+                self.assertEqual(watcher.poll(), {})
+
+                new_version = str(len(versions) + 10)
+                family_path = os.path.join(repo_path, "versioned")
+                shutil.copytree(os.path.join(family_path, "3.0"),
+                                os.path.join(family_path, new_version))
+                # make sure the mtime changes, regardless of its resolution
+                t = time.time() + 10
+                os.utime(family_path, (t, t))
+
+                self.assertEqual(watcher.poll(timeout=1),
+                                 {repo_path: set(["versioned"])})
+                self.assertEqual(self._versions("versioned"),
+                                 versions | set([new_version]))
+
+                # a new family
+                shutil.copytree(family_path, os.path.join(repo_path, "watched" + new_version))
+                t = time.time() + 20
+                os.utime(repo_path, (t, t))
+                self.assertIn("watched" + new_version,
+                              watcher.poll(timeout=1)[repo_path])
+
+                # the missing repository is created
+                shutil.copytree(family_path, os.path.join(missing_path, "created"))
+                self.assertEqual(watcher.poll(timeout=1),
+                                 {missing_path: set(["created"])})
+
+                if not watcher.inotify:
+                    continue
+
+                # a family that cannot be watched switches to polling
+                def _add_watch(path, mask):
+                    raise OSError(errno.ENOSPC, "out of watches")
+
+                watcher.inotify.add_watch = _add_watch
+                shutil.copytree(family_path, os.path.join(repo_path, "unwatched"))
+                self.assertEqual(watcher.poll(timeout=1),
+                                 {repo_path: None, missing_path: None})
+                self.assertIsNone(watcher.inotify)
+
+                shutil.rmtree(os.path.join(repo_path, "unwatched"))
+                t = time.time() + 30
+                os.utime(repo_path, (t, t))
+                self.assertEqual(watcher.poll(), {repo_path: set(["unwatched"])})
+            finally:
+                watcher.close()
+
 
 class TestMemoryPackages(TestBase):
     def test_1_memory_variant_parent(self):
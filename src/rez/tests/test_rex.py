@@ -357,6 +357,102 @@ class TestRex(TestBase):
                        'BAH': 'omg',
                        'FOO': os.pathsep.join(['omg', '${BAH}', 'like']) + ', $SHE said, omg'})
 
+    def test_dedup_paths(self):
+        """Test deduplication of path-like variables."""
+        self.update_settings(dict(dedup_path_variables=True))
+
+        def _rex():
+            env.PATH.prepend("/c")
+            env.PATH.append("/a")
+            env.PATH.prepend("/b")
+            env.PATH.append(os.pathsep.join(["/d", "/c"]))
+            setenv("FOO", "$PATH")
+            env.PATH.append("/d")
+            env.PYTHONPATH.append("/p")
+            env.PYTHONPATH.append("/p")
+
+        ex = self._create_executor({"PATH": os.pathsep.join(["/a", "/b"])},
+                                   parent_variables=["PATH"])
+        ex.execute_function(_rex)
+
+        path = os.pathsep.join(["/b", "/c", "/a", "/d"])
+        self.assertEqual(ex.get_output(), {"PATH": path,
+                                           "FOO": path,
+                                           "PYTHONPATH": "/p"})
+
+        stats = ex.manager.path_stats
+        self.assertEqual(stats["PYTHONPATH"]["duplicates"], 1)
+        self.assertEqual(stats["PATH"]["duplicates"], 4)
+
+    def test_coalesce_pends(self):
+        """Test coalescing of appends/prepends into single setenvs."""
+        from rez.shells import create_shell
+
+        def _rex():
+            env.PATH.prepend("/c")
+            env.PATH.append("/d")
+            env.BAH.append("1")
+            env.BAH.append(literal("$EEK"))
+            setenv("FOO", "$BAH")
+            env.BAH.prepend("0")
+            command("hello")
+            env.PATH.append("/e")
+
+        def _execute(interpreter, coalesce):
+            self.update_settings(dict(coalesce_env_var_pends=coalesce))
+            ex = RexExecutor(interpreter=interpreter,
+                             parent_environ={"PATH": "/a"},
+                             parent_variables=["PATH"],
+                             shebang=False)
+            ex.execute_function(_rex)
+            return ex.get_output()
+
+        self.assertEqual(_execute(Python(target_environ={}, passive=True), True),
+                         _execute(Python(target_environ={}, passive=True), False))
+
+        script = _execute(create_shell("bash"), True)
+        self.assertEqual(script.strip().split('\n'), [
+            "export BAH=\"1:\"'$EEK'",
+            'export FOO="${BAH}"',
+            'export PATH="/c:${PATH}:/d"',
+            'export BAH="0:${BAH}"',
+            'hello',
+            'export PATH="${PATH}:/e"'])
+
+    def test_bytecode_cache(self):
+        """Test the persistent bytecode cache."""
+        from rez.utils.sourcecode import SourceCode, bytecode_cache
+        import tempfile
+        import shutil
+
+        path = tempfile.mkdtemp(prefix="rez_test_bytecode_cache_")
+        self.update_settings(dict(bytecode_cache_path=path))
+
+        def _execute(source):
+            ex = self._create_executor({})
+            ex.execute_code(SourceCode(source))
+            return ex.get_output()
+
+        try:
+            source = "setenv('FOO', 'foo')"
+            self.assertEqual(_execute(source), {"FOO": "foo"})
+            self.assertEqual(len(os.listdir(path)), 1)
+
+            # replace the cached code, to show that it is used
+            filepath = os.path.join(path, os.listdir(path)[0])
+            code = SourceCode(source)
+            pyc = compile(code.evaluated_code.replace("foo", "bah"),
+                          code.sourcename, 'exec')
+            bytecode_cache._write(filepath, pyc)
+            self.assertEqual(_execute(source), {"FOO": "bah"})
+
+            # a corrupt entry is just recompiled
+            with open(filepath, "wb") as f:
+                f.write(b"corrupt")
+            self.assertEqual(_execute(source), {"FOO": "foo"})
+        finally:
+            shutil.rmtree(path)
+
     def test_version_binding(self):
         """Test the Rex binding of the Version class."""
         v = VersionBinding(Version("1.2.3alpha"))
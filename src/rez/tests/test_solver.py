@@ -223,6 +223,79 @@ class TestSolver(TestBase):
                      "test_variant_split_mid2-2.0[0]",
                      "test_variant_split_start-1.0[1]"])
 
+    def test_12_indexed_intersection(self):
+        """Test that version range intersection bisects a family's versions."""
+        s = self._solve(["python-2.6"],
+                        ["python-2.6.8[]"])
+
+        stats = s.solve_stats["intersections"]
+        self.assertTrue(stats["num_variant_list_intersections"] > 0)
+        # python-2.5.2 and python-2.7.0 are never tested for containment
+        self.assertTrue(stats["num_variant_list_entries_skipped"] >= 2)
+
+    def test_13_prefetch(self):
+        """Test that prefetching packages does not change the resolve."""
+        self.update_settings(dict(solver_prefetch_thread_count=4,
+                                  solver_prefetch_max_versions=2))
+
+        s = self._solve(["python", "pyodd"],
+                        ["python-2.6.8[]", "pybah-4[]", "pyodd-2[]"])
+
+        # the latest two packages of python, pyodd, and of the families that
+        # pyodd-1 and pyodd-2 require (pyfoo, pybah)
+        stats = s.solve_stats["global"]
+        self.assertEqual(stats["num_prefetched_packages"], 8)
+        self.assertEqual(set(s.package_cache.variant_lists.keys()),
+                         set(["python", "pyodd", "pyfoo", "pybah"]))
+
+        self._fail("bahish", "pybah<5")
+
+    def test_14_nogoods(self):
+        """Test that a failure learned in one branch of a solve is reused."""
+        s = self._fail("plain", "ping")
+
+        stats = s.solve_stats["nogoods"]
+        self.assertTrue(stats["num_nogoods_learned"] > 0)
+        # the ping conflict is not solved again under plain-1
+        self.assertEqual(stats["num_nogoods_used"], 1)
+
+    def test_15_reduction_memo(self):
+        """Test that conflict tests are memoised across phases."""
+        s = self._solve(["test_variant_split_start"],
+                        ["test_variant_split_end-1.0[1]",
+                         "test_variant_split_mid2-2.0[0]",
+                         "test_variant_split_start-1.0[1]"])
+
+        stats = s.solve_stats["reductions"]
+        self.assertTrue(stats["num_reduction_memo_hits"] > 0)
+        self.assertEqual(len(s.reduction_memo),
+                         stats["num_reduction_memo_misses"])
+
+    def test_16_profile(self):
+        """Test that a profiled solve attributes costs to families."""
+        reqs = [Requirement("python"), Requirement("pyodd")]
+        s = Solver(reqs, self.packages_path, profile=True)
+        s.solve()
+        self.assertEqual(s.status, SolverStatus.solved)
+
+        profile = s.profile
+        fams = set(x[0] for x in profile.get_family_times())
+        self.assertEqual(fams, set(["python", "pyodd", "pyfoo", "pybah"]))
+
+        self.assertEqual(profile.family_stats["pyodd"]["load"][0], 1)
+        self.assertTrue(profile.family_stats["python"]["intersect"][0] > 0)
+        self.assertTrue("pyodd" in profile.request_stats)
+        self.assertEqual(len(profile.depths), s.num_solves)
+
+        d = profile.to_dict()
+        self.assertTrue(d["traceEvents"])
+        lines = profile.get_folded_stacks()
+        self.assertTrue("solve;pyodd;load " in '\n'.join(lines))
+
+        # profiling is off by default
+        s = Solver(reqs, self.packages_path)
+        self.assertEqual(s.profile, None)
+
 
 if __name__ == '__main__':
     unittest.main()
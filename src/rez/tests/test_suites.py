@@ -135,6 +135,79 @@ class TestRezSuites(TestBase, TempdirMixin):
 
         self._test_serialization(s)
 
+    def test_save_incremental(self):
+        """Test adding requests, and saving over an existing suite."""
+        s = Suite()
+        s.add_requests([("foo", ["foo"]), ("bah", ["bah"])], processes=2)
+        self.assertEqual(set(s.get_tools().keys()),
+                         set(["fooer", "bahbah", "blacksheep"]))
+
+        path = os.path.join(self.root, "suite_incremental")
+        s.save(path)
+
+        def _mtimes():
+            return dict(
+                (name, os.path.getmtime(os.path.join(path, dirname, name)))
+                for dirname in ("contexts", "bin")
+                for name in os.listdir(os.path.join(path, dirname)))
+
+        mtimes = _mtimes()
+        self.assertEqual(set(mtimes.keys()),
+                         set(["foo.rxt", "bah.rxt", "fooer", "bahbah",
+                              "blacksheep"]))
+
+        # unchanged contexts and wrappers are not rewritten, and those no
+        # longer in the suite are removed
+        s = Suite.load(path)
+        s.alias_tool("bah", "blacksheep", "whitesheep")
+        s.remove_context("foo")
+        s.save(path)
+
+        mtimes2 = _mtimes()
+        self.assertEqual(set(mtimes2.keys()),
+                         set(["bah.rxt", "bahbah", "whitesheep"]))
+        self.assertEqual(mtimes2["bah.rxt"], mtimes["bah.rxt"])
+        self.assertEqual(mtimes2["bahbah"], mtimes["bahbah"])
+
+        s2 = Suite.load(path)
+        self.assertEqual(s.get_tools(), s2.get_tools())
+
+    def test_tool_index(self):
+        """Test looking up tools in a saved suite via its tool index."""
+        c_foo = ResolvedContext(["foo"])
+        c_bah = ResolvedContext(["bah"])
+        s = Suite()
+        s.add_context("foo", c_foo)
+        s.add_context("bah", c_bah)
+        s.add_context("bah2", c_bah)
+        s.alias_tool("foo", "fooer", "floober")
+
+        path = os.path.join(self.root, "suite_tool_index")
+        s.save(path)
+
+        # tools are looked up without loading any contexts
+        s2 = Suite.load(path)
+        self.assertEqual(s2.get_tool_index(), s.get_tool_index())
+        self.assertEqual(s2.get_tool_context("floober"), "foo")
+        self.assertEqual(s2.get_tool_context("bahbah"), "bah2")
+        self.assertEqual(set(s2.get_tool_index()["tool_conflicts"].keys()),
+                         set(["bahbah", "blacksheep"]))
+        self.assertFalse(any("context" in x for x in s2.contexts.values()))
+
+        entry = s2.get_tool_index()["tools"]["floober"]
+        self.assertEqual(entry["tool_name"], "fooer")
+        self.assertEqual(entry["variant"],
+                         c_foo.get_resolved_package("foo").qualified_package_name)
+
+        # an unchanged suite is saved without loading its contexts
+        s2.save(path)
+        self.assertFalse(any("context" in x for x in s2.contexts.values()))
+        self.assertEqual(Suite.load(path).get_tool_index(), s.get_tool_index())
+
+        # once modified, the saved index is no longer used
+        s2.bump_context("bah")
+        self.assertEqual(s2.get_tool_context("bahbah"), "bah")
+
 
 if __name__ == '__main__':
     unittest.main()
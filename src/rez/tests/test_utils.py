@@ -1,9 +1,12 @@
 """
-unit tests for 'utils.filesystem' module
+unit tests for 'utils.filesystem', 'utils.local_cache' and 'backport.lru_cache'
+modules
 """
 import os
-from rez.tests.util import TestBase
+from rez.tests.util import TestBase, TempdirMixin
+from rez.backport.lru_cache import lru_cache
 from rez.utils import filesystem
+from rez.utils.local_cache import LocalCache
 from rez.utils.platform_ import Platform, platform_
 
 
@@ -46,6 +49,91 @@ class TestCanonicalPath(TestBase):
         self.assertEqual(path, expects)
 
 
+class TestLocalCache(TestBase, TempdirMixin):
+    @classmethod
+    def setUpClass(cls):
+        TempdirMixin.setUpClass()
+        cls.settings = {}
+
+    @classmethod
+    def tearDownClass(cls):
+        TempdirMixin.tearDownClass()
+
+    def test_get_set(self):
+        cache = LocalCache(self.root, "test_get_set")
+        self.assertIs(cache.get("foo"), cache.miss)
+
+        cache.set("foo", {"a": [1, 2]})
+        self.assertEqual(cache.get("foo"), {"a": [1, 2]})
+
+        cache.delete("foo")
+        self.assertIs(cache.get("foo"), cache.miss)
+
+    def test_lru_eviction(self):
+        cache = LocalCache(self.root, "test_lru", maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")  # 'b' is now least recently used
+        cache.set("c", 3)
+
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIs(cache.get("b"), cache.miss)
+        self.assertEqual(cache.get("c"), 3)
+        self.assertEqual(cache.get_stats()["entries"], 2)
+
+
+class TestLruCache(TestBase):
+    def _cached(self, maxsize):
+        calls = []
+
+        @lru_cache(maxsize=maxsize)
+        def _double(x, offset=0):
+            calls.append(x)
+            return x * 2 + offset
+
+        return _double, calls
+
+    def test_stats(self):
+        for maxsize in (None, 2):
+            double, calls = self._cached(maxsize)
+            for x in (1, 2, 1, 3, 1):
+                self.assertEqual(double(x), x * 2)
+
+            info = double.cache_info()
+            self.assertEqual((info.hits, info.misses), (2, 3))
+            self.assertEqual(calls, [1, 2, 3])
+
+            # with maxsize 2, '2' was evicted when '3' was added
+            if maxsize is None:
+                self.assertEqual((info.evictions, info.currsize), (0, 3))
+            else:
+                self.assertEqual((info.evictions, info.currsize), (1, 2))
+
+            double.cache_clear()
+            self.assertEqual(tuple(double.cache_info()), (0, 0, 0, maxsize, 0))
+
+    def test_discard(self):
+        for maxsize in (None, 10):
+            double, calls = self._cached(maxsize)
+            for x in range(5):
+                double(x)
+            double(1, offset=1)
+
+            self.assertEqual(double.cache_discard(lambda x, offset=0: x == 1), 2)
+            self.assertEqual(double.cache_info().currsize, 4)
+
+            # discarded entries are recomputed, others are not
+            del calls[:]
+            for x in range(5):
+                double(x)
+            self.assertEqual(calls, [1])
+
+            # the LRU order survives a discard
+            for x in range(5, 20):
+                double(x)
+            self.assertEqual(double.cache_info().currsize, maxsize or 20)
+
+
 # Copyright 2013-2016 Allan Johns.
 #
 # This library is free software: you can redistribute it and/or
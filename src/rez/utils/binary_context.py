@@ -0,0 +1,252 @@
+"""
+Binary serialization of resolved contexts.
+
+A binary context consists of a fixed size header, a section table and the
+section data:
+
+    magic           8 bytes (see `magic`)
+    format version  uint16
+    num sections    uint16
+    section table   per section: name length (uint8), name (utf-8),
+                    data offset (uint32), data length (uint32)
+    section data    utf-8 encoded, compact json values
+
+All integers are big-endian, and offsets are relative to the end of the
+section table. The table can be read without decoding any of the section
+data, so a loader only pays for the sections it uses.
+
+A context dict (see `ResolvedContext.to_dict`) is stored as:
+
+    "strings"             The string table (list of str).
+    "resolved_packages"   Variant handles, with package names and locations
+                          interned into the string table.
+    "graph"               The resolve graph (it is usually the largest part).
+    "context"             All remaining fields, as one json object.
+"""
+from rez.utils import json
+from rez.vendor.six import six
+import struct
+
+
+basestring = six.string_types[0]
+
+
+# The first byte is not valid json/yaml, and the CRLF / EOF bytes detect
+# corruption by text-mode transfers (as in the PNG header)
+magic = b"\x89RXT\r\n\x1a\n"
+
+format_version = 1
+
+_header = struct.Struct(">HH")
+_name_length = struct.Struct(">B")
+_section_entry = struct.Struct(">II")
+
+# top-level context fields stored in their own section
+section_fields = ("resolved_packages", "graph")
+
+
+def is_binary(content):
+    """Test if the given content is a binary context.
+
+    Args:
+        content (bytes or str): Content, or at least the start of it.
+
+    Returns:
+        bool.
+    """
+    return isinstance(content, bytes) and content.startswith(magic)
+
+
+def dumps(doc):
+    """Encode a context dict.
+
+    Args:
+        doc (dict): Dict as returned by `ResolvedContext.to_dict`.
+
+    Returns:
+        bytes: Binary context.
+    """
+    strings = StringTable()
+    sections = {}
+
+    handles = doc.get("resolved_packages")
+    if handles is not None:
+        sections["resolved_packages"] = [_intern_handle(x, strings)
+                                         for x in handles]
+
+    if "graph" in doc:
+        sections["graph"] = doc["graph"]
+
+    sections["context"] = dict((k, v) for k, v in doc.items()
+                               if k not in section_fields)
+    sections["strings"] = strings.strings
+
+    table = []
+    data = []
+    offset = 0
+
+    for name, value in sorted(sections.items()):
+        encoded = json.dumps(value, separators=(',', ':')).encode("utf-8")
+        table.append((name.encode("utf-8"), offset, len(encoded)))
+        data.append(encoded)
+        offset += len(encoded)
+
+    out = [magic, _header.pack(format_version, len(table))]
+    for name, offset, length in table:
+        out.append(_name_length.pack(len(name)))
+        out.append(name)
+        out.append(_section_entry.pack(offset, length))
+
+    out.extend(data)
+    return b''.join(out)
+
+
+def loads(content, lazy_fields=None):
+    """Decode a binary context.
+
+    Args:
+        content (bytes): Binary context.
+        lazy_fields (list of str): Fields that should not be decoded. These
+            are returned as `LazySection` objects instead. Only the 'graph'
+            field can be lazily loaded.
+
+    Returns:
+        dict: Context dict, as accepted by `ResolvedContext.from_dict`.
+    """
+    sections = read_sections(content)
+
+    def _get(name):
+        return sections[name].load()
+
+    doc = _get("context")
+    strings = _get("strings")
+
+    if "resolved_packages" in sections:
+        doc["resolved_packages"] = [_unintern_handle(x, strings)
+                                    for x in _get("resolved_packages")]
+
+    if "graph" in sections:
+        if "graph" in (lazy_fields or ()):
+            doc["graph"] = sections["graph"]
+        else:
+            doc["graph"] = _get("graph")
+
+    return doc
+
+
+def read_sections(content):
+    """Read the section table of a binary context.
+
+    Note that no section data is decoded.
+
+    Args:
+        content (bytes): Binary context.
+
+    Returns:
+        dict: Section name to `LazySection`.
+    """
+    if not is_binary(content):
+        raise ValueError("Not a binary context")
+
+    pos = len(magic)
+    version, num_sections = _header.unpack_from(content, pos)
+    pos += _header.size
+
+    if version > format_version:
+        raise ValueError("Binary context was written by a newer version of "
+                         "Rez (format version %d > %d)"
+                         % (version, format_version))
+
+    entries = []
+    for _ in range(num_sections):
+        name_length, = _name_length.unpack_from(content, pos)
+        pos += _name_length.size
+        name = content[pos:pos + name_length].decode("utf-8")
+        pos += name_length
+        offset, length = _section_entry.unpack_from(content, pos)
+        pos += _section_entry.size
+        entries.append((name, offset, length))
+
+    view = memoryview(content)
+    sections = {}
+
+    for name, offset, length in entries:
+        start = pos + offset
+        if start + length > len(content):
+            raise ValueError("Binary context is truncated")
+        sections[name] = LazySection(view[start:start + length])
+
+    return sections
+
+
+class LazySection(object):
+    """A section of a binary context that is decoded on demand."""
+    def __init__(self, data):
+        self.data = data
+
+    def load(self):
+        return json.loads(self.data.tobytes().decode("utf-8"))
+
+
+class StringTable(object):
+    """A list of unique strings, each referenced by its index."""
+    def __init__(self):
+        self.strings = []
+        self.indexes = {}
+
+    def add(self, value):
+        i = self.indexes.get(value)
+        if i is None:
+            i = len(self.strings)
+            self.strings.append(value)
+            self.indexes[value] = i
+        return i
+
+
+# Variant handles store the package name and repository location in their
+# variables, eg:
+#
+#   {"key": "filesystem.variant",
+#    "variables": {"location": "/packages", "name": "foo", "index": 0, ...}}
+#
+# These values are replaced by their index in the string table. Since all the
+# variants in a context typically come from a few repositories, this saves a
+# lot of space in large contexts.
+#
+_interned_variables = ("location", "name")
+
+
+def _intern_handle(handle, strings):
+    variables = handle["variables"].copy()
+    for k in _interned_variables:
+        value = variables.get(k)
+        if isinstance(value, basestring):
+            variables[k] = strings.add(value)
+
+    return {"key": handle["key"], "variables": variables}
+
+
+def _unintern_handle(handle, strings):
+    variables = handle["variables"]
+    for k in _interned_variables:
+        value = variables.get(k)
+        if isinstance(value, int):
+            variables[k] = strings[value]
+
+    return handle
+
+
+# Copyright 2013-2016 Allan Johns.
+#
+# This library is free software: you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation, either
+# version 3 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library.  If not, see <http://www.gnu.org/licenses/>.
@@ -25,6 +25,38 @@ def add_sys_paths(paths):
         sys.path = original_syspath
 
 
+def threaded_map(func, iterable, num_threads):
+    """Like `map`, but calls `func` concurrently in a pool of threads.
+
+    This is intended for IO-bound work, such as stat'ing many files on a network
+    filesystem. Results are returned in the same order as `iterable`. If `func`
+    raises an exception, it is re-raised in the calling thread.
+
+    Args:
+        func (callable): Function to call on each item.
+        iterable: Items to map.
+        num_threads (int): Maximum number of threads to use. If less than 2,
+            items are mapped serially in the calling thread.
+
+    Returns:
+        list: Results of `func`.
+    """
+    items = list(iterable)
+    num_threads = min(num_threads, len(items))
+
+    if num_threads < 2:
+        return [func(x) for x in items]
+
+    from multiprocessing.pool import ThreadPool
+
+    pool = ThreadPool(num_threads)
+    try:
+        return pool.map(func, items)
+    finally:
+        pool.close()
+        pool.join()
+
+
 if six.PY2:
     class _PopenBase(subprocess.Popen):
         def __enter__(self):
@@ -111,6 +143,8 @@ def create_executable_script(filepath, body, program=None, py_script_mode=None):
     variable to include ".PY" in order to properly launch the command without
     the .py extension.
 
+    If a script already exists with the same contents, it is left untouched.
+
     Args:
         filepath (str): File to create.
         body (str or callable): Contents of the script. If a callable, its code
@@ -150,11 +184,21 @@ def create_executable_script(filepath, body, program=None, py_script_mode=None):
         script_filepaths = _get_python_script_files(filepath, py_script_mode,
                                                     platform_.name)
 
+    # TODO: make cross platform
+    content = "#!/usr/bin/env %s\n%s" % (program, body)
+
     for current_filepath in script_filepaths:
+        if os.path.exists(current_filepath):
+            with open(current_filepath) as f:
+                existing_content = f.read()
+            if existing_content == content:
+                continue
+
+            # scripts are read-only, see below
+            os.remove(current_filepath)
+
         with open(current_filepath, 'w') as f:
-            # TODO: make cross platform
-            f.write("#!/usr/bin/env %s\n" % program)
-            f.write(body)
+            f.write(content)
 
         # TODO: Although Windows supports os.chmod you can only set the readonly
         # flag. Setting the file readonly breaks the unit tests that expect to
@@ -211,6 +255,9 @@ def create_forwarding_script(filepath, module, func_name, *nargs, **kwargs):
     A forwarding script is one that executes some arbitrary Rez function. This
     is used internally by Rez to dynamically create a script that uses Rez,
     even though the parent environment may not be configured to do so.
+
+    Returns:
+        List of filepaths of created scripts, see `create_executable_script`.
     """
     doc = dict(
         module=module,
@@ -222,4 +269,4 @@ def create_forwarding_script(filepath, module, func_name, *nargs, **kwargs):
         doc["kwargs"] = kwargs
 
     body = dump_yaml(doc)
-    create_executable_script(filepath, body, "_rez_fwd")
+    return create_executable_script(filepath, body, "_rez_fwd")
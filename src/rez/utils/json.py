@@ -9,28 +9,45 @@ if sys.version_info.major >= 3:
     def loads(data):
         return json.loads(data)
 
+    def raw_decode(data, idx=0):
+        """Decode the json value starting at `idx`.
+
+        Returns:
+            2-tuple: The value, and the index where the value ended.
+        """
+        return _decoder.raw_decode(data, idx)
+
+    _decoder = json.JSONDecoder()
+
 # py2
 else:
 
+    def _byteify(input, ignore_dicts=False):
+        if isinstance(input, list):
+            return [_byteify(x) for x in input]
+        elif isinstance(input, unicode):
+            try:
+                return str(input)
+            except UnicodeEncodeError:
+                return input
+        elif isinstance(input, dict) and not ignore_dicts:
+            return {
+                _byteify(k, ignore_dicts=True): _byteify(v, True)
+                for k, v in input.items()
+            }
+        else:
+            return input
+
     def loads(json_text):
         """Avoids returning unicodes in py2.
 
         https://stackoverflow.com/questions/956867/how-to-get-string-objects-instead-of-unicode-from-json
         """
-        def _byteify(input, ignore_dicts=False):
-            if isinstance(input, list):
-                return [_byteify(x) for x in input]
-            elif isinstance(input, unicode):
-                try:
-                    return str(input)
-                except UnicodeEncodeError:
-                    return input
-            elif isinstance(input, dict) and not ignore_dicts:
-                return {
-                    _byteify(k, ignore_dicts=True): _byteify(v, True)
-                    for k, v in input.items()
-                }
-            else:
-                return input
-
         return _byteify(json.loads(json_text, object_hook=_byteify))
+
+    def raw_decode(data, idx=0):
+        """See py3 `raw_decode`. Avoids returning unicodes in py2."""
+        value, end = _decoder.raw_decode(data, idx)
+        return _byteify(value), end
+
+    _decoder = json.JSONDecoder(object_hook=_byteify)
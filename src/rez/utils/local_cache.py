@@ -0,0 +1,202 @@
+"""
+A persistent, size-bounded key/value cache stored on local disk.
+"""
+from rez.config import config
+from rez.utils.memcached import Client, cache_interface_version
+from rez.utils.filesystem import safe_makedirs
+from rez.vendor.six import six
+from contextlib import contextmanager
+from hashlib import md5
+import sqlite3
+import time
+import sys
+import os.path
+
+
+pickle = six.moves.cPickle
+
+
+class LocalCache(object):
+    """A local, file-based cache.
+
+    Entries are stored in an sqlite database under the given path. This class
+    mirrors the get/set/delete interface of the memcached `Client` wrapper (see
+    rez/utils/memcached.py), so that it can be used in its place on hosts that
+    have no access to a memcached server.
+
+    The cache is bounded - once it holds more than `maxsize` entries, the least
+    recently used entries are discarded. Any error accessing the database is
+    treated as a cache miss; a broken cache never causes the caller to fail.
+    """
+    miss = Client.miss
+
+    logger = config.debug_printer("memcache")
+
+    # seconds to wait on a database locked by another process
+    timeout = 5.0
+
+    def __init__(self, path, name, maxsize=-1):
+        """Create a local cache.
+
+        Args:
+            path (str): Directory to store the cache database in.
+            name (str): Name of the cache. Caches with different names, in the
+                same directory, do not share entries.
+            maxsize (int): Maximum number of entries. -1 means unlimited.
+        """
+        self.path = os.path.expanduser(path)
+        self.name = name
+        self.filepath = os.path.join(self.path, "%s.db" % name)
+        self.maxsize = maxsize
+
+    def __nonzero__(self):
+        return bool(self.path)
+
+    __bool__ = __nonzero__  # py3 compat
+
+    def set(self, key, val):
+        """See `Client.set`."""
+        key = self._qualified_key(key)
+        hashed_key = self._key_hash(key)
+        value = sqlite3.Binary(pickle.dumps(val, pickle.HIGHEST_PROTOCOL))
+
+        try:
+            with self._connection() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)",
+                    (hashed_key, key, value, time.time()))
+                self._evict(conn)
+        except (sqlite3.Error, OSError, IOError) as e:
+            self.logger("SET FAILED: %s: %s", key, e)
+            return
+
+        self.logger("SET: %s", key)
+
+    def get(self, key):
+        """See `Client.get`.
+
+        Returns:
+            object: A value if cached, else `self.miss`.
+        """
+        key = self._qualified_key(key)
+        hashed_key = self._key_hash(key)
+
+        try:
+            with self._connection() as conn:
+                row = conn.execute(
+                    "SELECT key, value FROM entries WHERE hashed_key = ?",
+                    (hashed_key,)).fetchone()
+
+                if row and row[0] == key:
+                    conn.execute(
+                        "UPDATE entries SET atime = ? WHERE hashed_key = ?",
+                        (time.time(), hashed_key))
+                    result = pickle.loads(bytes(row[1]))
+                    self.logger("HIT: %s", key)
+                    return result
+        except (sqlite3.Error, OSError, IOError) as e:
+            self.logger("GET FAILED: %s: %s", key, e)
+        except Exception as e:
+            # an unpicklable entry, eg written by an incompatible rez version
+            self.logger("GET FAILED (bad entry): %s: %s", key, e)
+            self.delete(key)
+
+        self.logger("MISS: %s", key)
+        return self.miss
+
+    def delete(self, key):
+        """See `Client.delete`."""
+        hashed_key = self._key_hash(self._qualified_key(key))
+
+        try:
+            with self._connection() as conn:
+                conn.execute("DELETE FROM entries WHERE hashed_key = ?",
+                             (hashed_key,))
+        except (sqlite3.Error, OSError, IOError):
+            pass
+
+    def flush(self):
+        """Drop all entries from the cache."""
+        try:
+            with self._connection() as conn:
+                conn.execute("DELETE FROM entries")
+        except (sqlite3.Error, OSError, IOError):
+            pass
+
+    def get_stats(self):
+        """Get cache statistics.
+
+        Returns:
+            dict: Stats, containing the keys 'entries', 'bytes' and 'filepath'.
+        """
+        stats = {
+            "filepath": self.filepath,
+            "entries": 0,
+            "bytes": 0
+        }
+
+        if os.path.exists(self.filepath):
+            try:
+                with self._connection() as conn:
+                    stats["entries"] = conn.execute(
+                        "SELECT COUNT(*) FROM entries").fetchone()[0]
+            except (sqlite3.Error, OSError, IOError):
+                pass
+
+            stats["bytes"] = os.path.getsize(self.filepath)
+
+        return stats
+
+    def _evict(self, conn):
+        if self.maxsize < 0:
+            return
+
+        count = conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        num_evict = count - self.maxsize
+        if num_evict <= 0:
+            return
+
+        conn.execute(
+            "DELETE FROM entries WHERE hashed_key IN "
+            "(SELECT hashed_key FROM entries ORDER BY atime ASC LIMIT ?)",
+            (num_evict,))
+        self.logger("EVICTED: %d entries from %s", num_evict, self.filepath)
+
+    @contextmanager
+    def _connection(self):
+        if not os.path.isdir(self.path):
+            safe_makedirs(self.path)
+
+        conn = sqlite3.connect(self.filepath, timeout=self.timeout)
+        try:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "hashed_key TEXT PRIMARY KEY, key TEXT, value BLOB, atime REAL)")
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _qualified_key(self, key):
+        # entries are pickled, so keep python major versions separate
+        return "%s:%d:%s" % (cache_interface_version, sys.version_info[0], key)
+
+    @classmethod
+    def _key_hash(cls, key):
+        return md5(key.encode("utf-8")).hexdigest()
+
+
+# Copyright 2013-2016 Allan Johns.
+#
+# This library is free software: you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation, either
+# version 3 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library.  If not, see <http://www.gnu.org/licenses/>.
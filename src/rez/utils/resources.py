@@ -211,6 +211,27 @@ class ResourcePool(object):
     def clear_caches(self):
         self.cached_get_resource.cache_clear()
 
+    def discard_resources(self, condition):
+        """Discard cached resources.
+
+        Args:
+            condition (callable): Takes a `ResourceHandle`, and returns True
+                if its resource should be discarded.
+
+        Returns:
+            int: Number of resources discarded.
+        """
+        return self.cached_get_resource.cache_discard(condition)
+
+    def get_cache_stats(self):
+        """Get resource cache statistics.
+
+        Returns:
+            dict: Containing 'hits', 'misses', 'evictions', 'maxsize' and
+            'currsize' keys.
+        """
+        return self.cached_get_resource.cache_info()._asdict()
+
     def get_resource_class(self, resource_key):
         resource_class = self.resource_classes.get(resource_key)
         if resource_class is None:
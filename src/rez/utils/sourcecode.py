@@ -2,12 +2,22 @@ from rez.utils.formatting import indent
 from rez.utils.data_utils import cached_property
 from rez.utils.logging_ import print_debug
 from rez.utils import py23
+from rez.vendor.six import six
 from inspect import getsourcelines
 from textwrap import dedent
 from glob import glob
+from hashlib import sha1
 import traceback
+import binascii
+import marshal
 import os.path
 
+try:
+    from importlib.util import MAGIC_NUMBER as _pyc_magic
+except ImportError:  # py2
+    import imp
+    _pyc_magic = imp.get_magic()
+
 
 def early():
     """Used by functions in package.py to harden to the return value at build time.
@@ -188,7 +198,7 @@ class SourceCode(object):
     @cached_property
     def compiled(self):
         try:
-            pyc = compile(self.evaluated_code, self.sourcename, 'exec')
+            pyc = bytecode_cache.compile(self.evaluated_code, self.sourcename)
         except Exception as e:
             stack = traceback.format_exc()
             raise SourceCodeCompileError(
@@ -340,5 +350,81 @@ class IncludeModuleManager(object):
         return module
 
 
-# singleton
+class BytecodeCache(object):
+    """A persistent cache of compiled python code.
+
+    Code objects are stored using marshal (as in __pycache__), one file per
+    source, in the directory given by the 'bytecode_cache_path' config setting.
+    Entries are keyed on a hash of the source and filename, and on the python
+    bytecode version, so different python versions can share the directory.
+    If the setting is not set, code is compiled as normal.
+    """
+    def compile(self, source, filename):
+        """Compile the given source, using the cache if possible.
+
+        Args:
+            source (str): Python source code.
+            filename (str): Filename to associate with the code.
+
+        Returns:
+            Code object.
+        """
+        from rez.config import config  # avoiding circular import
+
+        if not config.bytecode_cache_path:
+            return compile(source, filename, 'exec')
+
+        filepath = self._get_filepath(config.bytecode_cache_path, source,
+                                      filename)
+        pyc = self._read(filepath)
+        if pyc is not None:
+            return pyc
+
+        pyc = compile(source, filename, 'exec')
+        self._write(filepath, pyc)
+        return pyc
+
+    @classmethod
+    def _get_filepath(cls, path, source, filename):
+        txt = filename + '\0' + source
+        if isinstance(txt, six.text_type):
+            txt = txt.encode("utf-8")
+
+        hash_str = sha1(txt).hexdigest()
+        magic_str = binascii.hexlify(_pyc_magic).decode()
+
+        return os.path.join(os.path.expanduser(path),
+                            "%s.%s.pyc" % (hash_str, magic_str))
+
+    @classmethod
+    def _read(cls, filepath):
+        try:
+            with open(filepath, "rb") as f:
+                data = f.read()
+        except (IOError, OSError):
+            return None
+
+        if not data.startswith(_pyc_magic):
+            return None
+
+        try:
+            return marshal.loads(data[len(_pyc_magic):])
+        except (EOFError, ValueError, TypeError):
+            return None  # a partial or corrupt entry is just a cache miss
+
+    @classmethod
+    def _write(cls, filepath, pyc):
+        from rez.vendor.atomicwrites import atomic_write
+        from rez.utils.filesystem import safe_makedirs
+
+        try:
+            safe_makedirs(os.path.dirname(filepath))
+            with atomic_write(filepath, mode="wb", overwrite=True) as f:
+                f.write(_pyc_magic + marshal.dumps(pyc))
+        except (IOError, OSError):
+            pass
+
+
+# singletons
 include_module_manager = IncludeModuleManager()
+bytecode_cache = BytecodeCache()
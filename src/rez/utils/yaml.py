@@ -1,7 +1,5 @@
 from rez.utils.sourcecode import SourceCode
 from rez.vendor import yaml
-from rez.vendor.yaml.dumper import SafeDumper
-from rez.vendor.yaml.nodes import ScalarNode, MappingNode
 from rez.vendor.version.version import Version
 from rez.vendor.version.requirement import Requirement
 from types import FunctionType, BuiltinFunctionType
@@ -9,7 +7,7 @@ from inspect import getsourcelines
 from textwrap import dedent
 
 
-class _Dumper(SafeDumper):
+class _Dumper(yaml.SafeDumper):
     """Dumper which can serialise custom types such as Version, and keeps
     long strings nicely formatted in >/| block-style format.
     """
@@ -45,21 +45,32 @@ class Wrapper(object):
         # a suite's ./bin path, which renders it useless.
         suite_path = os.path.dirname(os.path.dirname(filepath))
         try:
-            Suite.load(suite_path)
+            suite = Suite.load(suite_path)
         except SuiteError as e:
             _err(str(e))
 
-        path = os.path.join(suite_path, "contexts", "%s.rxt" % context_name)
-        context = ResolvedContext.load(path)
-        self._init(suite_path, context_name, context, tool_name, prefix_char)
+        self._init(suite_path, context_name, None, tool_name, prefix_char)
+        self.suite = suite
 
     def _init(self, suite_path, context_name, context, tool_name, prefix_char=None):
         self.suite_path = suite_path
         self.context_name = context_name
-        self.context = context
+        self._context = context
         self.tool_name = tool_name
         self.prefix_char = prefix_char
 
+    @property
+    def context_path(self):
+        return os.path.join(self.suite_path, "contexts",
+                            "%s.rxt" % self.context_name)
+
+    @property
+    def context(self):
+        """Get the tool's context. This is only loaded on first use."""
+        if self._context is None:
+            self._context = ResolvedContext.load(self.context_path, lazy=True)
+        return self._context
+
     @cached_property
     def suite(self):
         from rez.suite import Suite
@@ -84,7 +95,13 @@ class Wrapper(object):
 
     def _run_no_args(self, args):
         cmd = [self.tool_name] + list(args)
-        retcode, _, _ = self.context.execute_shell(command=cmd, block=True)
+        return self._run_tool(self.context, cmd)
+
+    def _run_tool(self, context, cmd):
+        if config.suite_tool_direct_exec:
+            return context.exec_command(cmd)
+
+        retcode, _, _ = context.execute_shell(command=cmd, block=True)
         return retcode
 
     def _run(self, prefix_char, args):
@@ -195,6 +212,9 @@ class Wrapper(object):
         else:
             cmd = [self.tool_name] + tool_args
 
+            if not opts.stdin:
+                return self._run_tool(context, cmd)
+
         retcode, _, _ = context.execute_shell(command=cmd,
                                               stdin=opts.stdin,
                                               quiet=opts.quiet,
@@ -208,16 +228,19 @@ class Wrapper(object):
         print("Path:     %s" % filepath)
         print("Suite:    %s" % self.suite_path)
 
-        msg = "%s (%r)" % (self.context.load_path, self.context_name)
+        msg = "%s (%r)" % (self.context_path, self.context_name)
         print("Context:  %s" % msg)
 
-        variants = self.context.get_tool_variants(self.tool_name)
-        if variants:
-            if len(variants) > 1:
-                self._print_conflicting(variants)
-            else:
-                variant = next(iter(variants))
-                print("Package:  %s" % variant.qualified_package_name)
+        # use the suite's tool index, so the context isn't loaded
+        for entry in self.suite.get_tool_index()["tools"].values():
+            if entry["context_name"] == self.context_name \
+                    and entry["tool_name"] == self.tool_name:
+                variant = entry["variant"]
+                if isinstance(variant, list):
+                    self._print_conflicting(variant)
+                else:
+                    print("Package:  %s" % variant)
+                break
         return 0
 
     def print_package_versions(self):
@@ -226,7 +249,8 @@ class Wrapper(object):
         variants = self.context.get_tool_variants(self.tool_name)
         if variants:
             if len(variants) > 1:
-                self._print_conflicting(variants)
+                self._print_conflicting(
+                    x.qualified_package_name for x in variants)
                 return 1
             else:
                 from rez.packages import iter_packages
@@ -265,8 +289,8 @@ class Wrapper(object):
         return 0
 
     @classmethod
-    def _print_conflicting(cls, variants):
-        vars_str = " ".join(x.qualified_package_name for x in variants)
+    def _print_conflicting(cls, package_names):
+        vars_str = " ".join(package_names)
         msg = "Packages (in conflict): %s" % vars_str
         Printer()(msg, critical)
 
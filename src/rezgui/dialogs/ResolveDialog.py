@@ -64,6 +64,7 @@ class ResolveDialog(QtWidgets.QDialog, StoreSizeMixin):
         self.max_fails_combo = None
         self.verbosity_combo = None
         self.show_package_loads_checkbox = None
+        self.incremental_checkbox = None
 
         # this is solely to execute _start_resolve() as soon as the dialog opens
         self.timer = QtCore.QTimer()
@@ -97,6 +98,11 @@ class ResolveDialog(QtWidgets.QDialog, StoreSizeMixin):
             app.config.attach(self.show_package_loads_checkbox, "resolve/show_package_loads")
             show_loads_pane = create_pane([None, self.show_package_loads_checkbox], True)
 
+            self.incremental_checkbox = QtWidgets.QCheckBox("keep resolved versions")
+            self.incremental_checkbox.setLayoutDirection(QtCore.Qt.RightToLeft)
+            app.config.attach(self.incremental_checkbox, "resolve/incremental")
+            incremental_pane = create_pane([None, self.incremental_checkbox], True)
+
             self.timestamp_widget = TimestampWidget(self.context_model)
             context = self.context_model.context()
             if context and context.requested_timestamp:
@@ -108,6 +114,7 @@ class ResolveDialog(QtWidgets.QDialog, StoreSizeMixin):
             right_pane = create_pane([max_fails_pane,
                                       verbosity_pane,
                                       show_loads_pane,
+                                      incremental_pane,
                                       None],
                                      False, compact=True)
 
@@ -218,6 +225,7 @@ class ResolveDialog(QtWidgets.QDialog, StoreSizeMixin):
         verbosity = 0
         show_package_loads = True
         timestamp = None
+        incremental = app.config.get("resolve/incremental")
         if self.advanced:
             verbosity = app.config.get("resolve/verbosity")
             show_package_loads = app.config.get("resolve/show_package_loads")
@@ -231,6 +239,7 @@ class ResolveDialog(QtWidgets.QDialog, StoreSizeMixin):
             max_fails=max_fails,
             timestamp=timestamp,
             show_package_loads=show_package_loads,
+            incremental=incremental,
             buf=self.edit)
 
         if config.gui_threads:
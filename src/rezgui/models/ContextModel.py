@@ -173,11 +173,17 @@ class ContextModel(QtCore.QObject):
             self._changed(self.LOCKS_CHANGED)
 
     def resolve_context(self, verbosity=0, max_fails=-1, timestamp=None,
-                        callback=None, buf=None, package_load_callback=None):
+                        callback=None, buf=None, package_load_callback=None,
+                        incremental=False):
         """Update the current context by performing a re-resolve.
 
         The newly resolved context is only applied if it is a successful solve.
 
+        Args:
+            incremental (bool): If True, keep the versions of packages in the
+                current context that are unaffected by request changes, where
+                possible (see `ResolvedContext` `seed_context` arg).
+
         Returns:
             `ResolvedContext` object, which may be a successful or failed solve.
         """
@@ -193,7 +199,8 @@ class ContextModel(QtCore.QObject):
             buf=buf,
             callback=callback,
             package_load_callback=package_load_callback,
-            caching=self.caching)
+            caching=self.caching,
+            seed_context=(self._context if incremental else None))
 
         if context.success:
             if self._context and self._context.load_path:
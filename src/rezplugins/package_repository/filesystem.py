@@ -7,6 +7,7 @@ import os
 import stat
 import errno
 import time
+import sys
 import platform
 
 from rez.package_repository import PackageRepository
@@ -21,18 +22,23 @@ from rez.utils.formatting import is_valid_package_name
 from rez.utils.resources import cached_property
 from rez.utils.logging_ import print_warning
 from rez.utils.memcached import memcached, pool_memcached_connections
-from rez.utils.filesystem import make_path_writable, canonical_path
+from rez.utils.filesystem import make_path_writable, canonical_path, \
+    safe_makedirs
+from rez.utils.execution import threaded_map
 from rez.utils.platform_ import platform_
 from rez.serialise import load_from_file, FileFormat
 from rez.config import config
 from rez.backport.lru_cache import lru_cache
 from rez.vendor.schema.schema import Schema, Optional, And, Use, Or
+from rez.vendor.atomicwrites import atomic_write
 from rez.vendor.six import six
 from rez.vendor.version.version import Version, VersionRange
 
 
 basestring = six.string_types[0]
 
+pickle = six.moves.cPickle
+
 
 debug_print = config.debug_printer("resources")
 
@@ -48,6 +54,48 @@ debug_print = config.debug_printer("resources")
 format_version = 2
 
 
+# ------------------------------------------------------------------------------
+# package index format version
+#
+# 1:
+# Initial format.
+# ------------------------------------------------------------------------------
+index_format_version = 1
+
+
+def _scan_dir(path):
+    """Get the names of the subdirectories and files in `path`.
+
+    Where available, this is a single os.scandir pass, which gets the type of
+    each entry from the directory listing itself, rather than stat'ing it.
+
+    Returns:
+        2-tuple: List of directory names, list of file names.
+    """
+    dirs = []
+    files = []
+
+    if not hasattr(os, "scandir"):  # python-2
+        for name in os.listdir(path):
+            path_ = os.path.join(path, name)
+            if os.path.isdir(path_):
+                dirs.append(name)
+            elif os.path.isfile(path_):
+                files.append(name)
+        return dirs, files
+
+    for entry in os.scandir(path):
+        try:
+            if entry.is_dir():
+                dirs.append(entry.name)
+            elif entry.is_file():
+                files.append(entry.name)
+        except OSError:
+            pass  # eg a symlink removed during the scan
+
+    return dirs, files
+
+
 def check_format_version(filename, data):
     format_version_ = data.pop("format_version", None)
 
@@ -101,9 +149,13 @@ class FileSystemPackageFamilyResource(PackageFamilyResource):
             return 0
 
     def iter_packages(self):
+        # an indexed family is known to be versioned, and to have a package
+        # definition file in each version dir
+        indexed = (self._repository._get_index_family(self.name) is not None)
+
         # check for unversioned package
-        if config.allow_unversioned_packages:
-            filepath, _ = self._repository._get_file(self.path)
+        if config.allow_unversioned_packages and not indexed:
+            filepath, _ = self._repository._probe_file(self.path)
             if filepath:
                 package = self._repository.get_resource(
                     FileSystemPackageResource.key,
@@ -114,9 +166,11 @@ class FileSystemPackageFamilyResource(PackageFamilyResource):
 
         # versioned packages
         for version_str in self._repository._get_version_dirs(self.path):
-            if _settings.check_package_definition_files:
+            if _settings.check_package_definition_files and not indexed:
+                # cached, so this doesn't scan the dir again, see
+                # `_list_version_dirs`
                 path = os.path.join(self.path, version_str)
-                if not self._repository._get_file(path)[0]:
+                if not self._repository.get_file(path)[0]:
                     continue
 
             package = self._repository.get_resource(
@@ -179,14 +233,37 @@ class FileSystemPackageResource(PackageResourceHelper):
 
     @cached_property
     def _filepath_and_format(self):
-        return self._repository._get_file(self.path)
+        entry = self._index_entry
+        if entry:
+            filepath = os.path.join(self.path, entry["filename"])
+            ext = os.path.splitext(filepath)[-1][1:]
+            return filepath, FileFormat[ext]
+
+        if self.get("version"):
+            return self._repository.get_file(self.path)
+
+        # unversioned, so self.path is the family dir
+        return self._repository._probe_file(self.path)
+
+    @cached_property
+    def _index_entry(self):
+        version_str = self.get("version")
+        if not version_str:
+            return None
+        return self._repository._get_index_package(self.name, version_str)
 
     def _load(self):
         if self.filepath is None:
             raise PackageDefinitionFileMissing(
                 "Missing package definition file: %r" % self)
 
-        data = load_from_file(self.filepath, self.file_format)
+        data = None
+        if self._index_entry:
+            data = self._repository._load_index_data(self.filepath,
+                                                     self._index_entry)
+        if data is None:
+            data = load_from_file(self.filepath, self.file_format)
+
         check_format_version(self.filepath, data)
 
         if "timestamp" not in data:  # old format support
@@ -447,13 +524,23 @@ class FileSystemPackageRepository(PackageRepository):
             '1.1+':
                 requires:
                 - python-2.6
+
+    A repository can also have a package index (see `update_index`). This
+    stores the package families, their versions and their loaded package
+    definitions in a single file, so that they can be read without walking the
+    repository. The index and its lock file are kept in their own directory,
+    so that updating the index does not change the repository root's mtime.
     """
     schema_dict = {"file_lock_timeout": int,
                    "file_lock_dir": Or(None, str),
-                   "package_filenames": [basestring]}
+                   "package_filenames": [basestring],
+                   "stat_thread_count": int,
+                   "package_index": bool,
+                   "cache_maxsize": int}
 
     building_prefix = ".building"
     ignore_prefix = ".ignore"
+    index_dirname = ".package_index"
 
     package_file_mode = (
         None if os.name == "nt" else
@@ -491,11 +578,20 @@ class FileSystemPackageRepository(PackageRepository):
         self.register_resource(FileSystemCombinedPackageResource)
         self.register_resource(FileSystemCombinedVariantResource)
 
-        self.get_families = lru_cache(maxsize=None)(self._get_families)
-        self.get_family = lru_cache(maxsize=None)(self._get_family)
-        self.get_packages = lru_cache(maxsize=None)(self._get_packages)
-        self.get_variants = lru_cache(maxsize=None)(self._get_variants)
-        self.get_file = lru_cache(maxsize=None)(self._get_file)
+        cache_size = _settings.cache_maxsize
+        if cache_size < 0:  # -1 == unlimited
+            cache_size = None
+        cache = lru_cache(maxsize=cache_size)
+
+        self.get_families = cache(self._get_families)
+        self.get_family = cache(self._get_family)
+        self.get_packages = cache(self._get_packages)
+        self.get_variants = cache(self._get_variants)
+        self.get_file = cache(self._get_file)
+        self.probe_file = cache(self._probe_file)
+
+        # valid package index entries, see `_get_index_family`
+        self._index_families = {}
 
     def _uid(self):
         t = ["filesystem", self.location]
@@ -531,9 +627,25 @@ class FileSystemPackageRepository(PackageRepository):
         package_resource = variant_resource.parent
         return package_resource.state_handle
 
+    def get_variant_state_handles(self, variant_resources):
+        return threaded_map(self.get_variant_state_handle, variant_resources,
+                            _settings.stat_thread_count)
+
     def get_last_release_time(self, package_family_resource):
         return package_family_resource.get_last_release_time()
 
+    def get_last_release_times(self, package_names):
+        def _get_time(name):
+            family = self.get_package_family(name)
+            if family:
+                return family.get_last_release_time()
+            return None
+
+        package_names = list(package_names)
+        times = threaded_map(_get_time, package_names,
+                             _settings.stat_thread_count)
+        return dict(zip(package_names, times))
+
     @cached_property
     def file_lock_dir(self):
         dirname = _settings.file_lock_dir
@@ -656,24 +768,28 @@ class FileSystemPackageRepository(PackageRepository):
 
         return variant
 
-    @contextmanager
     def _lock_package(self, package_name, package_version=None):
+        filename = ".lock.%s" % package_name
+        if package_version:
+            filename += "-%s" % str(package_version)
+
+        return self._lock(filename)
+
+    @contextmanager
+    def _lock(self, filename, path=None):
         from rez.vendor.lockfile import LockFile
 
-        path = self.location
+        if path is None:
+            path = self.location
 
-        if self.file_lock_dir:
-            path = os.path.join(path, self.file_lock_dir)
+            if self.file_lock_dir:
+                path = os.path.join(path, self.file_lock_dir)
 
         if not os.path.exists(path):
             raise PackageRepositoryError(
                 "Lockfile directory %s does not exist - please create and try "
                 "again" % path)
 
-        filename = ".lock.%s" % package_name
-        if package_version:
-            filename += "-%s" % str(package_version)
-
         lock_file = os.path.join(path, filename)
         lock = LockFile(lock_file)
 
@@ -687,16 +803,129 @@ class FileSystemPackageRepository(PackageRepository):
 
     def clear_caches(self):
         super(FileSystemPackageRepository, self).clear_caches()
-        self.get_families.cache_clear()
-        self.get_family.cache_clear()
-        self.get_packages.cache_clear()
-        self.get_variants.cache_clear()
-        self.get_file.cache_clear()
+        for cache in self._caches.values():
+            cache.cache_clear()
         self._get_family_dirs.forget()
         self._get_version_dirs.forget()
+        self._index_families.clear()
+        cached_property.uncache(self, "_index")
         # unfortunately we need to clear file cache across the board
         clear_file_caches()
 
+    def clear_family_caches(self, name):
+        super(FileSystemPackageRepository, self).clear_family_caches(name)
+
+        family_name = name
+        family_path = os.path.join(self.location, family_name)
+
+        # the cache_discard conditions take the same args as the cached funcs
+        def _match_family(name):
+            return (name == family_name)
+
+        def _match_packages(package_family_resource):
+            return (package_family_resource.name == family_name)
+
+        def _match_variants(package_resource):
+            return (package_resource.name == family_name)
+
+        def _match_path(path, package_filename=None):
+            if path == self.location:  # combined family file
+                return (package_filename == family_name)
+            return (path == family_path
+                    or path.startswith(family_path + os.path.sep))
+
+        # the list of families changes only if this family was added or
+        # removed, but it's a single entry anyway
+        self.get_families.cache_clear()
+        self.get_family.cache_discard(_match_family)
+        self.get_packages.cache_discard(_match_packages)
+        self.get_variants.cache_discard(_match_variants)
+        self.get_file.cache_discard(_match_path)
+        self.probe_file.cache_discard(_match_path)
+
+        self._get_family_dirs.forget()
+        self._get_version_dirs.forget()
+        self._index_families.pop(family_name, None)
+        clear_file_caches()
+
+    def get_cache_stats(self):
+        return dict(
+            (cache_name, cache.cache_info()._asdict())
+            for cache_name, cache in self._caches.items()
+        )
+
+    @property
+    def _caches(self):
+        return {
+            "families": self.get_families,
+            "family": self.get_family,
+            "packages": self.get_packages,
+            "variants": self.get_variants,
+            "file": self.get_file,
+            "probe_file": self.probe_file
+        }
+
+    def update_index(self, family_names=None):
+        """Create or update the package index of this repository.
+
+        The index is only read if the 'package_index' setting is enabled. Once
+        it exists though, it is kept up to date as variants are installed into
+        the repository, regardless of this setting.
+
+        Each family in the index is valid for as long as its directory's mtime
+        is unchanged, which is the case until a package version is added,
+        removed or ignored. Each package definition in the index is valid for
+        as long as its file's mtime is unchanged. Out of date entries are
+        ignored, and are read from the repository directly instead.
+
+        Args:
+            family_names (list of str): Families to update. If None, or if the
+                repository has no index yet, the index is rebuilt from scratch.
+        """
+        # creating the index dir changes the root's mtime, so it's done before
+        # the mtime is taken below
+        index_path = os.path.join(self.location, self.index_dirname)
+        safe_makedirs(index_path)
+
+        with self._lock(".lock", path=index_path):
+            index = None
+            if family_names is not None:
+                index = self._read_index()
+
+            rebuild = (index is None)
+            if rebuild:
+                index = dict(format_version=index_format_version,
+                             families={})
+
+            # the mtime is taken first, so that any change during the walk
+            # invalidates the entry
+            st = os.stat(self.location)
+            family_dirs = self._list_family_dirs()
+            index["location_mtime"] = st.st_mtime
+            index["family_dirs"] = family_dirs
+
+            if rebuild:
+                family_names = [x[0] for x in family_dirs if x[1] is None]
+
+            families = index["families"]
+            for name in family_names:
+                entry = self._create_index_family(name)
+                if entry is None:
+                    families.pop(name, None)
+                else:
+                    families[name] = entry
+
+            with atomic_write(self._index_filepath, mode="wb",
+                              overwrite=True) as f:
+                pickle.dump(index, f, pickle.HIGHEST_PROTOCOL)
+
+        if rebuild:
+            self.clear_caches()
+        else:
+            cached_property.uncache(self, "_index")
+            for name in family_names:
+                self.clear_family_caches(name)
+
     def get_package_payload_path(self, package_name, package_version=None):
         path = os.path.join(self.location, package_name)
 
@@ -719,19 +948,34 @@ class FileSystemPackageRepository(PackageRepository):
                key=_get_family_dirs__key,
                debug=config.debug_memcache)
     def _get_family_dirs(self):
+        index = self._index
+        if index:
+            try:
+                mtime = os.stat(self.location).st_mtime
+            except OSError:
+                mtime = None
+
+            if mtime == index["location_mtime"]:
+                return list(index["family_dirs"])
+
+        return self._list_family_dirs()
+
+    def _list_family_dirs(self):
         dirs = []
-        if not os.path.isdir(self.location):
+
+        try:
+            dir_names, file_names = _scan_dir(self.location)
+        except OSError:
             return dirs
 
-        for name in os.listdir(self.location):
-            path = os.path.join(self.location, name)
-            if os.path.isdir(path):
-                if is_valid_package_name(name) and name != self.file_lock_dir:
-                    dirs.append((name, None))
-            else:
-                name_, ext_ = os.path.splitext(name)
-                if ext_ in (".py", ".yaml") and is_valid_package_name(name_):
-                    dirs.append((name_, ext_[1:]))
+        for name in dir_names:
+            if is_valid_package_name(name) and name != self.file_lock_dir:
+                dirs.append((name, None))
+
+        for name in file_names:
+            name_, ext_ = os.path.splitext(name)
+            if ext_ in (".py", ".yaml") and is_valid_package_name(name_):
+                dirs.append((name_, ext_[1:]))
 
         return dirs
 
@@ -744,65 +988,167 @@ class FileSystemPackageRepository(PackageRepository):
                key=_get_version_dirs__key,
                debug=config.debug_memcache)
     def _get_version_dirs(self, root):
+        entry = self._get_index_family(os.path.basename(root))
+        if entry is not None:
+            return list(entry["versions"].keys())
 
-        # Ignore a version if there is a .ignore<version> file next to it
-        def ignore_dir(name):
-            path = os.path.join(root, self.ignore_prefix + name)
-            return os.path.isfile(path)
+        return self._list_version_dirs(root)
 
-        # simpler case if this test is on
-        #
-        if _settings.check_package_definition_files:
-            dirs = []
+    def _list_version_dirs(self, root):
+        # the version dirs, and the .ignore/.building marker files next to
+        # them, are all found in a single pass
+        dir_names, file_names = _scan_dir(root)
 
-            for name in os.listdir(root):
-                if name.startswith('.'):
-                    continue
+        def _markers(prefix, names):
+            return set(x[len(prefix):] for x in names if x.startswith(prefix))
 
-                path = os.path.join(root, name)
+        # Ignore a version if there is a .ignore<version> file next to it
+        ignored = _markers(self.ignore_prefix, file_names)
 
-                if os.path.isdir(path) and not ignore_dir(name) \
-                        and self._is_valid_package_directory(path):
-                    dirs.append(name)
+        dirs = [
+            x for x in dir_names
+            if not x.startswith('.') and x not in ignored
+        ]
 
-            return dirs
+        # simpler case if this test is on. The cached `get_file` is used, so
+        # each dir is scanned only once, even though the family's packages
+        # look up their definition files again
+        #
+        if _settings.check_package_definition_files:
+            return [
+                x for x in dirs
+                if self.get_file(os.path.join(root, x))[0]
+            ]
 
         # with test off, we have to check for 'building' dirs, these have to be
         # tested regardless. Failed releases may cause 'building files' to be
         # left behind, so we need to clear these out also
         #
-        dirs = set()
-        building_dirs = set()
+        building = _markers(self.building_prefix, file_names + dir_names)
 
-        # find dirs and dirs marked as 'building'
-        for name in os.listdir(root):
-            if name.startswith('.'):
-                if not name.startswith(self.building_prefix):
-                    continue
+        return [
+            x for x in dirs
+            if x not in building
+            # package probably still being built if not valid
+            or self._is_valid_package_directory(os.path.join(root, x))
+        ]
+
+    # True if `path` contains package.py or similar
+    def _is_valid_package_directory(self, path):
+        return bool(self._get_file(path, "package")[0])
+
+    @cached_property
+    def _index(self):
+        if not _settings.package_index:
+            return None
+        return self._read_index()
+
+    @property
+    def _index_filepath(self):
+        return os.path.join(self.location, self.index_dirname, "index")
+
+    def _read_index(self):
+        filepath = self._index_filepath
+
+        try:
+            with open(filepath, "rb") as f:
+                index = pickle.load(f)
+        except IOError as e:
+            if e.errno != errno.ENOENT:
+                print_warning("Failed to read package index %s: %s"
+                              % (filepath, str(e)))
+            return None
+        except Exception as e:
+            print_warning("Failed to read package index %s: %s"
+                          % (filepath, str(e)))
+            return None
+
+        if index.get("format_version") != index_format_version:
+            return None
+        return index
+
+    def _get_index_family(self, name):
+        # get a family's index entry, or None if it isn't indexed, or is out
+        # of date. Note that the family dir is only stat'd once
+        try:
+            return self._index_families[name]
+        except KeyError:
+            pass
+
+        entry = None
+        index = self._index
+        if index:
+            entry = index["families"].get(name)
+            if entry is not None:
+                try:
+                    mtime = os.stat(os.path.join(self.location, name)).st_mtime
+                except OSError:
+                    mtime = None
+
+                if mtime != entry["mtime"]:
+                    entry = None
+
+        self._index_families[name] = entry
+        return entry
+
+    def _get_index_package(self, name, version_str):
+        entry = self._get_index_family(name)
+        if entry is None:
+            return None
+        return entry["versions"].get(version_str)
+
+    def _load_index_data(self, filepath, entry):
+        # entries are pickled, so data from another python major version is
+        # not used
+        if entry["data"] is None or entry["python_version"] != sys.version_info[0]:
+            return None
 
-                ver_str = name[len(self.building_prefix):]
-                building_dirs.add(ver_str)
+        try:
+            mtime = os.stat(filepath).st_mtime
+        except OSError:
+            return None
+
+        if mtime != entry["mtime"]:
+            return None
 
-            path = os.path.join(root, name)
+        return pickle.loads(entry["data"])
+
+    def _create_index_family(self, name):
+        path = os.path.join(self.location, name)
+
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
 
-            if os.path.isdir(path) and not ignore_dir(name):
-                dirs.add(name)
+        # unversioned packages are not indexed
+        if self._probe_file(path)[0]:
+            return None
 
-        # check 'building' dirs for validity
-        for name in building_dirs:
-            if name not in dirs:
+        versions = {}
+        for version_str in self._list_version_dirs(path):
+            version_path = os.path.join(path, version_str)
+            filepath, format_ = self._get_file(version_path)
+            if not filepath:
                 continue
 
-            path = os.path.join(root, name)
-            if not self._is_valid_package_directory(path):
-                # package probably still being built
-                dirs.remove(name)
+            mtime = os.stat(filepath).st_mtime
 
-        return list(dirs)
+            # packages that fail to load or pickle are loaded from file
+            # instead, so that any error is raised as normal on use
+            try:
+                data = load_from_file(filepath, format_)
+                data = pickle.dumps(data, pickle.HIGHEST_PROTOCOL)
+            except Exception:
+                data = None
 
-    # True if `path` contains package.py or similar
-    def _is_valid_package_directory(self, path):
-        return bool(self._get_file(path, "package")[0])
+            versions[version_str] = dict(
+                filename=os.path.basename(filepath),
+                mtime=mtime,
+                python_version=sys.version_info[0],
+                data=data)
+
+        return dict(mtime=st.st_mtime, versions=versions)
 
     def _get_families(self):
         families = []
@@ -836,7 +1182,7 @@ class FileSystemPackageRepository(PackageRepository):
                 name=name
             )
         else:
-            filepath, format_ = self.get_file(self.location, package_filename=name)
+            filepath, format_ = self.probe_file(self.location, package_filename=name)
             if filepath:
                 # force case-sensitive match on pkg filename, on case-insensitive platforms
                 if not platform_.has_case_sensitive_filesystem:
@@ -858,7 +1204,32 @@ class FileSystemPackageRepository(PackageRepository):
     def _get_variants(self, package_resource):
         return [x for x in package_resource.iter_variants()]
 
+    # Find the package definition file in a package dir. This is a single scan
+    # of the dir, rather than a stat per possible filename
     def _get_file(self, path, package_filename=None):
+        try:
+            _, file_names = _scan_dir(path)
+        except OSError:
+            return None, None
+
+        file_names = set(file_names)
+
+        for filename, format_ in self._iter_package_filenames(package_filename):
+            if filename in file_names:
+                return os.path.join(path, filename), format_
+        return None, None
+
+    # Like `_get_file`, but stats each possible filename instead. This is used
+    # for the repository root and family dirs, which may contain far more
+    # entries than it's worth scanning
+    def _probe_file(self, path, package_filename=None):
+        for filename, format_ in self._iter_package_filenames(package_filename):
+            filepath = os.path.join(path, filename)
+            if os.path.isfile(filepath):
+                return filepath, format_
+        return None, None
+
+    def _iter_package_filenames(self, package_filename=None):
         if package_filename:
             package_filenames = [package_filename]
         else:
@@ -866,17 +1237,13 @@ class FileSystemPackageRepository(PackageRepository):
 
         for name in package_filenames:
             for format_ in (FileFormat.py, FileFormat.yaml):
-                filename = "%s.%s" % (name, format_.extension)
-                filepath = os.path.join(path, filename)
-                if os.path.isfile(filepath):
-                    return filepath, format_
-        return None, None
+                yield "%s.%s" % (name, format_.extension), format_
 
     def _create_family(self, name):
         path = os.path.join(self.location, name)
         if not os.path.exists(path):
             os.makedirs(path)
-        self.clear_caches()
+        self.clear_family_caches(name)
         return self.get_package_family(name)
 
     def _create_variant(self, variant, dry_run=False, overrides=None):
@@ -1133,9 +1500,13 @@ class FileSystemPackageRepository(PackageRepository):
         # touch the family dir, this keeps memcached resolves updated properly
         os.utime(family_path, None)
 
+        # keep the package index up to date, if there is one
+        if os.path.isfile(self._index_filepath):
+            self.update_index([variant_name])
+
         # load new variant
         new_variant = None
-        self.clear_caches()
+        self.clear_family_caches(variant_name)
         family = self.get_package_family(variant_name)
 
         if family:
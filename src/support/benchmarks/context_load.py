@@ -0,0 +1,77 @@
+"""
+Compare context load times of the json, yaml and binary rxt formats.
+
+Usage:
+    python context_load.py RXT_FILE [--repeats N]
+
+The given context is written out in each format, then loaded repeatedly, both
+fully and lazily (see `ResolvedContext.load`). Only the load is timed, not
+the loading of the resolved packages.
+"""
+from __future__ import print_function
+
+from rez.resolved_context import ResolvedContext
+from rez.config import config
+from rez.utils.formatting import columnise
+import argparse
+import tempfile
+import shutil
+import time
+import os.path
+
+
+formats = {
+    "json": dict(rxt_as_yaml=False, rxt_as_binary=False),
+    "yaml": dict(rxt_as_yaml=True, rxt_as_binary=False),
+    "binary": dict(rxt_as_yaml=False, rxt_as_binary=True)
+}
+
+
+def time_load(filepath, repeats, lazy):
+    start = time.time()
+    for _ in range(repeats):
+        ResolvedContext.load(filepath, lazy=lazy)
+    return (time.time() - start) / repeats
+
+
+def run():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("RXT_FILE", help="context to benchmark")
+    parser.add_argument("--repeats", type=int, default=50,
+                        help="number of loads per format (default: %(default)s)")
+    opts = parser.parse_args()
+
+    context = ResolvedContext.load(opts.RXT_FILE)
+    tmpdir = tempfile.mkdtemp(prefix="rez_context_load_")
+
+    rows = [("format", "size (bytes)", "load (ms)", "lazy load (ms)"),
+            ("------", "------------", "---------", "--------------")]
+
+    try:
+        for name, settings in sorted(formats.items()):
+            filepath = os.path.join(tmpdir, "%s.rxt" % name)
+
+            saved = dict((k, getattr(config, k)) for k in settings)
+            config.override("rxt_as_yaml", settings["rxt_as_yaml"])
+            config.override("rxt_as_binary", settings["rxt_as_binary"])
+            try:
+                context.save(filepath)
+            finally:
+                for k, v in saved.items():
+                    config.override(k, v)
+
+            secs = time_load(filepath, opts.repeats, lazy=False)
+            lazy_secs = time_load(filepath, opts.repeats, lazy=True)
+
+            rows.append((name,
+                         os.path.getsize(filepath),
+                         "%.3f" % (secs * 1000),
+                         "%.3f" % (lazy_secs * 1000)))
+    finally:
+        shutil.rmtree(tmpdir)
+
+    print('\n'.join(columnise(rows)))
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,126 @@
+"""
+Count the filesystem calls made when listing packages in a filesystem repository.
+
+Usage:
+    python repository_listing.py [--versions N] [--repeats N]
+
+A synthetic repository is created, containing a single package family with
+the given number of versions. Every 100th version is ignored (has an
+'.ignore<version>' file next to it), and every 1000th has a stale
+'.building<version>' tagfile. The family's packages are then listed, with the
+'check_package_definition_files' setting off and on, and the number of stat,
+listdir and scandir calls are printed along with the mean listing time.
+Package definitions are not loaded.
+"""
+from __future__ import print_function
+
+from rez.config import config
+from rez.packages import iter_packages
+from rez.package_repository import package_repository_manager
+from rez.utils.formatting import columnise
+import argparse
+import tempfile
+import shutil
+import time
+import os.path
+import os
+
+
+family_name = "benchpkg"
+
+counted_functions = ("stat", "lstat", "listdir", "scandir")
+
+
+def create_repository(path, num_versions):
+    family_path = os.path.join(path, family_name)
+    os.makedirs(family_path)
+
+    def _touch(filepath, content=''):
+        with open(filepath, 'w') as f:
+            f.write(content)
+
+    for i in range(num_versions):
+        version_str = "1.%d.0" % i
+        version_path = os.path.join(family_path, version_str)
+        os.mkdir(version_path)
+        _touch(os.path.join(version_path, "package.py"),
+               "name = %r\nversion = %r\n" % (family_name, version_str))
+
+        if i % 100 == 99:
+            _touch(os.path.join(family_path, ".ignore" + version_str))
+        if i % 1000 == 999:
+            _touch(os.path.join(family_path, ".building" + version_str))
+
+
+class CallCounter(object):
+    """Counts calls to some `os` module functions, while in scope."""
+    def __init__(self):
+        self.counts = dict((x, 0) for x in counted_functions)
+        self.originals = {}
+
+    def __enter__(self):
+        for name in counted_functions:
+            func = getattr(os, name, None)
+            if func is not None:
+                self.originals[name] = func
+                setattr(os, name, self._wrap(name, func))
+        return self
+
+    def __exit__(self, *args):
+        for name, func in self.originals.items():
+            setattr(os, name, func)
+
+    def _wrap(self, name, func):
+        def _func(*nargs, **kwargs):
+            self.counts[name] += 1
+            return func(*nargs, **kwargs)
+        return _func
+
+
+def list_packages(path):
+    package_repository_manager.clear_caches()
+    return len(list(iter_packages(family_name, paths=[path])))
+
+
+def run():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--versions", type=int, default=10000,
+                        help="number of package versions (default: %(default)s)")
+    parser.add_argument("--repeats", type=int, default=5,
+                        help="number of timed listings (default: %(default)s)")
+    opts = parser.parse_args()
+
+    config.override("cache_listdir", False)
+    tmpdir = tempfile.mkdtemp(prefix="rez_repository_listing_")
+
+    rows = [("check files", "packages") + counted_functions + ("list (ms)",),
+            ("-----------", "--------") + tuple('-' * len(x) for x in counted_functions)
+            + ("---------",)]
+
+    try:
+        create_repository(tmpdir, opts.versions)
+
+        for check in (False, True):
+            config.override(
+                "plugins.package_repository.filesystem.check_package_definition_files",
+                check)
+
+            with CallCounter() as counter:
+                num_packages = list_packages(tmpdir)
+
+            start = time.time()
+            for _ in range(opts.repeats):
+                list_packages(tmpdir)
+            secs = (time.time() - start) / opts.repeats
+
+            rows.append(("on" if check else "off", num_packages)
+                        + tuple(counter.counts[x] for x in counted_functions)
+                        + ("%.1f" % (secs * 1000),))
+    finally:
+        shutil.rmtree(tmpdir)
+
+    print('\n'.join(columnise(rows)))
+
+
+if __name__ == "__main__":
+    run()
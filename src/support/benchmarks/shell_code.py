@@ -0,0 +1,136 @@
+"""
+Benchmark the generation of context shell code, across shells and resolve sizes.
+
+Usage:
+    python shell_code.py [--shells SHELL [SHELL ...]] [--sizes N [N ...]]
+                         [--repeats N]
+
+Each resolve is simulated by running typical package commands - appends and
+prepends to PATH, PYTHONPATH and a few other variables, plus some setenvs - for
+N packages, with the given shell as the rex interpreter. This is the same work
+`ResolvedContext.get_shell_code` does, minus the resolve itself.
+
+Code is generated with and without the 'coalesce_env_var_pends' setting. The
+size of the generated script, the time to generate it and, if the shell is
+available, the time to source it are reported.
+"""
+from __future__ import print_function
+
+from rez.rex import RexExecutor
+from rez.shells import create_shell, get_shell_class
+from rez.config import config
+from rez.utils.formatting import columnise
+import argparse
+import subprocess
+import tempfile
+import time
+import os
+
+
+package_commands = """
+env.PATH.prepend("/packages/{name}/1.0.0/bin")
+env.PYTHONPATH.append("/packages/{name}/1.0.0/python")
+env.LD_LIBRARY_PATH.append("/packages/{name}/1.0.0/lib")
+env.MANPATH.append("/packages/{name}/1.0.0/man")
+env.{upper_name}_ROOT = "/packages/{name}/1.0.0"
+env.{upper_name}_VERSION = "1.0.0"
+"""
+
+# args that stop each shell from sourcing startup files
+norc_args = {
+    "bash": ["--norc"],
+    "zsh": ["-f"],
+    "csh": ["-f"],
+    "tcsh": ["-f"]
+}
+
+parent_variables = ["PATH", "PYTHONPATH", "LD_LIBRARY_PATH", "MANPATH"]
+
+
+def generate(shell, num_packages):
+    parent_environ = dict((k, "/usr/%s" % k.lower()) for k in parent_variables)
+
+    ex = RexExecutor(interpreter=create_shell(shell),
+                     parent_environ=parent_environ,
+                     parent_variables=parent_variables)
+
+    for i in range(num_packages):
+        name = "package%d" % i
+        ex.execute_code(package_commands.format(name=name,
+                                                upper_name=name.upper()))
+    return ex.get_output()
+
+
+def time_generate(shell, num_packages, repeats):
+    start = time.time()
+    for _ in range(repeats):
+        script = generate(shell, num_packages)
+    return script, (time.time() - start) / repeats
+
+
+def time_source(shell, script, repeats):
+    shell_class = get_shell_class(shell)
+    if not shell_class.is_available():
+        return None
+
+    executable = shell_class.executable_filepath()
+    fd, filepath = tempfile.mkstemp(suffix="." + shell_class.file_extension())
+
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write(script)
+
+        args = [executable] + norc_args.get(shell, []) + [filepath]
+
+        start = time.time()
+        for _ in range(repeats):
+            subprocess.check_call(args)
+        return (time.time() - start) / repeats
+    finally:
+        os.remove(filepath)
+
+
+def run():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--shells", nargs='+', default=["bash", "zsh", "tcsh"],
+                        help="shells to benchmark (default: %(default)s)")
+    parser.add_argument("--sizes", type=int, nargs='+', default=[10, 100, 500],
+                        help="number of packages per resolve "
+                        "(default: %(default)s)")
+    parser.add_argument("--repeats", type=int, default=5,
+                        help="number of runs per test (default: %(default)s)")
+    opts = parser.parse_args()
+
+    rows = [("shell", "packages", "coalesce", "size (bytes)", "lines",
+             "generate (ms)", "source (ms)"),
+            ("-----", "--------", "--------", "------------", "-----",
+             "-------------", "-----------")]
+
+    saved = config.coalesce_env_var_pends
+
+    try:
+        for shell in opts.shells:
+            for size in opts.sizes:
+                for coalesce in (False, True):
+                    config.override("coalesce_env_var_pends", coalesce)
+
+                    script, secs = time_generate(shell, size, opts.repeats)
+                    source_secs = time_source(shell, script, opts.repeats)
+
+                    rows.append((
+                        shell,
+                        size,
+                        "yes" if coalesce else "no",
+                        len(script),
+                        script.count('\n'),
+                        "%.1f" % (secs * 1000),
+                        '-' if source_secs is None
+                        else "%.1f" % (source_secs * 1000)))
+    finally:
+        config.override("coalesce_env_var_pends", saved)
+
+    print('\n'.join(columnise(rows)))
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,79 @@
+"""
+Compare the launch latency of a command run in a context via a subshell, and
+via direct exec.
+
+Usage:
+    python tool_launch.py RXT_FILE [--repeats N] [-- COMMAND [ARG...]]
+
+Each launch is a new python process that loads the context, then runs the
+command (default: 'true') with `ResolvedContext.execute_shell`, or with
+`ResolvedContext.exec_command`. This is what a suite tool wrapper does, with
+the 'suite_tool_direct_exec' setting off and on, respectively.
+"""
+from __future__ import print_function
+
+from rez.utils.formatting import columnise
+import rez
+import argparse
+import subprocess
+import time
+import sys
+import os.path
+import os
+
+
+launch_code = {
+    "shell": (
+        "import sys; "
+        "from rez.resolved_context import ResolvedContext; "
+        "r = ResolvedContext.load(sys.argv[1]); "
+        "retcode, _, _ = r.execute_shell(command=sys.argv[2:], block=True); "
+        "sys.exit(retcode)"),
+    "direct exec": (
+        "import sys; "
+        "from rez.resolved_context import ResolvedContext; "
+        "r = ResolvedContext.load(sys.argv[1]); "
+        "sys.exit(r.exec_command(sys.argv[2:]))")
+}
+
+
+def time_launch(code, filepath, command, repeats, env):
+    args = [sys.executable, "-c", code, filepath] + command
+
+    start = time.time()
+    for _ in range(repeats):
+        subprocess.check_call(args, env=env)
+    return (time.time() - start) / repeats
+
+
+def run():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("RXT_FILE", help="context to run the command in")
+    parser.add_argument("--repeats", type=int, default=20,
+                        help="number of launches per mode (default: %(default)s)")
+
+    args = sys.argv[1:]
+    command = ["true"]
+    if "--" in args:
+        i = args.index("--")
+        args, command = args[:i], (args[i + 1:] or command)
+
+    opts = parser.parse_args(args)
+
+    env = os.environ.copy()
+    env["PYTHONPATH"] = os.path.dirname(os.path.dirname(rez.__file__))
+    env["REZ_QUIET"] = "1"
+    filepath = os.path.abspath(opts.RXT_FILE)
+
+    rows = [("mode", "launch (ms)"),
+            ("----", "-----------")]
+
+    for name, code in sorted(launch_code.items()):
+        secs = time_launch(code, filepath, command, opts.repeats, env)
+        rows.append((name, "%.1f" % (secs * 1000)))
+
+    print('\n'.join(columnise(rows)))
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,108 @@
+"""
+Measure the startup cost of a suite tool wrapper.
+
+Usage:
+    python wrapper_startup.py TOOL [--repeats N] [--top N] [-- ARG...]
+
+TOOL is a wrapper in a suite's ./bin directory. It is launched repeatedly via
+the '_rez_fwd' entry point, in the same way as running it from the shell, and
+the mean launch time is printed with 'suite_tool_direct_exec' off and on. The
+default args ('+a') print tool info without running the tool, so this only
+times rez itself, and both modes are the same. Pass tool args (for example
+'-- --version') to include running the tool.
+
+The most expensive imports of a single launch are also listed, using python's
+'-X importtime' option (python-3.7 and above).
+"""
+from __future__ import print_function
+
+from rez.utils.formatting import columnise
+import rez
+import argparse
+import subprocess
+import time
+import sys
+import os.path
+import os
+
+
+launch_code = (
+    "from rez.cli._entry_points import run_rez_fwd; "
+    "run_rez_fwd()")
+
+
+def time_launch(args, repeats, env):
+    start = time.time()
+    for _ in range(repeats):
+        subprocess.check_call(args, env=env, stdout=subprocess.PIPE)
+    return (time.time() - start) / repeats
+
+
+def get_import_times(args, env):
+    # each line of -X importtime output is 'import time: self | cumulative | name'
+    args = [args[0], "-X", "importtime"] + args[1:]
+    proc = subprocess.Popen(args, env=env, stdout=subprocess.PIPE,
+                            stderr=subprocess.PIPE, universal_newlines=True)
+    _, err = proc.communicate()
+
+    times = []
+    for line in err.split('\n'):
+        toks = line.split('|')
+        if len(toks) == 3 and toks[1].strip().isdigit():
+            self_us = int(toks[0].split(':')[-1])
+            cumulative_us = int(toks[1])
+            times.append((toks[2].strip(), self_us, cumulative_us))
+    return times
+
+
+def run():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("TOOL", help="suite tool wrapper to launch")
+    parser.add_argument("--repeats", type=int, default=20,
+                        help="number of launches per mode (default: %(default)s)")
+    parser.add_argument("--top", type=int, default=15,
+                        help="number of imports to list (default: %(default)s)")
+
+    args = sys.argv[1:]
+    tool_args = ["+a"]
+    if "--" in args:
+        i = args.index("--")
+        args, tool_args = args[:i], args[i + 1:]
+
+    opts = parser.parse_args(args)
+
+    env = os.environ.copy()
+    env["PYTHONPATH"] = os.path.dirname(os.path.dirname(rez.__file__))
+    env["REZ_QUIET"] = "1"
+    launch_args = ([sys.executable, "-c", launch_code, os.path.abspath(opts.TOOL)]
+                   + tool_args)
+
+    rows = [("mode", "launch (ms)"),
+            ("----", "-----------")]
+
+    for name, value in (("shell", "0"), ("direct exec", "1")):
+        env["REZ_SUITE_TOOL_DIRECT_EXEC"] = value
+        secs = time_launch(launch_args, opts.repeats, env)
+        rows.append((name, "%.1f" % (secs * 1000)))
+
+    print('\n'.join(columnise(rows)))
+
+    if sys.version_info < (3, 7):
+        return
+
+    times = get_import_times(launch_args, env)
+    total_us = sum(x[1] for x in times)
+    times = sorted(times, key=lambda x: x[2], reverse=True)[:opts.top]
+
+    print("\nimports: %.1fms total\n" % (total_us / 1000.0))
+    rows = [("module", "self (ms)", "cumulative (ms)"),
+            ("------", "---------", "---------------")]
+    for name, self_us, cumulative_us in times:
+        rows.append((name, "%.1f" % (self_us / 1000.0),
+                     "%.1f" % (cumulative_us / 1000.0)))
+
+    print('\n'.join(columnise(rows)))
+
+
+if __name__ == "__main__":
+    run()